@@ -1,39 +1,38 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
-from app.db.session import get_db
-from app.services.user_service import UserService
+from app.db.session import get_async_db
+from app.services.user_service import AsyncUserService
 from app.core.security import (
     create_access_token, 
     create_refresh_token,
-    verify_password, 
+    verify_password_async, 
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
 from app.api.schemas.auth import Token, TokenData, UserRegister, RefreshToken
 from app.utils.validators import validate_password_strength
 from typing import Annotated
-from jose import JWTError, jwt
-from app.core.security import SECRET_KEY, ALGORITHM
-from app.core.exceptions import CredentialsException
+from app.core.security import Principal, cache_token_subject, decode_token, principal_cache, token_cache
+from app.core.exceptions import CredentialsException, ForbiddenException
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 @router.post("/register", status_code=status.HTTP_201_CREATED)
-async def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register_user(user_data: UserRegister, db: AsyncSession = Depends(get_async_db)):
     """Register a new user."""
-    user_service = UserService(db)
+    user_service = AsyncUserService(db)
     
     # Check if email already exists
-    if user_service.get_user_by_email(user_data.email):
+    if await user_service.get_user_by_email(user_data.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
     # Check if username already exists
-    if user_service.get_user_by_username(user_data.username):
+    if await user_service.get_user_by_username(user_data.username):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already taken"
@@ -47,17 +46,17 @@ async def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    user = user_service.create_user(user_data.dict())
+    user = await user_service.create_user(user_data.dict())
     
     return {"message": "User registered successfully"}
 
 @router.post("/token", response_model=Token)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     """Generate access and refresh tokens."""
-    user_service = UserService(db)
-    user = user_service.get_user_by_username(form_data.username)
+    user_service = AsyncUserService(db)
+    user = await user_service.get_user_by_username(form_data.username)
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -86,22 +85,22 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
     }
 
 @router.post("/refresh", response_model=Token)
-async def refresh_access_token(refresh_token: RefreshToken, db: Session = Depends(get_db)):
+async def refresh_access_token(refresh_token: RefreshToken, db: AsyncSession = Depends(get_async_db)):
     """Generate a new access token using a refresh token."""
-    try:
-        payload = jwt.decode(refresh_token.refresh_token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        token_type: str = payload.get("type")
-        
-        if username is None or token_type != "refresh":
-            raise CredentialsException()
-            
-        token_data = TokenData(username=username)
-    except JWTError:
+    payload = decode_token(refresh_token.refresh_token)
+    if payload is None:
         raise CredentialsException()
     
-    user_service = UserService(db)
-    user = user_service.get_user_by_username(token_data.username)
+    username: str = payload.get("sub")
+    token_type: str = payload.get("type")
+    
+    if username is None or token_type != "refresh":
+        raise CredentialsException()
+    
+    token_data = TokenData(username=username)
+    
+    user_service = AsyncUserService(db)
+    user = await user_service.get_user_by_username(token_data.username)
     
     if user is None or not user.is_active:
         raise CredentialsException()
@@ -117,32 +116,49 @@ async def refresh_access_token(refresh_token: RefreshToken, db: Session = Depend
         "token_type": "bearer"
     }
 
-async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: Session = Depends(get_db)):
+async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: AsyncSession = Depends(get_async_db)) -> Principal:
     """Dependency to get the current authenticated user."""
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    # Tokens seen before skip signature verification until they expire
+    username = token_cache.get(token)
+    if username is None:
+        payload = decode_token(token)
+        if payload is None:
+            raise CredentialsException()
+        
         username: str = payload.get("sub")
         token_type: str = payload.get("type")
         
         if username is None or token_type != "access":
             raise CredentialsException()
-            
+        
         token_data = TokenData(username=username)
-    except JWTError:
-        raise CredentialsException()
-    
-    user_service = UserService(db)
-    user = user_service.get_user_by_username(token_data.username)
+        
+        cache_token_subject(token, token_data.username, payload.get("exp"))
     
-    if user is None:
-        raise CredentialsException()
+    principal = principal_cache.get(username)
+    if principal is None:
+        user_service = AsyncUserService(db)
+        user = await user_service.get_user_by_username(username)
+        
+        if user is None:
+            raise CredentialsException()
+        
+        principal = Principal.from_user(user)
+        principal_cache.set(username, principal)
     
     # Check if user is active
-    if not user.is_active:
+    if not principal.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User account is disabled",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    return user
\ No newline at end of file
+    return principal
+
+async def get_current_superuser(current_user: Principal = Depends(get_current_user)) -> Principal:
+    """Dependency allowing only superusers."""
+    if not current_user.is_superuser:
+        raise ForbiddenException()
+    
+    return current_user
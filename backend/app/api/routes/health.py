@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Response, status
+from app.core.startup import startup_state
+
+router = APIRouter()
+
+@router.get("/live")
+async def liveness():
+    """The process is up and serving requests."""
+    return {"status": "alive"}
+
+@router.get("/ready")
+async def readiness(response: Response):
+    """The startup warm-up has finished; answers 503 until then."""
+    if not startup_state.ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "starting", "startup": startup_state.phases}
+    
+    return {"status": "ready", "startup": startup_state.phases}
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends
+from app.api.routes.auth import get_current_superuser
+from app.core.metrics import latency_summary
+from app.core.security import principal_cache, token_cache
+from app.db.pool import pool_stats
+from app.db.session import async_engine, engine
+from app.services.feed_cache import public_feed_cache
+
+# Internals of the deployment: superusers only
+router = APIRouter(dependencies=[Depends(get_current_superuser)])
+
+@router.get("/stats")
+async def get_stats():
+    """Connection pool, cache and request latency statistics of this worker process."""
+    return {
+        "requests": latency_summary(),
+        "database": {
+            "sync": pool_stats(engine.pool),
+            "async": pool_stats(async_engine.pool),
+        },
+        "caches": {
+            "principals": principal_cache.stats(),
+            "tokens": token_cache.stats(),
+            "public_feed": public_feed_cache.stats(),
+        },
+    }
@@ -0,0 +1,17 @@
+import secrets
+from typing import Optional
+from fastapi import APIRouter, Header, Response
+from app.core.config import settings
+from app.core.exceptions import CredentialsException
+from app.core.metrics import CONTENT_TYPE, registry
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics(authorization: Optional[str] = Header(None)):
+    """Metrics of this worker process in the Prometheus text format."""
+    # Scrapers authenticate with a static bearer token
+    if not secrets.compare_digest(authorization or "", f"Bearer {settings.METRICS_TOKEN}"):
+        raise CredentialsException()
+    
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
@@ -1,22 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.db.session import get_db
-from app.services.route_service import RouteService
-from app.api.schemas.route import Route, RouteCreate, GPXImport
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status, UploadFile, File
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, Iterator, List, Optional, Union
+import itertools
+import os
+import re
+from app.core import metrics
+from app.core.config import settings
+from app.core.exceptions import PayloadTooLargeException, ValidationException
+from app.db.session import get_async_db
+from app.utils.etag import etag_matches, listing_etag, make_etag, version_of
+from app.utils.serialization import dumps, rows_to_dicts
+from app.services.feed_cache import public_feed_cache
+from app.services.gpx_import import read_gpx_archive
+from app.services.route_service import AsyncRouteService
+from app.api.schemas.route import BulkRouteCreate, BulkRouteItem, BulkRouteResult, GPXImportBatchResult, GPXImportItem, Route, RouteCreate, RoutePage, RouteSummary, RouteSummaryPage, GPXImport, NearbyRoute, Waypoint as WaypointSchema, WaypointEdits
 from app.api.routes.auth import get_current_user
-from app.db.models.user import User
+from app.core.security import Principal
 
 router = APIRouter()
 
 @router.post("/", response_model=Route, status_code=status.HTTP_201_CREATED)
 async def create_route(
     route_data: RouteCreate, 
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    route_service = RouteService(db)
+    route_service = AsyncRouteService(db)
     
     # Prepare data for service
     route_dict = route_data.dict(exclude={"waypoints"})
@@ -24,32 +36,154 @@ async def create_route(
     waypoints_data = [wp.dict() for wp in route_data.waypoints]
     
     # Create route
-    route = route_service.create_route(route_dict, waypoints_data)
-    return route
+    route = await route_service.create_route(route_dict, waypoints_data)
+    return _route_response(route, await route_service.get_route_waypoints(route), status_code=status.HTTP_201_CREATED)
 
-@router.get("/", response_model=List[Route])
+@router.post("/bulk", response_model=BulkRouteResult, status_code=status.HTTP_201_CREATED)
+async def create_routes_bulk(
+    response: Response,
+    bulk_data: BulkRouteCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    if len(bulk_data.routes) > settings.BULK_MAX_ROUTES:
+        raise ValidationException(f"A bulk request may contain at most {settings.BULK_MAX_ROUTES} routes")
+    
+    route_service = AsyncRouteService(db)
+    
+    # Validate each payload on its own so one bad item doesn't reject the batch
+    errors = {}
+    items = []
+    indexes = []
+    for index, payload in enumerate(bulk_data.routes):
+        try:
+            route_data = RouteCreate.parse_obj(payload)
+        except ValidationError as e:
+            errors[index] = _validation_message(e)
+            continue
+        route_dict = route_data.dict(exclude={"waypoints"})
+        route_dict["user_id"] = current_user.id
+        items.append((route_dict, [wp.dict() for wp in route_data.waypoints]))
+        indexes.append(index)
+    
+    results = {}
+    if not (bulk_data.atomic and errors):
+        results = dict(zip(indexes, await route_service.create_routes_bulk(items, atomic=bulk_data.atomic)))
+    
+    result_items = []
+    for index in range(len(bulk_data.routes)):
+        route_id, error = results.get(index, (None, errors.get(index)))
+        if route_id is None and error is None:
+            error = "Not created: another route in the atomic batch failed"
+        result_items.append(BulkRouteItem(index=index, id=route_id, error=error))
+    
+    created = sum(1 for item in result_items if item.id is not None)
+    if bulk_data.atomic and created == 0:
+        response.status_code = status.HTTP_400_BAD_REQUEST
+    return BulkRouteResult(created=created, failed=len(result_items) - created, items=result_items)
+
+@router.get("/", response_model=Union[RouteSummaryPage, RoutePage])
 async def get_routes(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-    public_only: bool = False
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+    public_only: bool = False,
+    include_waypoints: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    if_none_match: Optional[str] = Header(None)
 ):
-    route_service = RouteService(db)
+    route_service = AsyncRouteService(db)
     
     if public_only:
-        routes = route_service.get_public_routes()
+        # The public feed is shared by all users; serve it from the cache when possible
+        cache_key = public_feed_cache.key(cursor, limit, include_waypoints)
+        cached = public_feed_cache.get(cache_key)
+        if cached is not None:
+            etag, body = cached
+            if etag_matches(if_none_match, etag):
+                return _not_modified(etag)
+            return Response(content=body, media_type="application/json", headers=_cache_headers(etag))
+        
+        routes, next_cursor = await route_service.get_public_routes_page(
+            cursor=cursor, limit=limit, include_waypoints=include_waypoints
+        )
+    else:
+        routes, next_cursor = await route_service.get_user_routes_page(
+            current_user.id, cursor=cursor, limit=limit, include_waypoints=include_waypoints
+        )
+    
+    etag = listing_etag(
+        routes, "routes", None if public_only else current_user.id, include_waypoints, cursor, limit, next_cursor
+    )
+    if etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+    
+    # Serialize explicitly, matching RoutePage / RouteSummaryPage
+    if include_waypoints:
+        items = [_route_payload(route, await route_service.get_route_waypoints(route)) for route in routes]
+        floats = _payload_floats(items)
     else:
-        routes = route_service.get_user_routes(current_user.id)
+        items = rows_to_dicts(routes, SUMMARY_FIELDS)
+        floats = (item[name] for item in items for name in SUMMARY_FLOAT_FIELDS)
+    body = dumps({"items": items, "next_cursor": next_cursor}, floats)
+    if public_only:
+        public_feed_cache.set(cache_key, etag, body)
+    return Response(content=body, media_type="application/json", headers=_cache_headers(etag))
+
+@router.get("/viewport", response_model=List[RouteSummary])
+async def get_routes_in_viewport(
+    response: Response,
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180),
+    limit: int = Query(100, ge=1, le=500),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    route_service = AsyncRouteService(db)
+    routes = await route_service.find_public_routes_in_bbox(min_lat, min_lon, max_lat, max_lon, limit=limit)
     
+    etag = listing_etag(routes, "viewport", min_lat, min_lon, max_lat, max_lon, limit)
+    if etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+    response.headers.update(_cache_headers(etag))
     return routes
 
+@router.get("/nearby", response_model=List[NearbyRoute])
+async def get_nearby_routes(
+    response: Response,
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    k: int = Query(10, ge=1, le=100),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    route_service = AsyncRouteService(db)
+    nearest = await route_service.find_nearest_public_routes(lat, lon, k=k)
+    
+    etag = listing_etag([route for route, _ in nearest], "nearby", lat, lon, k)
+    if etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+    response.headers.update(_cache_headers(etag))
+    return [
+        NearbyRoute(**RouteSummary.from_orm(route).dict(), distance_km=distance)
+        for route, distance in nearest
+    ]
+
 @router.get("/{route_id}", response_model=Route)
 async def get_route(
     route_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    detail: Optional[int] = Query(None, ge=0, description="Level of detail, 0 is full resolution"),
+    tolerance: Optional[float] = Query(None, ge=0, description="Maximum simplification error in meters"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    route_service = RouteService(db)
-    route = route_service.get_route(route_id)
+    route_service = AsyncRouteService(db)
+    route = await route_service.get_route(route_id)
     
     if not route:
         raise HTTPException(
@@ -64,19 +198,60 @@ async def get_route(
             detail="Not authorized to access this route"
         )
     
-    return route
+    detail_level = route_service.resolve_detail_level(detail, tolerance)
+    
+    # The route row identifies the representation; answer revalidations before loading waypoints
+    etag = make_etag("route", route.id, version_of(route), detail_level)
+    if etag_matches(if_none_match, etag):
+        return _not_modified(etag, {"X-Route-Detail-Level": str(detail_level)})
+    
+    waypoints = await route_service.get_route_waypoints(route, detail_level)
+    headers = {"X-Route-Detail-Level": str(detail_level), **_cache_headers(etag)}
+    
+    return _route_response(route, waypoints, headers=headers)
+
+@router.get("/{route_id}/export.gpx", response_class=StreamingResponse)
+async def export_route_gpx(
+    route_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    route_service = AsyncRouteService(db)
+    route = await route_service.get_route(route_id)
+    
+    if not route:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Route not found"
+        )
+    
+    # Check if user has access
+    if route.user_id != current_user.id and not route.is_public:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this route"
+        )
+    
+    etag = make_etag("route-gpx", route.id, version_of(route))
+    if etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+    
+    # The session dependency is closed only after the body has been streamed
+    headers = {"Content-Disposition": f'attachment; filename="{_gpx_filename(route)}"', **_cache_headers(etag)}
+    return StreamingResponse(route_service.export_gpx(route), media_type="application/gpx+xml", headers=headers)
 
 @router.put("/{route_id}", response_model=Route)
 async def update_route(
     route_id: int,
     route_data: RouteCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    route_service = RouteService(db)
+    route_service = AsyncRouteService(db)
     
     # Check if route exists and belongs to user
-    existing_route = route_service.get_route(route_id)
+    existing_route = await route_service.get_route(route_id)
     if not existing_route:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -91,20 +266,52 @@ async def update_route(
     
     # Update route
     route_dict = route_data.dict(exclude={"waypoints"})
-    updated_route = route_service.update_route(route_id, route_dict)
+    updated_route = await route_service.update_route(route_id, route_dict)
     
-    return updated_route
+    return _route_response(updated_route, await route_service.get_route_waypoints(updated_route))
+
+@router.patch("/{route_id}/waypoints", response_model=RouteSummary)
+async def edit_route_waypoints(
+    route_id: int,
+    edits: WaypointEdits,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    if len(edits.operations) > settings.WAYPOINT_EDIT_MAX_OPERATIONS:
+        raise ValidationException(
+            f"A waypoint edit may contain at most {settings.WAYPOINT_EDIT_MAX_OPERATIONS} operations"
+        )
+    
+    route_service = AsyncRouteService(db)
+    
+    # Check if route exists and belongs to user
+    existing_route = await route_service.get_route(route_id)
+    if not existing_route:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Route not found"
+        )
+    
+    if existing_route.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to update this route"
+        )
+    
+    # Only the summary is returned: echoing every waypoint would cost what the edit saved
+    operations = [operation.dict(exclude_unset=True) for operation in edits.operations]
+    return await route_service.edit_waypoints(route_id, operations)
 
 @router.delete("/{route_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_route(
     route_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    route_service = RouteService(db)
+    route_service = AsyncRouteService(db)
     
     # Check if route exists and belongs to user
-    existing_route = route_service.get_route(route_id)
+    existing_route = await route_service.get_route(route_id)
     if not existing_route:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -118,7 +325,7 @@ async def delete_route(
         )
     
     # Delete route
-    route_service.delete_route(route_id)
+    await route_service.delete_route(route_id)
     return None
 
 @router.post("/import-gpx", response_model=Route)
@@ -127,26 +334,134 @@ async def import_gpx_file(
     description: Optional[str] = None,
     is_public: bool = False,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    route_service = RouteService(db)
+    route_service = AsyncRouteService(db)
     
-    # Read GPX file content
-    gpx_content = await file.read()
+    # Reject oversized uploads before parsing; the upload is already spooled to disk
+    if _upload_size(file) > settings.GPX_MAX_UPLOAD_BYTES:
+        raise PayloadTooLargeException(settings.GPX_MAX_UPLOAD_BYTES)
     
     try:
-        # Import GPX and create route
-        route = route_service.import_gpx(
+        # Stream the spooled upload straight into the importer
+        route = await route_service.import_gpx_stream(
             user_id=current_user.id,
-            gpx_content=gpx_content.decode('utf-8'),
+            source=file.file,
             name=name,
             description=description,
             is_public=is_public
         )
-        return route
+        return _route_response(route, await route_service.get_route_waypoints(route))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error importing GPX file: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.post("/import-gpx/bulk", response_model=GPXImportBatchResult, status_code=status.HTTP_201_CREATED)
+async def import_gpx_files(
+    description: Optional[str] = None,
+    is_public: bool = False,
+    files: List[UploadFile] = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    route_service = AsyncRouteService(db)
+    
+    # Collect the GPX documents of every upload; ZIP archives are expanded
+    documents = []
+    budget = settings.GPX_MAX_UPLOAD_BYTES
+    for file in files:
+        size = _upload_size(file)
+        if size > budget:
+            raise PayloadTooLargeException(settings.GPX_MAX_UPLOAD_BYTES)
+        
+        if _is_zip(file):
+            try:
+                members = await run_in_threadpool(
+                    read_gpx_archive, file.file, settings.GPX_IMPORT_MAX_FILES - len(documents), budget
+                )
+            except ValueError as e:
+                raise ValidationException(f"{file.filename}: {str(e)}")
+            documents.extend(members)
+            budget -= sum(len(data) for _, data in members)
+        else:
+            documents.append((file.filename or f"file-{len(documents) + 1}.gpx", await file.read()))
+            budget -= size
+        
+        if len(documents) > settings.GPX_IMPORT_MAX_FILES:
+            raise ValidationException(f"An import may contain at most {settings.GPX_IMPORT_MAX_FILES} GPX files")
+    
+    results = await route_service.import_gpx_files(current_user.id, documents, description, is_public)
+    
+    created = sum(1 for result in results if result.route_id is not None)
+    return GPXImportBatchResult(
+        created=created,
+        failed=len(results) - created,
+        items=[GPXImportItem(filename=result.filename, id=result.route_id, error=result.error) for result in results]
+    )
+
+# Field order of the response schemas; the fast path emits the same keys in the same order
+SUMMARY_FIELDS = tuple(RouteSummary.__fields__)
+SUMMARY_FLOAT_FIELDS = tuple(name for name, field in RouteSummary.__fields__.items() if field.type_ is float)
+WAYPOINT_FIELDS = tuple(WaypointSchema.__fields__)
+WAYPOINT_FLOAT_FIELDS = tuple(name for name, field in WaypointSchema.__fields__.items() if field.type_ is float)
+
+def _route_payload(route, waypoints) -> Dict[str, Any]:
+    """Build the Route schema payload from a route and waypoint rows without instantiating models."""
+    payload = {name: getattr(route, name) for name in SUMMARY_FIELDS}
+    payload["waypoints"] = rows_to_dicts(waypoints, WAYPOINT_FIELDS)
+    metrics.WAYPOINTS_SERVED.inc(len(waypoints))
+    return payload
+
+def _payload_floats(payloads: List[Dict[str, Any]]) -> Iterator[float]:
+    """Every float of a list of route payloads, for the serializer's compatibility check."""
+    return itertools.chain(
+        (payload[name] for payload in payloads for name in SUMMARY_FLOAT_FIELDS),
+        (waypoint[name] for payload in payloads for waypoint in payload["waypoints"] for name in WAYPOINT_FLOAT_FIELDS),
+    )
+
+def _route_response(route, waypoints, status_code: int = status.HTTP_200_OK, headers: Optional[dict] = None) -> Response:
+    """
+    Serialize a route with an explicit waypoint list, byte-identical to the Route response model.
+    
+    Skips per-waypoint model instantiation and encodes with orjson.
+    """
+    payload = _route_payload(route, waypoints)
+    body = dumps(payload, _payload_floats([payload]))
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
+
+def _validation_message(error: ValidationError) -> str:
+    """Flatten pydantic errors into one line, e.g. "waypoints.0.latitude: field required"."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors()
+    )
+
+def _cache_headers(etag: str) -> dict:
+    """Headers letting clients revalidate a per-user response with If-None-Match."""
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+def _not_modified(etag: str, headers: Optional[dict] = None) -> Response:
+    """Build a 304 response for a client whose copy is current."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={**_cache_headers(etag), **(headers or {})})
+
+def _upload_size(file: UploadFile) -> int:
+    """Return the size in bytes of a spooled upload."""
+    if file.size is not None:
+        return file.size
+    
+    file.file.seek(0, os.SEEK_END)
+    size = file.file.tell()
+    file.file.seek(0)
+    return size
+
+def _is_zip(file: UploadFile) -> bool:
+    """Whether an upload is a ZIP archive rather than a single GPX document."""
+    filename = (file.filename or "").lower()
+    return filename.endswith(".zip") or file.content_type in ("application/zip", "application/x-zip-compressed")
+
+def _gpx_filename(route) -> str:
+    """Download file name of a route's GPX export, restricted to safe header characters."""
+    stem = re.sub(r"[^A-Za-z0-9._-]+", "-", route.name).strip("-.") or f"route-{route.id}"
+    return f"{stem[:100]}.gpx"
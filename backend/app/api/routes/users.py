@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Optional
+from app.core.config import settings
 from app.db.session import get_db
 from app.services.user_service import UserService
-from app.api.schemas.user import UserCreate, UserUpdate, UserResponse
+from app.api.schemas.user import UserCreate, UserUpdate, UserResponse, UserPage
 
 router = APIRouter()
 
@@ -18,11 +19,15 @@ def create_user(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     return user_service.create_user(user_data.dict())
 
-@router.get("/", response_model=List[UserResponse])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/", response_model=UserPage)
+def read_users(
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
     user_service = UserService(db)
-    users = user_service.get_users(skip=skip, limit=limit)
-    return users
+    users, next_cursor = user_service.get_users_page(cursor=cursor, limit=limit)
+    return {"items": users, "next_cursor": next_cursor}
 
 @router.get("/{user_id}", response_model=UserResponse)
 def read_user(user_id: int, db: Session = Depends(get_db)):
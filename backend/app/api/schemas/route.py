@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional
 from datetime import datetime
 
 class WaypointBase(BaseModel):
@@ -11,8 +11,13 @@ class WaypointBase(BaseModel):
 class WaypointCreate(WaypointBase):
     pass
 
+class WaypointPoint(BaseModel):
+    name: Optional[str] = None
+    latitude: float
+    longitude: float
+
 class Waypoint(WaypointBase):
-    id: int
+    id: Optional[int] = None  # None for points of a packed geometry without a waypoint row
     route_id: int
     
     class Config:
@@ -31,18 +36,77 @@ class RouteBase(BaseModel):
 class RouteCreate(RouteBase):
     waypoints: List[WaypointCreate]
 
-class Route(RouteBase):
+class RouteSummary(RouteBase):
     id: int
     user_id: int
+    min_lat: Optional[float] = None
+    min_lon: Optional[float] = None
+    max_lat: Optional[float] = None
+    max_lon: Optional[float] = None
+    center_lat: Optional[float] = None
+    center_lon: Optional[float] = None
+    waypoint_count: Optional[int] = None
+    segment_count: Optional[int] = None
     created_at: datetime
     updated_at: datetime
-    waypoints: List[Waypoint] = []
     
     class Config:
         orm_mode = True
 
+class Route(RouteSummary):
+    waypoints: List[Waypoint] = []
+
+class RoutePage(BaseModel):
+    items: List[Route]
+    next_cursor: Optional[str] = None
+
+class RouteSummaryPage(BaseModel):
+    items: List[RouteSummary]
+    next_cursor: Optional[str] = None
+
+class NearbyRoute(RouteSummary):
+    distance_km: float
+
+class WaypointEdit(BaseModel):
+    # insert: waypoints before index; move: latitude/longitude (and name) of index; delete: index up to end
+    op: Literal["insert", "move", "delete"]
+    index: int = Field(..., ge=0)
+    end: Optional[int] = Field(None, ge=1)
+    waypoints: Optional[List[WaypointPoint]] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    name: Optional[str] = None
+
+class WaypointEdits(BaseModel):
+    operations: List[WaypointEdit] = Field(..., min_items=1)
+
 class GPXImport(BaseModel):
     file_content: str
     name: str
     description: Optional[str] = None
-    is_public: bool = False
\ No newline at end of file
+    is_public: bool = False
+
+class BulkRouteCreate(BaseModel):
+    # Items are RouteCreate payloads, validated one by one so a bad item only fails itself
+    routes: List[Dict[str, Any]] = Field(..., min_items=1)
+    atomic: bool = False
+
+class BulkRouteItem(BaseModel):
+    index: int
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class BulkRouteResult(BaseModel):
+    created: int
+    failed: int
+    items: List[BulkRouteItem]
+
+class GPXImportItem(BaseModel):
+    filename: str
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class GPXImportBatchResult(BaseModel):
+    created: int
+    failed: int
+    items: List[GPXImportItem]
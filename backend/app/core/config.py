@@ -1,4 +1,5 @@
 import os
+from typing import Optional
 from pydantic import BaseSettings
 
 class Settings(BaseSettings):
@@ -10,6 +11,96 @@ class Settings(BaseSettings):
     # Database settings
     DATABASE_URL: str = os.getenv("DATABASE_URL", "postgresql://postgres:postgres@db:5432/terradb")
     
+    # Connection pool settings, applied to both the sync and the async engine, so a
+    # worker holds at most 2 * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    
+    # Async pool connections opened by the startup warm-up before the readiness
+    # probe passes (at most DB_POOL_SIZE; 0 connects on the first request)
+    STARTUP_WARM_CONNECTIONS: int = 5
+    
+    # SQL profiling: statement timing, slow-query log and per-request N+1 detection.
+    # Off by default because every statement pays for it; development and test
+    # environments turn it on
+    SQL_PROFILING_ENABLED: bool = False
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    N_PLUS_ONE_THRESHOLD: int = 10
+    
+    # Public route feed cache: "redis" (shared, needs the redis package and
+    # REDIS_URL), "memory" (per process), "local-redis" (in-process stand-in),
+    # "none", or "auto" for redis when REDIS_URL is set and memory otherwise.
+    # Per-process caches only see their own invalidations, so their pages live
+    # FEED_CACHE_LOCAL_TTL_SECONDS: other workers may serve a changed feed that long
+    FEED_CACHE_BACKEND: str = "auto"
+    FEED_CACHE_TTL_SECONDS: float = 300.0
+    FEED_CACHE_LOCAL_TTL_SECONDS: float = 5.0
+    FEED_CACHE_MAX_ENTRIES: int = 256
+    FEED_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    REDIS_URL: Optional[str] = None
+    
+    # Internal endpoints (pool and cache statistics), for superusers only
+    INTERNAL_ENDPOINTS_ENABLED: bool = False
+    
+    # Request metrics middleware and the Prometheus /metrics endpoint. The endpoint
+    # is only served when METRICS_TOKEN is set, and scrapers must send
+    # "Authorization: Bearer <token>"
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: Optional[str] = None
+    
+    # GPX import settings
+    GPX_MAX_UPLOAD_BYTES: int = 100 * 1024 * 1024
+    GPX_IMPORT_CHUNK_SIZE: int = 5000
+    
+    # Multi-file and archive GPX import: documents are parsed on a pool of
+    # GPX_IMPORT_WORKERS processes (0 parses inline) and stored in transactions
+    # of GPX_IMPORT_BATCH_SIZE routes. Every server worker starts its own pool,
+    # so size this to the container's CPU limit divided by the number of server
+    # workers; os.cpu_count() reports the node's CPUs, not the container's share
+    GPX_IMPORT_WORKERS: int = 2
+    GPX_IMPORT_BATCH_SIZE: int = 50
+    GPX_IMPORT_MAX_FILES: int = 500
+    
+    # Waypoints per chunk of a streamed GPX export
+    GPX_EXPORT_CHUNK_SIZE: int = 5000
+    
+    # Maximum number of routes in one bulk creation request
+    BULK_MAX_ROUTES: int = 500
+    
+    # Maximum number of operations in one waypoint edit request
+    WAYPOINT_EDIT_MAX_OPERATIONS: int = 1000
+    
+    # Route geometry levels of detail: simplification tolerances in meters, level 0 is full resolution
+    ROUTE_DETAIL_TOLERANCES: list = [0.0, 5.0, 25.0, 100.0, 500.0]
+    
+    # Waypoint storage for new routes: "rows" (one row per waypoint) or "packed"
+    # (one binary geometry per route, named waypoints kept as sparse rows)
+    WAYPOINT_STORAGE: str = "rows"
+    PACKED_GEOMETRY_ENCODING: str = "delta"
+    
+    # Spatial index settings
+    SPATIAL_INDEX_PRECISION: int = 8
+    SPATIAL_QUERY_MAX_CELLS: int = 32
+    SPATIAL_NEARBY_START_PRECISION: int = 6
+    
+    # Pagination settings
+    DEFAULT_PAGE_SIZE: int = 50
+    MAX_PAGE_SIZE: int = 200
+    
+    # Password hashing settings: bcrypt runs on a bounded "thread" or "process"
+    # pool so async handlers never block the event loop; 0 workers hashes inline.
+    # bcrypt releases the GIL, so threads suffice; process workers are spawned,
+    # not forked, and import the hashing modules when they start
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    
+    # Authenticated principal cache (per process); 0 entries disables it
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    
     # CORS settings
     CORS_ORIGINS: list = ["*"]
     
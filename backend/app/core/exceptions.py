@@ -58,4 +58,22 @@ class DuplicateResourceException(BaseAppException):
         super().__init__(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"{resource_type} with {field} '{value}' already exists",
+        )
+
+
+class ConflictException(BaseAppException):
+    """Exception raised when a resource changed in a way that prevents the request."""
+    def __init__(self, detail: str):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=detail,
+        )
+
+
+class PayloadTooLargeException(BaseAppException):
+    """Exception raised when an uploaded payload exceeds the configured size limit."""
+    def __init__(self, max_bytes: int):
+        super().__init__(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Uploaded file exceeds the maximum size of {max_bytes} bytes",
         )
\ No newline at end of file
@@ -0,0 +1,301 @@
+"""
+Process-local metrics for the TERRA App, exposed in the Prometheus text format.
+
+Metrics are registered once at import time and updated with a dictionary lookup
+and a lock per observation, cheap enough to leave enabled in production. Each
+worker process exposes its own values; Prometheus aggregates them across pods.
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds of the default latency buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Upper bounds of the default response size buckets in bytes
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class Metric(ABC):
+    """Base class of labelled metrics."""
+
+    type_name = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _labels(self, label_values: LabelValues, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.label_names, label_values))
+        if extra is not None:
+            pairs.append(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + '}'
+
+    @abstractmethod
+    def samples(self) -> Iterable[str]:
+        """Sample lines of the metric in the Prometheus text format."""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self.samples())
+        return lines
+
+
+class Counter(Metric):
+    """Monotonically increasing value."""
+
+    type_name = 'counter'
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, *label_values: str) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def samples(self) -> Iterable[str]:
+        for label_values, value in sorted(self._values.items()):
+            yield f"{self.name}{self._labels(label_values)} {_format_value(value)}"
+
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+
+    type_name = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, *label_values: str) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, *label_values: str) -> None:
+        self.inc(-amount, *label_values)
+
+    def set(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            self._values[label_values] = value
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def samples(self) -> Iterable[str]:
+        if not self._values and not self.label_names:
+            yield f"{self.name} 0"
+        for label_values, value in sorted(self._values.items()):
+            yield f"{self.name}{self._labels(label_values)} {_format_value(value)}"
+
+
+class Histogram(Metric):
+    """Distribution of observations in fixed buckets, with sum and count."""
+
+    type_name = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (last one is +Inf), sum, count]
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *label_values: str) -> int:
+        series = self._series.get(label_values)
+        return series[2] if series else 0
+
+    def quantile(self, q: float, *label_values: str) -> Optional[float]:
+        """
+        Estimate a quantile by linear interpolation inside the containing bucket.
+
+        Args:
+            q: Quantile between 0 and 1
+            *label_values: Label values of the series
+
+        Returns:
+            Optional[float]: The estimate (the largest finite bound when it falls
+            in the +Inf bucket), or None when nothing was observed
+        """
+        series = self._series.get(label_values)
+        if not series or series[2] == 0:
+            return None
+
+        rank = q * series[2]
+        cumulative = 0
+        lower = 0.0
+        for bound, bucket_count in zip(self.buckets, series[0]):
+            if bucket_count and cumulative + bucket_count >= rank:
+                return lower + (bound - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+            lower = bound
+        return self.buckets[-1]
+
+    def label_sets(self) -> List[LabelValues]:
+        return sorted(self._series)
+
+    def samples(self) -> Iterable[str]:
+        for label_values, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket{self._labels(label_values, ('le', _format_value(bound)))} {cumulative}"
+            yield f"{self.name}_sum{self._labels(label_values)} {_format_value(total)}"
+            yield f"{self.name}_count{self._labels(label_values)} {count}"
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+# HTTP metrics, labelled by route template so path parameters don't create new series
+HTTP_REQUESTS = registry.register(Counter(
+    'terra_http_requests_total', 'HTTP requests by method, route template and status code.',
+    ('method', 'route', 'status')
+))
+HTTP_REQUEST_DURATION = registry.register(Histogram(
+    'terra_http_request_duration_seconds', 'HTTP request latency in seconds.', ('method', 'route')
+))
+HTTP_RESPONSE_SIZE = registry.register(Histogram(
+    'terra_http_response_size_bytes', 'HTTP response body size in bytes.', ('method', 'route'), buckets=SIZE_BUCKETS
+))
+HTTP_REQUESTS_IN_FLIGHT = registry.register(Gauge(
+    'terra_http_requests_in_flight', 'HTTP requests currently being served.'
+))
+
+# Domain metrics
+GPX_POINTS_IMPORTED = registry.register(Counter(
+    'terra_gpx_points_imported_total', 'Track points stored by GPX imports.'
+))
+GPX_IMPORTS = registry.register(Counter(
+    'terra_gpx_imports_total', 'GPX imports by outcome.', ('outcome',)
+))
+ROUTES_CREATED = registry.register(Counter(
+    'terra_routes_created_total', 'Routes created through the API or GPX import.'
+))
+WAYPOINTS_SERVED = registry.register(Counter(
+    'terra_waypoints_served_total', 'Waypoints included in route responses.'
+))
+WAYPOINT_EDITS = registry.register(Counter(
+    'terra_waypoint_edits_total', 'Waypoint insert, move and delete operations applied to routes.'
+))
+
+# Startup metrics
+STARTUP_SECONDS = registry.register(Gauge(
+    'terra_startup_seconds', 'Seconds from the application starting to load until each startup phase completed.',
+    ('phase',)
+))
+
+UNMATCHED_ROUTE = '<unmatched>'
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request count, latency and response size per route template.
+
+    Requests that match no route are grouped under a single ``<unmatched>`` label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+        response_size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, response_size
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            elif message['type'] == 'http.response.body':
+                response_size += len(message.get('body', b''))
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = scope.get('route')
+            template = getattr(route, 'path', None) or UNMATCHED_ROUTE
+            method = scope['method']
+            HTTP_REQUESTS.inc(1, method, template, str(status_code))
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, method, template)
+            HTTP_RESPONSE_SIZE.observe(response_size, method, template)
+
+
+def latency_summary(quantiles: Sequence[float] = (0.5, 0.95, 0.99)) -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    Estimated latency quantiles per route, for human inspection.
+
+    Args:
+        quantiles: Quantiles to estimate
+
+    Returns:
+        Dict[str, Dict[str, Optional[float]]]: ``"METHOD template"`` -> ``{"count", "p50", ...}``
+        with latencies in milliseconds
+    """
+    summary = {}
+    for method, route in HTTP_REQUEST_DURATION.label_sets():
+        entry = {'count': HTTP_REQUEST_DURATION.count(method, route)}
+        for q in quantiles:
+            value = HTTP_REQUEST_DURATION.quantile(q, method, route)
+            entry[f"p{round(q * 100):g}"] = None if value is None else value * 1000
+        summary[f"{method} {route}"] = entry
+    return summary
@@ -1,11 +1,30 @@
-from passlib.context import CryptContext
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from jose import jwt
+import asyncio
+import multiprocessing
 import os
+import time
 from typing import Optional, Dict, Any
+from app.core.config import settings
+from app.utils.cache import TTLCache
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# passlib (with bcrypt) and jose, with its RSA and ECDSA backends, are slow to
+# import; they are loaded on first use, or ahead of traffic by the startup warm-up
+_pwd_context = None
+
+def get_password_context():
+    """Return the password hashing context, creating it on first use."""
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
+
+def load_security_modules() -> None:
+    """Import the password hashing and JWT libraries now instead of on the first request."""
+    get_password_context()
+    import jose.jwt  # noqa: F401
 
 # JWT settings
 SECRET_KEY = os.getenv("JWT_SECRET_KEY")
@@ -21,14 +40,54 @@ REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_password_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Generate a hash for the given password."""
-    return pwd_context.hash(password)
+    return get_password_context().hash(password)
+
+# Bounded pool for bcrypt, created on first use
+_hash_executor: Optional[Executor] = None
+
+def get_password_executor() -> Optional[Executor]:
+    """Return the password hashing pool, or None when hashing runs inline."""
+    global _hash_executor
+    if _hash_executor is None and settings.PASSWORD_HASH_WORKERS > 0:
+        if settings.PASSWORD_HASH_EXECUTOR == "process":
+            # Spawn rather than fork: forking the running server copies locks held by its other threads
+            _hash_executor = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        else:
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+            )
+    return _hash_executor
+
+def shutdown_password_executor() -> None:
+    """Shut down the password hashing pool."""
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=True)
+        _hash_executor = None
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash without blocking the event loop."""
+    executor = get_password_executor()
+    if executor is None:
+        return verify_password(plain_password, hashed_password)
+    return await asyncio.get_running_loop().run_in_executor(executor, verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Generate a hash for the given password without blocking the event loop."""
+    executor = get_password_executor()
+    if executor is None:
+        return get_password_hash(password)
+    return await asyncio.get_running_loop().run_in_executor(executor, get_password_hash, password)
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """Create a new JWT access token."""
+    from jose import jwt
     to_encode = data.copy()
     
     if expires_delta:
@@ -43,10 +102,54 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
 
 def create_refresh_token(data: Dict[str, Any]) -> str:
     """Create a new JWT refresh token with longer expiry."""
+    from jose import jwt
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
     
     to_encode.update({"exp": expire, "type": "refresh"})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     
-    return encoded_jwt
\ No newline at end of file
+    return encoded_jwt
+
+def decode_token(token: str) -> Optional[Dict[str, Any]]:
+    """Verify a JWT and return its claims, or None if it is invalid or expired."""
+    from jose import JWTError, jwt
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+
+@dataclass(frozen=True)
+class Principal:
+    """Lightweight snapshot of an authenticated user, safe to share between requests."""
+    id: int
+    username: str
+    email: str
+    is_active: bool
+    is_superuser: bool
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            is_active=bool(user.is_active),
+            is_superuser=bool(user.is_superuser),
+        )
+
+# User fields captured in a Principal; changing any of them invalidates the cached snapshot
+PRINCIPAL_FIELDS = frozenset({"username", "email", "is_active", "is_superuser"})
+
+# Verified access tokens -> subject, and subject -> principal snapshot
+token_cache: TTLCache[str] = TTLCache(settings.PRINCIPAL_CACHE_MAX_ENTRIES, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+principal_cache: TTLCache[Principal] = TTLCache(settings.PRINCIPAL_CACHE_MAX_ENTRIES, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+def cache_token_subject(token: str, username: str, expires_at: Optional[float]) -> None:
+    """Remember the subject of a verified access token until it expires."""
+    ttl = None if expires_at is None else expires_at - time.time()
+    token_cache.set(token, username, ttl=ttl)
+
+def invalidate_principal(username: str) -> None:
+    """Drop the cached snapshot of a user so the next request reloads it."""
+    principal_cache.invalidate(username)
@@ -0,0 +1,147 @@
+"""
+Startup timing and warm-up.
+
+Timings are seconds since the application started loading (this module is the
+first one ``main`` imports): ``imported`` once the app object exists, ``ready``
+once the warm-up has finished and the readiness probe passes, and
+``first_request`` once the first request other than a health probe has been
+served. Each is logged and exported as ``terra_startup_seconds``.
+
+The warm-up runs in the background after the server starts, so the liveness
+probe answers at once while the readiness probe keeps traffic away until the
+first requests no longer pay for connecting to the database, configuring the
+SQLAlchemy mappers or importing the security libraries.
+"""
+
+import time
+
+# Taken before any other import so that their cost counts towards startup
+_STARTED = time.perf_counter()
+
+import asyncio
+import logging
+from typing import Dict, Optional
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Delay between warm-up attempts while the database is unreachable, doubling up to the maximum
+RETRY_DELAY_SECONDS = 0.5
+MAX_RETRY_DELAY_SECONDS = 10.0
+
+
+class StartupState:
+    """Startup phase timings of this worker process."""
+
+    def __init__(self, started: float):
+        self.started = started
+        self.phases: Dict[str, float] = {}
+
+    @property
+    def ready(self) -> bool:
+        return "ready" in self.phases
+
+    def mark(self, phase: str) -> float:
+        """Record that a phase completed now and return its time since start in seconds."""
+        seconds = time.perf_counter() - self.started
+        self.phases[phase] = round(seconds, 4)
+        metrics.STARTUP_SECONDS.set(seconds, phase)
+        logger.info(f"Startup phase '{phase}' completed after {seconds * 1000:.0f} ms")
+        return seconds
+
+
+startup_state = StartupState(_STARTED)
+
+_warm_up_task: Optional[asyncio.Task] = None
+
+
+async def warm_up() -> None:
+    """
+    Prepare the process for traffic, then mark it ready.
+
+    Mapper configuration and the deferred imports run in a worker thread while
+    the event loop opens ``settings.STARTUP_WARM_CONNECTIONS`` connections of
+    the async pool concurrently, so the CPU work overlaps the round trips.
+    Opening connections is retried until the database is reachable.
+    """
+    prepare = asyncio.get_running_loop().run_in_executor(None, _prepare_process)
+
+    delay = RETRY_DELAY_SECONDS
+    while True:
+        try:
+            await _open_pool_connections()
+            break
+        except Exception as e:
+            logger.warning(f"Warm-up could not connect to the database, retrying in {delay:.1f} s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RETRY_DELAY_SECONDS)
+
+    try:
+        await prepare
+    except Exception:
+        logger.exception("Warm-up failed; the readiness probe will keep failing")
+        raise
+    startup_state.mark("ready")
+
+
+def _prepare_process() -> None:
+    """CPU-bound warm-up: configure the ORM mappers and import the lazily loaded libraries."""
+    from sqlalchemy.orm import configure_mappers
+    from app.core.security import load_security_modules
+
+    configure_mappers()
+    load_security_modules()
+
+
+async def _open_pool_connections() -> None:
+    """Open pool connections of the async engine concurrently and return them to the pool."""
+    from app.db.session import async_engine
+
+    count = min(settings.STARTUP_WARM_CONNECTIONS, settings.DB_POOL_SIZE)
+    if count <= 0:
+        return
+
+    connections = [async_engine.connect() for _ in range(count)]
+    try:
+        await asyncio.gather(*(connection.start() for connection in connections))
+        await asyncio.gather(*(connection.exec_driver_sql("SELECT 1") for connection in connections))
+    finally:
+        await asyncio.gather(*(connection.close() for connection in connections), return_exceptions=True)
+    logger.info(f"Opened {count} database connections")
+
+
+def start_warm_up() -> None:
+    """Run the warm-up in the background; the readiness probe fails until it has finished."""
+    global _warm_up_task
+    _warm_up_task = asyncio.get_running_loop().create_task(warm_up())
+
+
+def stop_warm_up() -> None:
+    """Cancel a warm-up that is still running, e.g. on shutdown while the database is unreachable."""
+    if _warm_up_task is not None and not _warm_up_task.done():
+        _warm_up_task.cancel()
+
+
+class FirstRequestMiddleware:
+    """
+    Record when the first request other than a health probe has been served.
+
+    Pure ASGI and a single flag check per request once the time is recorded.
+    """
+
+    def __init__(self, app: ASGIApp, probe_prefix: str):
+        self.app = app
+        self.probe_prefix = probe_prefix
+        self.recorded = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.recorded or scope["type"] != "http" or scope["path"].startswith(self.probe_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+        if not self.recorded:
+            self.recorded = True
+            startup_state.mark("first_request")
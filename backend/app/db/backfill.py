@@ -0,0 +1,78 @@
+"""
+Backfill derived route data for routes stored before it existed.
+
+Before the first run on an existing database, create the spatial index table
+(``create_all`` adds missing tables) and, on PostgreSQL, make sure its geohash
+columns use the bytewise collation the prefix scans rely on::
+
+    ALTER TABLE route_spatial_index ALTER COLUMN cell TYPE VARCHAR(12) COLLATE "C";
+    ALTER TABLE route_spatial_index ALTER COLUMN start_geohash TYPE VARCHAR(12) COLLATE "C";
+
+The geometry summary columns of ``routes`` are not added by ``create_all``::
+
+    ALTER TABLE routes ADD COLUMN min_lat DOUBLE PRECISION;
+    ALTER TABLE routes ADD COLUMN min_lon DOUBLE PRECISION;
+    ALTER TABLE routes ADD COLUMN max_lat DOUBLE PRECISION;
+    ALTER TABLE routes ADD COLUMN max_lon DOUBLE PRECISION;
+    ALTER TABLE routes ADD COLUMN center_lat DOUBLE PRECISION;
+    ALTER TABLE routes ADD COLUMN center_lon DOUBLE PRECISION;
+    ALTER TABLE routes ADD COLUMN waypoint_count INTEGER;
+    ALTER TABLE routes ADD COLUMN segment_count INTEGER;
+    CREATE INDEX ix_routes_bbox ON routes (min_lat, max_lat, min_lon, max_lon);
+
+Waypoint edits need the distance of every waypoint from the previous one and
+look waypoints up by position::
+
+    ALTER TABLE waypoints ADD COLUMN segment_distance DOUBLE PRECISION;
+    CREATE INDEX ix_waypoints_route_id_order ON waypoints (route_id, "order");
+
+Waypoint edits re-estimate the travel time from ``routes.travel_mode``. Routes
+stored before the column existed have none, so edits keep their travel time::
+
+    ALTER TABLE routes ADD COLUMN travel_mode VARCHAR;
+
+Usage::
+
+    python -m app.db.backfill spatial-index
+    python -m app.db.backfill summaries
+    python -m app.db.backfill segment-distances
+
+Only routes that are missing the data are processed, so the backfill can be
+rerun safely.
+"""
+
+import argparse
+import logging
+
+from app.db.session import SessionLocal
+from app.services.route_service import RouteService
+
+logger = logging.getLogger(__name__)
+
+# Backfill target -> RouteService method that fills it in
+TARGETS = {
+    "spatial-index": RouteService.rebuild_spatial_index,
+    "summaries": RouteService.rebuild_route_summaries,
+    "segment-distances": RouteService.rebuild_segment_distances,
+}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Backfill derived route data for existing routes.")
+    parser.add_argument("target", choices=list(TARGETS))
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        route_service = RouteService(db)
+        count = TARGETS[args.target](route_service)
+        print(f"Backfilled {args.target} for {count} routes")
+    finally:
+        db.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(main())
@@ -0,0 +1,65 @@
+"""
+Convert stored routes between per-row and packed waypoint storage.
+
+Before the first run on an existing database, add the storage columns::
+
+    ALTER TABLE routes ADD COLUMN waypoint_storage VARCHAR NOT NULL DEFAULT 'rows';
+    ALTER TABLE routes ADD COLUMN geometry BYTEA;
+
+Databases created before waypoints had levels of detail need the column and
+its index; existing waypoints get level 0, so those routes are served at full
+resolution at every level::
+
+    ALTER TABLE waypoints ADD COLUMN detail_level SMALLINT NOT NULL DEFAULT 0;
+    CREATE INDEX ix_waypoints_route_id_detail_level ON waypoints (route_id, detail_level);
+
+The bulk insert path (COPY on PostgreSQL) relies on the database default of
+``waypoints.detail_level``; databases that already have the column without a
+default need::
+
+    ALTER TABLE waypoints ALTER COLUMN detail_level SET DEFAULT 0;
+
+Usage::
+
+    python -m app.db.migrate_waypoints pack [--route-id ID ...]
+    python -m app.db.migrate_waypoints unpack [--route-id ID ...]
+
+Each route is converted in its own transaction, so the migration can be
+interrupted and resumed. Set ``WAYPOINT_STORAGE=packed`` to store new routes packed.
+"""
+
+import argparse
+import logging
+
+from app.db.session import SessionLocal
+from app.services.route_service import RouteService
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Convert routes between per-row and packed waypoint storage.")
+    parser.add_argument("direction", choices=["pack", "unpack"])
+    parser.add_argument("--route-id", type=int, action="append", dest="route_ids",
+                        help="Route to convert (repeatable); defaults to every route in the other format")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        route_service = RouteService(db)
+        source = "rows" if args.direction == "pack" else "packed"
+        route_ids = args.route_ids or route_service.repository.get_route_ids_by_storage(source)
+        convert = route_service.pack_route if args.direction == "pack" else route_service.unpack_route
+
+        converted = sum(1 for route_id in route_ids if convert(route_id))
+        logger.info(f"Converted {converted} of {len(route_ids)} routes ({args.direction})")
+        print(f"Converted {converted} of {len(route_ids)} routes ({args.direction})")
+    finally:
+        db.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(main())
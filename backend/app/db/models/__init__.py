@@ -1,4 +1,4 @@
 # Import all models here
 from app.db.models.base import Base, BaseModel
 from app.db.models.user import User
-from app.db.models.route import Route, Waypoint
\ No newline at end of file
+from app.db.models.route import Route, Waypoint, RouteSpatialIndex
\ No newline at end of file
@@ -1,6 +1,10 @@
-from sqlalchemy import Column, String, Float, Integer, ForeignKey, Text, Boolean
-from sqlalchemy.orm import relationship
-from app.db.models.base import BaseModel
+from sqlalchemy import Column, String, Float, Integer, SmallInteger, ForeignKey, Text, Boolean, Index, LargeBinary
+from sqlalchemy.orm import deferred, relationship
+from app.db.models.base import Base, BaseModel
+
+# Geohash columns are searched with prefix range scans, which need bytewise ordering;
+# PostgreSQL would otherwise compare them with the database's (linguistic) collation
+GeohashString = String(12).with_variant(String(12, collation="C"), "postgresql")
 
 class Route(BaseModel):
     __tablename__ = "routes"
@@ -12,12 +16,32 @@ class Route(BaseModel):
     end_point = Column(String, nullable=False)
     distance = Column(Float, nullable=True)  # in kilometers
     estimated_time = Column(Integer, nullable=True)  # in minutes
+    travel_mode = Column(String, nullable=True)  # mode estimated_time was derived from; None when the client chose it
     is_public = Column(Boolean, default=False)
     source_type = Column(String, nullable=False)  # "manual", "google", "gpx"
+    waypoint_storage = Column(String, nullable=False, default="rows")  # "rows", "packed"
+    geometry = deferred(Column(LargeBinary, nullable=True))  # packed track when waypoint_storage is "packed"
+    
+    # Geometry summary, kept in sync with the waypoints so overviews never load them
+    min_lat = Column(Float, nullable=True)
+    min_lon = Column(Float, nullable=True)
+    max_lat = Column(Float, nullable=True)
+    max_lon = Column(Float, nullable=True)
+    center_lat = Column(Float, nullable=True)
+    center_lon = Column(Float, nullable=True)
+    waypoint_count = Column(Integer, nullable=True)  # full-resolution track points, also for packed routes
+    segment_count = Column(Integer, nullable=True)  # GPX track segments; 1 for drawn routes
     
     # Define the relationship using string reference
     user = relationship("User", back_populates="routes")
-    waypoints = relationship("Waypoint", back_populates="route", cascade="all, delete-orphan")
+    waypoints = relationship("Waypoint", back_populates="route", cascade="all, delete-orphan", order_by="Waypoint.order")
+    spatial_index = relationship("RouteSpatialIndex", back_populates="route", uselist=False, cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        Index("ix_routes_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_routes_is_public_created_at_id", "is_public", "created_at", "id"),
+        Index("ix_routes_bbox", "min_lat", "max_lat", "min_lon", "max_lon"),
+    )
 
 class Waypoint(BaseModel):
     __tablename__ = "waypoints"
@@ -27,6 +51,37 @@ class Waypoint(BaseModel):
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
     order = Column(Integer, nullable=False)
+    detail_level = Column(SmallInteger, nullable=False, default=0, server_default="0")  # coarsest level of detail that keeps this point
+    segment_distance = Column(Float, nullable=True)  # km from the previous waypoint, 0 for the first
+    
+    # Relationships
+    route = relationship("Route", back_populates="waypoints")
+    
+    __table_args__ = (
+        Index("ix_waypoints_route_id_detail_level", "route_id", "detail_level"),
+        Index("ix_waypoints_route_id_order", "route_id", "order"),
+    )
+
+class RouteSpatialIndex(Base):
+    """
+    Geohash index over route bounding boxes and start points, kept beside the routes table.
+    
+    ``cell`` is the smallest geohash cell containing the whole bounding box and
+    ``start_geohash`` the full-precision geohash of the first waypoint; both are
+    searched with prefix range scans on ordinary B-tree indexes, so they use the
+    "C" collation on PostgreSQL.
+    """
+    __tablename__ = "route_spatial_index"
+    
+    route_id = Column(Integer, ForeignKey("routes.id", ondelete="CASCADE"), primary_key=True)
+    cell = Column(GeohashString, nullable=False, index=True)
+    min_lat = Column(Float, nullable=False)
+    min_lon = Column(Float, nullable=False)
+    max_lat = Column(Float, nullable=False)
+    max_lon = Column(Float, nullable=False)
+    start_lat = Column(Float, nullable=False)
+    start_lon = Column(Float, nullable=False)
+    start_geohash = Column(GeohashString, nullable=False, index=True)
     
     # Relationships
-    route = relationship("Route", back_populates="waypoints")
\ No newline at end of file
+    route = relationship("Route", back_populates="spatial_index")
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean
+from sqlalchemy import Column, String, Boolean, Index
 from sqlalchemy.orm import relationship
 from app.db.models.base import BaseModel
 
@@ -13,4 +13,8 @@ class User(BaseModel):
     full_name = Column(String, nullable=True)
     
     # Define relationship as a string reference to avoid circular imports
-    routes = relationship("Route", back_populates="user", cascade="all, delete-orphan")
\ No newline at end of file
+    routes = relationship("Route", back_populates="user", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
\ No newline at end of file
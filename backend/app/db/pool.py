@@ -0,0 +1,81 @@
+"""
+Instrumented connection pools for the TERRA App.
+
+The pools behave exactly like SQLAlchemy's queue pools but record how long
+checkouts wait for a connection, so pool saturation is visible on the
+internal stats endpoint.
+"""
+
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+
+class PoolStatsMixin:
+    """Records checkout wait times and timeouts of a queue pool."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.checkout_timeouts += 1
+            raise
+
+        wait = time.perf_counter() - start
+        with self._stats_lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+        return connection
+
+
+class InstrumentedQueuePool(PoolStatsMixin, QueuePool):
+    """QueuePool with checkout statistics, for sync engines."""
+
+
+class InstrumentedAsyncQueuePool(PoolStatsMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool with checkout statistics, for async engines."""
+
+
+def pool_stats(pool: Pool) -> Dict[str, Any]:
+    """
+    Snapshot of a pool's occupancy and checkout statistics.
+
+    Args:
+        pool: The engine's connection pool
+
+    Returns:
+        Dict[str, Any]: Pool class, configured size, in-use/idle/overflow counts and,
+        for instrumented pools, checkout count, timeouts and wait times in milliseconds
+    """
+    stats: Dict[str, Any] = {'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            'size': pool.size(),
+            'max_overflow': pool._max_overflow,
+            'timeout': pool.timeout(),
+            'in_use': pool.checkedout(),
+            'idle': pool.checkedin(),
+            'overflow': max(0, pool.overflow()),
+        })
+    if isinstance(pool, PoolStatsMixin):
+        stats.update({
+            'checkouts': pool.checkouts,
+            'checkout_timeouts': pool.checkout_timeouts,
+            'avg_wait_ms': pool.total_wait * 1000 / pool.checkouts if pool.checkouts else 0.0,
+            'max_wait_ms': pool.max_wait * 1000,
+        })
+    return stats
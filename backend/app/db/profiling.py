@@ -0,0 +1,191 @@
+"""
+SQL profiling for the TERRA App.
+
+Engine events time every statement. Statements slower than
+``SLOW_QUERY_THRESHOLD_MS`` are logged with their parameters, and while a
+``QueryProfile`` is active (one per request, via ``QueryProfilingMiddleware``)
+statements are also counted per shape so repeated identical statements, the
+signature of an N+1 pattern, are reported.
+"""
+
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_MAX_LOGGED_PARAMETERS = 500
+_WHITESPACE = re.compile(r'\s+')
+
+SLOW_QUERIES = metrics.registry.register(metrics.Counter(
+    'terra_db_slow_queries_total', 'Statements slower than the slow-query threshold.'
+))
+N_PLUS_ONE_REQUESTS = metrics.registry.register(metrics.Counter(
+    'terra_db_n_plus_one_requests_total', 'Requests that repeated one statement shape too often.', ('route',)
+))
+
+
+class QueryProfile:
+    """Statement count, time and shapes recorded while the profile is active."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        self.shapes[statement] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes executed more than ``threshold`` times, most frequent first."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+
+_current_profile: ContextVar[Optional[QueryProfile]] = ContextVar('query_profile', default=None)
+
+# Profiles recording every statement of the process regardless of context (test helper)
+_global_profiles: List[QueryProfile] = []
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a statement's whitespace; bound parameters are already placeholders."""
+    return _WHITESPACE.sub(' ', statement).strip()
+
+
+# The start time lives on the statement's execution context, not the pooled
+# connection, so a statement that raises leaves nothing behind
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_start
+
+    profile = _current_profile.get()
+    if profile is not None or _global_profiles:
+        shape = statement_shape(statement)
+        if profile is not None:
+            profile.record(shape, elapsed)
+        for global_profile in _global_profiles:
+            global_profile.record(shape, elapsed)
+
+    if elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+        SLOW_QUERIES.inc()
+        logged_parameters = repr(parameters)
+        if len(logged_parameters) > _MAX_LOGGED_PARAMETERS:
+            logged_parameters = logged_parameters[:_MAX_LOGGED_PARAMETERS] + '...'
+        logger.warning(
+            f"Slow query ({elapsed * 1000:.1f} ms): {statement_shape(statement)} parameters={logged_parameters}"
+        )
+
+
+def attach_profiler(engine: Engine) -> None:
+    """
+    Time the statements of an engine.
+
+    Args:
+        engine: Sync engine, or the ``sync_engine`` of an async engine
+    """
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+@contextmanager
+def profile_queries() -> Iterator[QueryProfile]:
+    """
+    Record the statements executed in the current context.
+
+    Contexts propagate into ``run_in_threadpool`` workers and into the greenlets
+    of AsyncSession, so the profile covers both sync and async database access.
+
+    Yields:
+        QueryProfile: The profile being recorded
+    """
+    profile = QueryProfile()
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+@contextmanager
+def assert_max_queries(max_count: int) -> Iterator[QueryProfile]:
+    """
+    Fail if the block executes more than ``max_count`` statements.
+
+    Intended for tests, e.g. around a TestClient call::
+
+        with assert_max_queries(3):
+            client.get("/api/routes/", headers=headers)
+
+    Every statement of the process is counted, including those TestClient runs
+    on its own event loop thread, so nothing else should use the database meanwhile.
+    Needs ``SQL_PROFILING_ENABLED``, which attaches the profiler to the engines.
+
+    Args:
+        max_count: Maximum number of statements allowed
+
+    Yields:
+        QueryProfile: The profile being recorded
+
+    Raises:
+        AssertionError: If more statements were executed, listing the statement shapes
+        RuntimeError: If SQL profiling is disabled
+    """
+    if not settings.SQL_PROFILING_ENABLED:
+        raise RuntimeError("assert_max_queries needs SQL_PROFILING_ENABLED")
+
+    profile = QueryProfile()
+    _global_profiles.append(profile)
+    try:
+        yield profile
+    finally:
+        _global_profiles.remove(profile)
+
+    if profile.count > max_count:
+        statements = '\n'.join(f"  {count} x {shape}" for shape, count in profile.shapes.most_common())
+        raise AssertionError(f"Expected at most {max_count} queries, {profile.count} were executed:\n{statements}")
+
+
+class QueryProfilingMiddleware:
+    """
+    ASGI middleware that profiles the statements of every request.
+
+    A request that runs the same statement shape more than ``N_PLUS_ONE_THRESHOLD``
+    times is logged as a likely N+1 pattern, with the route template and counts.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        with profile_queries() as profile:
+            await self.app(scope, receive, send)
+
+        repeated = profile.repeated(settings.N_PLUS_ONE_THRESHOLD)
+        if repeated:
+            route = getattr(scope.get('route'), 'path', None) or metrics.UNMATCHED_ROUTE
+            N_PLUS_ONE_REQUESTS.inc(1, route)
+            shapes = '; '.join(f"{count} x {shape}" for shape, count in repeated)
+            logger.warning(
+                f"Possible N+1 in {scope['method']} {route}: {profile.count} queries "
+                f"({profile.total_time * 1000:.1f} ms), repeated: {shapes}"
+            )
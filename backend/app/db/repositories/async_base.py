@@ -0,0 +1,63 @@
+from datetime import datetime
+from typing import Any, Callable, Dict, Generic, List, Optional, Sequence, Tuple, Type, TypeVar
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.utils.pagination import keyset_select
+from ..models.base import BaseModel
+
+ModelType = TypeVar("ModelType", bound=BaseModel)
+ResultType = TypeVar("ResultType")
+
+class AsyncBaseRepository(Generic[ModelType]):
+    """Async counterpart of BaseRepository, bound to an AsyncSession."""
+    
+    def __init__(self, model: Type[ModelType], db: AsyncSession):
+        self.model = model
+        self.db = db
+    
+    async def get(self, id: Any) -> Optional[ModelType]:
+        result = await self.db.execute(select(self.model).where(self.model.id == id))
+        return result.scalars().first()
+    
+    async def get_all(self, skip: int = 0, limit: int = 100) -> List[ModelType]:
+        result = await self.db.execute(select(self.model).offset(skip).limit(limit))
+        return list(result.scalars().all())
+    
+    async def get_page(self, limit: int, after: Optional[Tuple[datetime, int]] = None, *criteria, options: Sequence[Any] = ()) -> List[ModelType]:
+        """Keyset page ordered by (created_at, id) descending, starting after the given position."""
+        result = await self.db.execute(keyset_select(self.model, limit, after, *criteria, options=options))
+        return list(result.scalars().all())
+    
+    async def create(self, obj_in: Dict[str, Any]) -> ModelType:
+        obj = self.model(**obj_in)
+        self.db.add(obj)
+        await self.db.commit()
+        await self.db.refresh(obj)
+        return obj
+    
+    async def update(self, id: Any, obj_in: Dict[str, Any]) -> Optional[ModelType]:
+        obj = await self.get(id)
+        if obj:
+            for field, value in obj_in.items():
+                setattr(obj, field, value)
+            await self.db.commit()
+            await self.db.refresh(obj)
+        return obj
+    
+    async def delete(self, id: Any) -> bool:
+        obj = await self.get(id)
+        if obj:
+            await self.db.delete(obj)
+            await self.db.commit()
+            return True
+        return False
+    
+    async def run_sync(self, fn: Callable[[Session], ResultType]) -> ResultType:
+        """
+        Run sync repository or service code against this session.
+        
+        The code runs in a greenlet on top of the async driver, so its queries
+        await instead of blocking the event loop.
+        """
+        return await self.db.run_sync(fn)
@@ -0,0 +1,78 @@
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.route import Route, Waypoint
+from .async_base import AsyncBaseRepository
+from .route import RouteRepository
+
+class AsyncRouteRepository(AsyncBaseRepository[Route]):
+    """
+    Async counterpart of RouteRepository.
+    
+    Simple reads are native async queries; spatial lookups and the bulk write
+    paths (COPY, executemany) reuse RouteRepository through ``run_sync``.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        super().__init__(Route, db)
+    
+    async def get_user_routes_page(
+        self, user_id: int, limit: int, after: Optional[Tuple[datetime, int]] = None, include_waypoints: bool = False
+    ) -> List[Route]:
+        return await self.get_page(
+            limit, after, Route.user_id == user_id, options=RouteRepository._waypoint_loading(include_waypoints)
+        )
+    
+    async def get_public_routes_page(
+        self, limit: int, after: Optional[Tuple[datetime, int]] = None, include_waypoints: bool = False
+    ) -> List[Route]:
+        return await self.get_page(
+            limit, after, Route.is_public == True, options=RouteRepository._waypoint_loading(include_waypoints)
+        )
+    
+    async def get_waypoints(self, route_id: int, detail_level: int = 0) -> List[Waypoint]:
+        statement = select(Waypoint).where(Waypoint.route_id == route_id)
+        if detail_level > 0:
+            statement = statement.where(Waypoint.detail_level >= detail_level)
+        result = await self.db.execute(statement.order_by(Waypoint.order))
+        return list(result.scalars().all())
+    
+    async def stream_track_points(self, route_id: int, chunk_size: int) -> AsyncIterator[List[Tuple[Optional[str], float, float]]]:
+        """
+        Stream (name, latitude, longitude) of every waypoint of a route, in order.
+        
+        Rows come from a server-side cursor in chunks of ``chunk_size``, so
+        memory use does not grow with the length of the route.
+        """
+        statement = (
+            select(Waypoint.name, Waypoint.latitude, Waypoint.longitude)
+            .where(Waypoint.route_id == route_id)
+            .order_by(Waypoint.order)
+            .execution_options(yield_per=chunk_size)
+        )
+        result = await self.db.stream(statement)
+        try:
+            async for rows in result.partitions():
+                yield rows
+        finally:
+            await result.close()
+    
+    async def find_public_in_bbox(
+        self, min_lat: float, min_lon: float, max_lat: float, max_lon: float, cells: List[str], limit: int
+    ) -> List[Route]:
+        return await self.run_sync(
+            lambda db: RouteRepository(db).find_public_in_bbox(min_lat, min_lon, max_lat, max_lon, cells, limit)
+        )
+    
+    async def find_public_starting_in(self, cells: List[str]) -> List[Tuple[Route, float, float]]:
+        return await self.run_sync(lambda db: RouteRepository(db).find_public_starting_in(cells))
+    
+    async def create_with_waypoints(self, route_data: Dict[str, Any], waypoints_data: List[Dict[str, Any]], bulk: bool = True) -> Route:
+        return await self.run_sync(lambda db: RouteRepository(db).create_with_waypoints(route_data, waypoints_data, bulk))
+    
+    async def update(self, id: Any, obj_in: Dict[str, Any]) -> Optional[Route]:
+        return await self.run_sync(lambda db: RouteRepository(db).update(id, obj_in))
+    
+    async def delete(self, id: Any) -> bool:
+        return await self.run_sync(lambda db: RouteRepository(db).delete(id))
@@ -0,0 +1,35 @@
+from typing import Any, Dict, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.security import get_password_hash_async
+from ..models.user import User
+from .async_base import AsyncBaseRepository
+from .user import UserRepository
+
+class AsyncUserRepository(AsyncBaseRepository[User]):
+    def __init__(self, db: AsyncSession):
+        super().__init__(User, db)
+    
+    async def get_by_email(self, email: str) -> Optional[User]:
+        result = await self.db.execute(select(User).where(User.email == email))
+        return result.scalars().first()
+    
+    async def get_by_username(self, username: str) -> Optional[User]:
+        result = await self.db.execute(select(User).where(User.username == username))
+        return result.scalars().first()
+    
+    async def create(self, obj_in: Dict[str, Any]) -> User:
+        # Hash off the event loop, then reuse the sync repository for the write
+        if "password" in obj_in:
+            obj_in["hashed_password"] = await get_password_hash_async(obj_in.pop("password"))
+        
+        return await self.run_sync(lambda db: UserRepository(db).create(obj_in))
+    
+    async def update(self, id: Any, obj_in: Dict[str, Any]) -> Optional[User]:
+        if "password" in obj_in:
+            obj_in["hashed_password"] = await get_password_hash_async(obj_in.pop("password"))
+        
+        return await self.run_sync(lambda db: UserRepository(db).update(id, obj_in))
+    
+    async def delete(self, id: Any) -> bool:
+        return await self.run_sync(lambda db: UserRepository(db).delete(id))
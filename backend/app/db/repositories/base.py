@@ -1,5 +1,7 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from datetime import datetime
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, Type, TypeVar, Union
 from sqlalchemy.orm import Session
+from app.utils.pagination import keyset_select
 from ..models.base import BaseModel
 
 ModelType = TypeVar("ModelType", bound=BaseModel)
@@ -15,6 +17,10 @@ class BaseRepository(Generic[ModelType]):
     def get_all(self, skip: int = 0, limit: int = 100) -> List[ModelType]:
         return self.db.query(self.model).offset(skip).limit(limit).all()
     
+    def get_page(self, limit: int, after: Optional[Tuple[datetime, int]] = None, *criteria, options: Sequence[Any] = ()) -> List[ModelType]:
+        """Keyset page ordered by (created_at, id) descending, starting after the given position."""
+        return list(self.db.scalars(keyset_select(self.model, limit, after, *criteria, options=options)).all())
+    
     def create(self, obj_in: Dict[str, Any]) -> ModelType:
         obj = self.model(**obj_in)
         self.db.add(obj)
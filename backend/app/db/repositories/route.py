@@ -1,8 +1,22 @@
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from ..models.route import Route, Waypoint
+import io
+from collections import namedtuple
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Tuple
+from sqlalchemy import and_, delete, distinct, func, insert, or_, select, update, bindparam
+from sqlalchemy.orm import Session, raiseload, selectinload, undefer
+from ..models.route import Route, Waypoint, RouteSpatialIndex
+from app.utils.geohash import PREFIX_UPPER_BOUND
 from .base import BaseRepository
 
+# Waypoint read without an ORM object, e.g. decoded from a packed geometry
+WaypointRow = namedtuple("WaypointRow", ["id", "route_id", "name", "latitude", "longitude", "order"])
+
+def _copy_field(value: Any) -> str:
+    """Format a value for CSV COPY: NULL is the unquoted empty string, everything else is quoted."""
+    if value is None:
+        return ""
+    return '"' + str(value).replace('"', '""') + '"'
+
 class RouteRepository(BaseRepository[Route]):
     def __init__(self, db: Session):
         super().__init__(Route, db)
@@ -13,18 +27,321 @@ class RouteRepository(BaseRepository[Route]):
     def get_public_routes(self) -> List[Route]:
         return self.db.query(Route).filter(Route.is_public == True).all()
     
-    def create_with_waypoints(self, route_data: Dict[str, Any], waypoints_data: List[Dict[str, Any]]) -> Route:
-        # Create route
+    def get_user_routes_page(
+        self, user_id: int, limit: int, after: Optional[Tuple[datetime, int]] = None, include_waypoints: bool = False
+    ) -> List[Route]:
+        return self.get_page(limit, after, Route.user_id == user_id, options=self._waypoint_loading(include_waypoints))
+    
+    def get_public_routes_page(
+        self, limit: int, after: Optional[Tuple[datetime, int]] = None, include_waypoints: bool = False
+    ) -> List[Route]:
+        return self.get_page(limit, after, Route.is_public == True, options=self._waypoint_loading(include_waypoints))
+    
+    @staticmethod
+    def _waypoint_loading(include_waypoints: bool) -> list:
+        """Load waypoints for a whole listing in one batched query, or forbid touching them at all."""
+        if include_waypoints:
+            return [selectinload(Route.waypoints), undefer(Route.geometry)]
+        return [raiseload(Route.waypoints)]
+    
+    def find_public_in_bbox(
+        self, min_lat: float, min_lon: float, max_lat: float, max_lon: float, cells: List[str], limit: int
+    ) -> List[Route]:
+        """
+        Find public routes whose bounding box intersects a box.
+        
+        ``cells`` are geohash cells covering the box. Candidates are routes indexed in
+        one of those cells, in a cell containing one of them, or in a cell inside one
+        of them; the exact bounding box test is applied on the same index rows.
+        """
+        index = RouteSpatialIndex
+        containing = {cell[:length] for cell in cells for length in range(len(cell) + 1)}
+        contained = [
+            and_(index.cell > cell, index.cell < cell + PREFIX_UPPER_BOUND)
+            for cell in cells if cell
+        ]
+        
+        return (
+            self.db.query(Route)
+            .options(raiseload(Route.waypoints))
+            .join(index, index.route_id == Route.id)
+            .filter(or_(index.cell.in_(containing), *contained))
+            .filter(
+                index.min_lat <= max_lat,
+                index.max_lat >= min_lat,
+                index.min_lon <= max_lon,
+                index.max_lon >= min_lon,
+            )
+            .filter(Route.is_public == True)
+            .order_by(Route.id)
+            .limit(limit)
+            .all()
+        )
+    
+    def find_public_starting_in(self, cells: List[str]) -> List[Tuple[Route, float, float]]:
+        """Find public routes whose start point lies in one of the given geohash cells."""
+        index = RouteSpatialIndex
+        prefixes = [
+            and_(index.start_geohash >= cell, index.start_geohash < cell + PREFIX_UPPER_BOUND)
+            for cell in cells
+        ]
+        
+        return (
+            self.db.query(Route, index.start_lat, index.start_lon)
+            .options(raiseload(Route.waypoints))
+            .join(index, index.route_id == Route.id)
+            .filter(or_(*prefixes))
+            .filter(Route.is_public == True)
+            .all()
+        )
+    
+    def get_unindexed_route_ids(self) -> List[int]:
+        rows = (
+            self.db.query(Route.id)
+            .outerjoin(RouteSpatialIndex, RouteSpatialIndex.route_id == Route.id)
+            .filter(RouteSpatialIndex.route_id == None)
+            .all()
+        )
+        return [row.id for row in rows]
+    
+    def get_unsummarized_route_ids(self) -> List[int]:
+        rows = self.db.query(Route.id).filter(Route.waypoint_count == None).all()
+        return [row.id for row in rows]
+    
+    def get_route_ids_missing_segment_distances(self) -> List[int]:
+        """IDs of routes stored as rows with waypoints that have no segment distance."""
+        rows = (
+            self.db.query(Route.id)
+            .filter(Route.waypoint_storage == "rows")
+            .filter(Route.id.in_(select(Waypoint.route_id).where(Waypoint.segment_distance == None)))
+            .all()
+        )
+        return [row.id for row in rows]
+    
+    def get_waypoints(self, route_id: int, detail_level: int = 0) -> List[Waypoint]:
+        """Get the waypoints of a route that belong to the given level of detail, in order."""
+        query = self.db.query(Waypoint).filter(Waypoint.route_id == route_id)
+        if detail_level > 0:
+            query = query.filter(Waypoint.detail_level >= detail_level)
+        return query.order_by(Waypoint.order).all()
+    
+    def get_waypoint_rows(self, route_id: int, detail_level: int = 0) -> List[WaypointRow]:
+        """Like ``get_waypoints``, but as plain rows with the ``WaypointRow`` fields instead of ORM objects."""
+        statement = select(
+            Waypoint.id, Waypoint.route_id, Waypoint.name, Waypoint.latitude, Waypoint.longitude, Waypoint.order
+        ).where(Waypoint.route_id == route_id)
+        if detail_level > 0:
+            statement = statement.where(Waypoint.detail_level >= detail_level)
+        return self.db.execute(statement.order_by(Waypoint.order)).all()
+    
+    def get_track_columns(self, route_id: int) -> List[Tuple[float, float, int]]:
+        """Get (latitude, longitude, detail_level) of every waypoint of a route, in order, without ORM objects."""
+        return (
+            self.db.query(Waypoint.latitude, Waypoint.longitude, Waypoint.detail_level)
+            .filter(Waypoint.route_id == route_id)
+            .order_by(Waypoint.order)
+            .all()
+        )
+    
+    def get_waypoint_range(self, route_id: int, start: int, end: int) -> List[Tuple[int, int, float, float, Optional[float]]]:
+        """Get (id, order, latitude, longitude, segment_distance) of the waypoints with ``start <= order < end``, in order."""
+        return (
+            self.db.query(Waypoint.id, Waypoint.order, Waypoint.latitude, Waypoint.longitude, Waypoint.segment_distance)
+            .filter(Waypoint.route_id == route_id, Waypoint.order >= start, Waypoint.order < end)
+            .order_by(Waypoint.order)
+            .all()
+        )
+    
+    def get_waypoint_order_stats(self, route_id: int) -> Tuple[int, int, Optional[int], Optional[int]]:
+        """Get (row count, distinct orders, min order, max order) of a route's waypoints with one aggregate query."""
+        return (
+            self.db.query(
+                func.count(), func.count(distinct(Waypoint.order)), func.min(Waypoint.order), func.max(Waypoint.order)
+            )
+            .filter(Waypoint.route_id == route_id)
+            .one()
+        )
+    
+    def get_track_bbox(self, route_id: int) -> Tuple[float, float, float, float]:
+        """Get (min_lat, min_lon, max_lat, max_lon) of a route's waypoints with one aggregate query."""
+        return (
+            self.db.query(
+                func.min(Waypoint.latitude), func.min(Waypoint.longitude),
+                func.max(Waypoint.latitude), func.max(Waypoint.longitude)
+            )
+            .filter(Waypoint.route_id == route_id)
+            .one()
+        )
+    
+    def update_waypoint(self, waypoint_id: int, values: Dict[str, Any]) -> None:
+        """Update columns of one waypoint row, bypassing the identity map."""
+        self.db.execute(
+            update(Waypoint).where(Waypoint.id == waypoint_id).values(**values),
+            execution_options={"synchronize_session": False}
+        )
+    
+    def shift_waypoint_orders(self, route_id: int, start: int, offset: int) -> None:
+        """Add ``offset`` to the order of every waypoint of a route from ``start`` on, in one statement."""
+        self.db.execute(
+            update(Waypoint)
+            .where(Waypoint.route_id == route_id, Waypoint.order >= start)
+            .values(order=Waypoint.order + offset),
+            execution_options={"synchronize_session": False}
+        )
+    
+    def delete_waypoint_range(self, route_id: int, start: int, end: int) -> None:
+        """Delete the waypoints of a route with ``start <= order < end``."""
+        self.db.execute(
+            delete(Waypoint).where(Waypoint.route_id == route_id, Waypoint.order >= start, Waypoint.order < end),
+            execution_options={"synchronize_session": False}
+        )
+    
+    def reset_waypoint_sequence(self, waypoint_ids: List[int], distances: List[float]) -> None:
+        """Number the given waypoints 0..n-1 in list order and set their segment distances, with one executemany."""
+        if not waypoint_ids:
+            return
+        table = Waypoint.__table__
+        statement = (
+            update(table)
+            .where(table.c.id == bindparam("waypoint_id"))
+            .values(order=bindparam("position"), segment_distance=bindparam("distance"))
+        )
+        self.db.execute(
+            statement,
+            [
+                {"waypoint_id": waypoint_id, "position": position, "distance": distance}
+                for position, (waypoint_id, distance) in enumerate(zip(waypoint_ids, distances))
+            ]
+        )
+    
+    def delete_waypoints(self, route_id: int) -> None:
+        """Delete the waypoint rows of a route."""
+        self.db.execute(
+            delete(Waypoint).where(Waypoint.route_id == route_id),
+            execution_options={"synchronize_session": False}
+        )
+    
+    def get_route_ids_by_storage(self, storage: str) -> List[int]:
+        rows = self.db.query(Route.id).filter(Route.waypoint_storage == storage).order_by(Route.id).all()
+        return [row.id for row in rows]
+    
+    def create_with_waypoints(self, route_data: Dict[str, Any], waypoints_data: List[Dict[str, Any]], bulk: bool = True) -> Route:
+        """
+        Create a route and its waypoints in a single transaction.
+        
+        With ``bulk`` the waypoints are written with one executemany (or COPY on
+        PostgreSQL) instead of one ORM object and INSERT per waypoint.
+        """
+        route = self.add_route(route_data)
+        
+        if bulk:
+            self.add_waypoints(route.id, waypoints_data)
+        else:
+            for waypoint_data in waypoints_data:
+                waypoint = Waypoint(**{**waypoint_data, "route_id": route.id})
+                self.db.add(waypoint)
+        
+        return self.commit_route(route)
+    
+    def create_many_with_waypoints(self, items: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]) -> List[int]:
+        """
+        Create many routes and their waypoints in a single transaction.
+        
+        The routes are inserted with one flush and the waypoints of every route
+        with one executemany (or COPY on PostgreSQL).
+        
+        Returns:
+            List[int]: The new route IDs, in input order
+        """
+        routes = [Route(**route_data) for route_data, _ in items]
+        self.db.add_all(routes)
+        self.db.flush()  # Flush to get route IDs
+        
+        route_ids = [route.id for route in routes]
+        self._insert_waypoint_rows([
+            {**waypoint_data, "route_id": route_id}
+            for route_id, (_, waypoints_data) in zip(route_ids, items)
+            for waypoint_data in waypoints_data
+        ])
+        self.db.commit()
+        return route_ids
+    
+    def add_route(self, route_data: Dict[str, Any]) -> Route:
+        """Add a route to the current transaction without committing it."""
         route = Route(**route_data)
         self.db.add(route)
         self.db.flush()  # Flush to get route ID
+        return route
+    
+    def add_waypoints(self, route_id: int, waypoints_data: List[Dict[str, Any]]) -> None:
+        """Insert a chunk of waypoints with one executemany (COPY on PostgreSQL), bypassing the identity map."""
+        self._insert_waypoint_rows([{**waypoint_data, "route_id": route_id} for waypoint_data in waypoints_data])
+    
+    def _insert_waypoint_rows(self, rows: List[Dict[str, Any]]) -> None:
+        """Insert complete waypoint rows, of one or many routes."""
+        if not rows:
+            return
+        
+        bind = self.db.get_bind()
+        if bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2":
+            self._copy_waypoints(rows)
+        else:
+            # Core insert: the ORM bulk path drops None values and splits the batch by key set
+            self.db.execute(insert(Waypoint.__table__), rows)
+    
+    def _copy_waypoints(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Stream waypoint rows into PostgreSQL with COPY on the session's connection.
+        
+        COPY applies no Python-side column defaults, so every column is written
+        and values missing from a row take the column's default. Values other
+        than NULL are quoted, so empty names are not read back as NULL.
+        """
+        now = datetime.utcnow()
+        table = Waypoint.__table__
+        defaults = {
+            column.name: column.default.arg if column.default is not None and column.default.is_scalar else None
+            for column in table.columns if not column.primary_key
+        }
+        defaults["created_at"] = defaults["updated_at"] = now
         
-        # Create waypoints
-        for waypoint_data in waypoints_data:
-            waypoint_data["route_id"] = route.id
-            waypoint = Waypoint(**waypoint_data)
-            self.db.add(waypoint)
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write(",".join(_copy_field(row.get(column, default)) for column, default in defaults.items()))
+            buffer.write("\n")
+        buffer.seek(0)
         
+        column_list = ", ".join(f'"{column}"' for column in defaults)
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table.name} ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+    
+    def set_detail_levels(self, route_id: int, orders: List[int], levels: List[int]) -> None:
+        """Update the level of detail of the given waypoints with one executemany."""
+        if not orders:
+            return
+        table = Waypoint.__table__
+        statement = (
+            update(table)
+            .where(table.c.route_id == route_id)
+            .where(table.c.order == bindparam("waypoint_order"))
+            .values(detail_level=bindparam("level"))
+        )
+        self.db.execute(
+            statement,
+            [{"waypoint_order": order, "level": level} for order, level in zip(orders, levels)]
+        )
+    
+    def commit_route(self, route: Route) -> Route:
+        """Commit the current transaction and refresh the route."""
         self.db.commit()
         self.db.refresh(route)
-        return route
\ No newline at end of file
+        return route
+    
+    def commit(self) -> None:
+        self.db.commit()
+    
+    def rollback(self) -> None:
+        self.db.rollback()
\ No newline at end of file
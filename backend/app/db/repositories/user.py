@@ -2,7 +2,7 @@ from typing import Optional, Dict, Any
 from ..models.user import User
 from .base import BaseRepository
 from sqlalchemy.orm import Session
-from app.core.security import get_password_hash
+from app.core.security import PRINCIPAL_FIELDS, get_password_hash, invalidate_principal
 
 class UserRepository(BaseRepository[User]):
     def __init__(self, db: Session):
@@ -26,4 +26,22 @@ class UserRepository(BaseRepository[User]):
         if "password" in obj_in:
             obj_in["hashed_password"] = get_password_hash(obj_in.pop("password"))
         
-        return super().update(id, obj_in)
\ No newline at end of file
+        # Capture the current username so its cached principal can be dropped
+        username = None
+        if PRINCIPAL_FIELDS.intersection(obj_in):
+            user = self.get(id)
+            username = user.username if user else None
+        
+        obj = super().update(id, obj_in)
+        if username is not None:
+            invalidate_principal(username)
+        return obj
+    
+    def delete(self, id: Any) -> bool:
+        user = self.get(id)
+        username = user.username if user else None
+        
+        deleted = super().delete(id)
+        if deleted:
+            invalidate_principal(username)
+        return deleted
\ No newline at end of file
@@ -0,0 +1,146 @@
+"""
+Cache of the serialized public route feed.
+
+Each cached page is stored under a key that embeds the feed version. Changes
+that affect public routes bump the version, so every cached page becomes
+unreachable at once and ages out of the backend on its own.
+"""
+
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.utils.cache import CacheBackend, LocalRedis, MemoryBackend, RedisBackend
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'public-feed:version'
+
+
+class PublicFeedCache:
+    """Serialized pages of ``GET /routes/?public_only=true`` keyed by feed version and query."""
+
+    def __init__(self, backend: Optional[CacheBackend], ttl: float):
+        """
+        Initialize the cache.
+
+        Args:
+            backend: Storage backend, or None to disable caching
+            ttl: Time to live of a cached page in seconds
+        """
+        self.backend = backend
+        self.ttl = ttl
+
+    def key(self, *query: Any) -> Optional[str]:
+        """
+        Cache key of a page at the current feed version.
+
+        Take the key before querying the database, so a page read while the
+        version is bumped is stored under the old, already stale version.
+
+        Args:
+            *query: Values identifying the page (cursor, limit, options)
+
+        Returns:
+            Optional[str]: The key, or None when caching is disabled
+        """
+        if self.backend is None:
+            return None
+
+        version = self.backend.get_counter(VERSION_KEY)
+        return f"public-feed:{version}:" + ':'.join(str(part) for part in query)
+
+    def get(self, key: Optional[str]) -> Optional[Tuple[str, bytes]]:
+        """
+        Look up a serialized page.
+
+        Args:
+            key: Key from ``key()``
+
+        Returns:
+            Optional[Tuple[str, bytes]]: The page's ETag and JSON body, or None on a miss
+        """
+        if key is None:
+            return None
+
+        value = self.backend.get(key)
+        if value is None:
+            return None
+
+        etag, _, body = value.partition(b'\n')
+        return etag.decode(), body
+
+    def set(self, key: Optional[str], etag: str, body: bytes) -> None:
+        """
+        Store a serialized page.
+
+        Args:
+            key: Key from ``key()``
+            etag: ETag of the page
+            body: JSON body of the page
+        """
+        if key is not None:
+            self.backend.set(key, etag.encode() + b'\n' + body, self.ttl)
+
+    def invalidate(self) -> None:
+        """Make every cached page stale by bumping the feed version."""
+        if self.backend is not None:
+            version = self.backend.incr(VERSION_KEY)
+            logger.debug(f"Public feed version bumped to {version}")
+
+    def stats(self) -> Dict[str, Any]:
+        if self.backend is None:
+            return {'backend': None}
+
+        stats = self.backend.stats()
+        stats['version'] = self.backend.get_counter(VERSION_KEY)
+        return stats
+
+
+def create_backend(name: str) -> Optional[CacheBackend]:
+    """
+    Create the configured feed cache backend.
+
+    Args:
+        name: "memory", "redis", "local-redis" (in-process Redis stand-in) or "none"
+
+    Returns:
+        Optional[CacheBackend]: The backend, or None when caching is disabled
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    if name == 'memory':
+        return MemoryBackend(settings.FEED_CACHE_MAX_ENTRIES, settings.FEED_CACHE_MAX_BYTES)
+    if name == 'redis':
+        if not settings.REDIS_URL:
+            raise ValueError("The redis feed cache backend requires REDIS_URL")
+        return RedisBackend.from_url(settings.REDIS_URL)
+    if name == 'local-redis':
+        return RedisBackend(LocalRedis())
+    if name == 'none':
+        return None
+    raise ValueError(f"Unknown feed cache backend: {name}")
+
+
+def create_feed_cache(name: str) -> PublicFeedCache:
+    """
+    Create the public feed cache on the configured backend.
+
+    Only Redis is shared by the worker processes. A per-process backend keeps
+    serving pages another worker has invalidated until they expire, so its
+    pages live ``settings.FEED_CACHE_LOCAL_TTL_SECONDS`` instead.
+
+    Args:
+        name: A backend name for ``create_backend``, or "auto" for redis when
+            ``settings.REDIS_URL`` is set and memory otherwise
+    """
+    if name == 'auto':
+        name = 'redis' if settings.REDIS_URL else 'memory'
+
+    ttl = settings.FEED_CACHE_TTL_SECONDS if name == 'redis' else settings.FEED_CACHE_LOCAL_TTL_SECONDS
+    logger.info(f"Public feed cache backend: {name} (pages live {ttl:g} s)")
+    return PublicFeedCache(create_backend(name), ttl)
+
+
+public_feed_cache = create_feed_cache(settings.FEED_CACHE_BACKEND)
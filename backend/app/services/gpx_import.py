@@ -0,0 +1,174 @@
+"""
+Parallel parsing of many GPX documents for multi-file and archive imports.
+
+Parsing and simplification are CPU bound, so documents are handled on a
+process pool; only the resulting waypoints travel back to the web process,
+which stores them in batches.
+"""
+
+import io
+import logging
+import multiprocessing
+import os
+import xml.etree.ElementTree as ET
+import zipfile
+import zlib
+from collections import deque, namedtuple
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.utils.geo import track_distance, waypoints_to_arrays
+from app.utils.gpx import iter_track_points
+from app.utils.simplify import detail_levels
+
+logger = logging.getLogger(__name__)
+
+# Track of one parsed document; ``error`` is set instead of the track when it cannot be imported
+ParsedGPX = namedtuple("ParsedGPX", ["filename", "waypoints", "levels", "distance", "segment_count", "error"])
+
+_gpx_executor: Optional[Executor] = None
+
+
+def get_gpx_executor() -> Optional[Executor]:
+    """Return the GPX parsing pool, or None when documents are parsed inline."""
+    global _gpx_executor
+    if _gpx_executor is None and settings.GPX_IMPORT_WORKERS > 0:
+        # Spawn rather than fork: forking the running server copies locks held by its other threads
+        _gpx_executor = ProcessPoolExecutor(
+            max_workers=settings.GPX_IMPORT_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _gpx_executor
+
+
+def shutdown_gpx_executor() -> None:
+    """Shut down the GPX parsing pool."""
+    global _gpx_executor
+    if _gpx_executor is not None:
+        _gpx_executor.shutdown(wait=True)
+        _gpx_executor = None
+
+
+def parse_gpx_document(filename: str, data: bytes, default_names: bool, tolerances: Sequence[float]) -> ParsedGPX:
+    """
+    Parse one GPX document and precompute its distance and levels of detail.
+
+    Runs in a worker process, so failures are returned rather than raised.
+
+    Args:
+        filename: Name of the uploaded file or archive member
+        data: The GPX document
+        default_names: Label points without a <name> as "Point N"
+        tolerances: Simplification tolerances of the levels of detail
+
+    Returns:
+        ParsedGPX: The track, or the reason it cannot be imported
+    """
+    try:
+        segment_starts = []
+        waypoints = list(iter_track_points(io.BytesIO(data), default_names=default_names, segment_starts=segment_starts))
+    except ET.ParseError as e:
+        return ParsedGPX(filename, None, None, None, None, f"Invalid GPX format: {str(e)}")
+    except Exception as e:
+        return ParsedGPX(filename, None, None, None, None, f"Error importing GPX file: {str(e)}")
+
+    if not waypoints:
+        return ParsedGPX(filename, None, None, None, None, "No valid track points found in GPX file")
+    if len(waypoints) < 2:
+        return ParsedGPX(filename, None, None, None, None, "GPX file must contain at least 2 valid track points")
+
+    lats, lons = waypoints_to_arrays(waypoints)
+    levels = detail_levels(lats, lons, tolerances)
+    return ParsedGPX(filename, waypoints, levels, round(track_distance(lats, lons), 2), len(segment_starts), None)
+
+
+def parse_gpx_documents(documents: Iterable[Tuple[str, bytes]], default_names: bool = True) -> Iterator[ParsedGPX]:
+    """
+    Parse documents on the process pool, yielding results in input order.
+
+    One document per worker is in flight at a time, so workers keep parsing
+    while the caller stores the results already yielded, without queueing a
+    pickled copy of every document.
+
+    Args:
+        documents: (filename, content) pairs
+        default_names: Label points without a <name> as "Point N"
+
+    Yields:
+        ParsedGPX: One result per document
+    """
+    tolerances = list(settings.ROUTE_DETAIL_TOLERANCES)
+    executor = get_gpx_executor()
+    documents = list(documents)
+    if executor is None or len(documents) < 2:
+        for filename, data in documents:
+            yield parse_gpx_document(filename, data, default_names, tolerances)
+        return
+
+    pending = deque()
+    for filename, data in documents:
+        if len(pending) >= settings.GPX_IMPORT_WORKERS:
+            yield _parse_result(*pending.popleft())
+        pending.append((filename, executor.submit(parse_gpx_document, filename, data, default_names, tolerances)))
+    while pending:
+        yield _parse_result(*pending.popleft())
+
+
+def _parse_result(filename: str, future: Future) -> ParsedGPX:
+    """Wait for a document submitted to the pool."""
+    try:
+        return future.result()
+    except Exception as e:
+        # The worker died (e.g. out of memory); report the document instead of failing the import
+        logger.error(f"Error parsing GPX file '{filename}': {e}")
+        return ParsedGPX(filename, None, None, None, None, f"Error importing GPX file: {str(e)}")
+
+
+def read_gpx_archive(source: BinaryIO, max_files: int, max_bytes: int) -> List[Tuple[str, bytes]]:
+    """
+    Extract the GPX documents of a ZIP archive.
+
+    Directories, other file types and macOS resource forks are ignored.
+
+    Args:
+        source: Binary file-like object containing the archive
+        max_files: Maximum number of GPX documents
+        max_bytes: Maximum total uncompressed size of the GPX documents
+
+    Returns:
+        List[Tuple[str, bytes]]: (member name, content) pairs in archive order
+
+    Raises:
+        ValueError: If the archive is invalid or exceeds the limits
+    """
+    try:
+        archive = zipfile.ZipFile(source)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Invalid ZIP archive: {str(e)}")
+
+    with archive:
+        members = [
+            info for info in archive.infolist()
+            if not info.is_dir()
+            and info.filename.lower().endswith(".gpx")
+            and not os.path.basename(info.filename).startswith("._")
+            and not info.filename.startswith("__MACOSX/")
+        ]
+        if len(members) > max_files:
+            raise ValueError(f"Archive contains more than {max_files} GPX files")
+
+        documents = []
+        total = 0
+        for info in members:
+            # Read at most one byte past the budget so a forged header cannot inflate memory use
+            try:
+                with archive.open(info) as member:
+                    data = member.read(max_bytes - total + 1)
+            except (zipfile.BadZipFile, NotImplementedError, zlib.error) as e:
+                raise ValueError(f"Cannot read '{info.filename}' from the archive: {str(e)}")
+            total += len(data)
+            if total > max_bytes:
+                raise ValueError(f"Archive expands to more than {max_bytes} bytes of GPX")
+            documents.append((info.filename, data))
+
+    return documents
@@ -2,18 +2,56 @@
 Route service module for handling route-related business logic.
 """
 
-from typing import List, Optional, Dict, Any
+from collections import namedtuple
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, BinaryIO, Callable, List, Optional, Dict, Any, Tuple
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import inspect
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.repositories.route import RouteRepository
-from app.db.models.route import Route, Waypoint
-from app.core.exceptions import NotFoundException, ValidationException
-from app.utils.geo import calculate_route_distance, estimate_travel_time
+from app.core import metrics
+from app.core.config import settings
+from app.db.repositories.async_route import AsyncRouteRepository
+from app.db.repositories.route import RouteRepository, WaypointRow
+from app.db.session import SessionLocal
+from app.services.feed_cache import public_feed_cache
+from app.services.gpx_import import parse_gpx_documents
+from app.db.models.route import Route, Waypoint, RouteSpatialIndex
+from app.core.exceptions import ConflictException, NotFoundException, ValidationException
+from app.utils import geohash
+from app.utils.geo import (
+    batch_route_metrics, calculate_haversine_distance, estimate_travel_time, estimate_travel_times,
+    haversine_array, segment_distances, shift_center, track_bbox, track_center, track_distance, waypoints_to_arrays
+)
+from app.utils.gpx import gpx_footer, gpx_header, gpx_track_points, iter_track_points
+from app.utils.pagination import keyset_page, keyset_page_async
+from app.utils.simplify import detail_levels
+from app.utils.track_codec import pack_track, unpack_track
 from app.utils.validators import validate_coordinates
+import io
+import os
+import re
+import numpy as np
 import xml.etree.ElementTree as ET
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Label given to GPX track points that have no <name>
+GENERATED_NAME = re.compile(r"^Point \d+$")
+
+# Outcome of one item of a bulk creation: the new route ID, or why it was not created
+BulkResult = namedtuple("BulkResult", ["route_id", "error"])
+
+# Outcome of importing one GPX document of a multi-file import
+GPXImportResult = namedtuple("GPXImportResult", ["filename", "route_id", "error"])
+
+# A packed track with waypoint operations applied, ready to be written to its route
+PackedTrackEdit = namedtuple(
+    "PackedTrackEdit", ["geometry", "named_waypoints", "summary", "distance_delta", "old_ends", "new_ends"]
+)
+
 class RouteService:
     """Service for handling route-related business logic."""
     
@@ -42,6 +80,95 @@ class RouteService:
         
         return route
     
+    def get_route_waypoints(self, route: Route, detail_level: int = 0) -> List[Any]:
+        """
+        Get the waypoints of a route at a level of detail.
+        
+        Args:
+            route: The route
+            detail_level: Level of detail, 0 being full resolution
+            
+        Returns:
+            List: The waypoints kept at that level, in order, as rows with the
+            ``WaypointRow`` fields (``Waypoint`` objects if the listing query loaded them)
+        """
+        if route.waypoint_storage == "packed":
+            return self._packed_waypoints(route, detail_level)
+        
+        # Reuse a collection the listing query already loaded in batch
+        if detail_level == 0 and "waypoints" not in inspect(route).unloaded:
+            return list(route.waypoints)
+        
+        waypoints = self.repository.get_waypoint_rows(route.id, detail_level)
+        
+        # Routes stored before levels of detail existed only have level 0
+        if detail_level > 0 and len(waypoints) < 2:
+            logger.info(f"Route {route.id} has no simplified geometry, serving full resolution")
+            waypoints = self.repository.get_waypoint_rows(route.id)
+        
+        return waypoints
+    
+    def get_track(self, route: Route) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get the full-resolution geometry of a route as arrays.
+        
+        Args:
+            route: The route
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: Latitudes, longitudes and levels of detail
+        """
+        if route.waypoint_storage == "packed":
+            return unpack_track(route.geometry)
+        
+        rows = self.repository.get_track_columns(route.id)
+        columns = np.array([tuple(row) for row in rows], dtype=np.float64).reshape(-1, 3)
+        return columns[:, 0], columns[:, 1], columns[:, 2].astype(np.int8)
+    
+    def _packed_waypoints(self, route: Route, detail_level: int) -> List[WaypointRow]:
+        """Decode the waypoints of a packed route, merging in its sparse named waypoint rows."""
+        lats, lons, levels = unpack_track(route.geometry)
+        
+        if "waypoints" not in inspect(route).unloaded:
+            named = {waypoint.order: waypoint for waypoint in route.waypoints}
+        else:
+            named = {waypoint.order: waypoint for waypoint in self.repository.get_waypoint_rows(route.id)}
+        
+        indices = np.flatnonzero(levels >= detail_level) if detail_level > 0 else np.arange(lats.size)
+        waypoints = []
+        for order, lat, lon in zip(indices.tolist(), lats[indices].tolist(), lons[indices].tolist()):
+            row = named.get(order)
+            waypoints.append(WaypointRow(
+                row.id if row is not None else None,
+                route.id,
+                row.name if row is not None else None,
+                lat,
+                lon,
+                order
+            ))
+        
+        return waypoints
+    
+    @staticmethod
+    def resolve_detail_level(detail: Optional[int] = None, tolerance: Optional[float] = None) -> int:
+        """
+        Resolve a requested level of detail or simplification tolerance to a stored level.
+        
+        Args:
+            detail: Requested level of detail, clamped to the coarsest stored level
+            tolerance: Maximum acceptable simplification error in meters; the coarsest
+                level within that tolerance is used
+            
+        Returns:
+            int: The stored level of detail to serve
+        """
+        tolerances = settings.ROUTE_DETAIL_TOLERANCES
+        if tolerance is not None:
+            return max(level for level, value in enumerate(tolerances) if value <= tolerance)
+        if detail is not None:
+            return min(detail, len(tolerances) - 1)
+        return 0
+    
     def get_user_routes(self, user_id: int) -> List[Route]:
         """
         Get all routes belonging to a user.
@@ -63,6 +190,237 @@ class RouteService:
         """
         return self.repository.get_public_routes()
     
+    def get_user_routes_page(
+        self, user_id: int, cursor: Optional[str] = None, limit: int = settings.DEFAULT_PAGE_SIZE, include_waypoints: bool = False
+    ) -> Tuple[List[Route], Optional[str]]:
+        """
+        Get one page of the routes belonging to a user, newest first.
+        
+        Args:
+            user_id: The ID of the user
+            cursor: Cursor returned with the previous page, or None for the first page
+            limit: Page size
+            include_waypoints: Load the waypoints of the whole page in one batched query;
+                otherwise the waypoints table is never touched
+            
+        Returns:
+            Tuple[List[Route], Optional[str]]: The routes and the cursor of the next page
+            
+        Raises:
+            ValidationException: If the cursor is invalid
+        """
+        return self._page(
+            lambda n, after: self.repository.get_user_routes_page(user_id, n, after, include_waypoints), cursor, limit
+        )
+    
+    def get_public_routes_page(
+        self, cursor: Optional[str] = None, limit: int = settings.DEFAULT_PAGE_SIZE, include_waypoints: bool = False
+    ) -> Tuple[List[Route], Optional[str]]:
+        """
+        Get one page of public routes, newest first.
+        
+        Args:
+            cursor: Cursor returned with the previous page, or None for the first page
+            limit: Page size
+            include_waypoints: Load the waypoints of the whole page in one batched query;
+                otherwise the waypoints table is never touched
+            
+        Returns:
+            Tuple[List[Route], Optional[str]]: The routes and the cursor of the next page
+            
+        Raises:
+            ValidationException: If the cursor is invalid
+        """
+        return self._page(
+            lambda n, after: self.repository.get_public_routes_page(n, after, include_waypoints), cursor, limit
+        )
+    
+    @staticmethod
+    def _page(fetch, cursor: Optional[str], limit: int) -> Tuple[List[Route], Optional[str]]:
+        try:
+            return keyset_page(fetch, cursor, min(limit, settings.MAX_PAGE_SIZE))
+        except ValueError as e:
+            raise ValidationException(str(e))
+    
+    def find_public_routes_in_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float, limit: int = 100) -> List[Route]:
+        """
+        Find public routes whose bounding box intersects a viewport.
+        
+        Args:
+            min_lat: Southern edge of the viewport
+            min_lon: Western edge of the viewport; may exceed ``max_lon`` when the
+                viewport crosses the antimeridian
+            max_lat: Northern edge of the viewport
+            max_lon: Eastern edge of the viewport
+            limit: Maximum number of routes to return
+            
+        Returns:
+            List[Route]: Public routes intersecting the viewport, ordered by ID
+            
+        Raises:
+            ValidationException: If the viewport is invalid
+        """
+        if not (validate_coordinates(min_lat, min_lon) and validate_coordinates(max_lat, max_lon)) or min_lat > max_lat:
+            raise ValidationException(f"Invalid bounding box: {min_lat}, {min_lon}, {max_lat}, {max_lon}")
+        
+        # Split viewports crossing the antimeridian into two boxes
+        if min_lon > max_lon:
+            boxes = [(min_lat, min_lon, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lon)]
+        else:
+            boxes = [(min_lat, min_lon, max_lat, max_lon)]
+        
+        routes = {}
+        for box in boxes:
+            cells = geohash.covering_cells(*box, max_cells=settings.SPATIAL_QUERY_MAX_CELLS)
+            for route in self.repository.find_public_in_bbox(*box, cells=cells, limit=limit):
+                routes[route.id] = route
+        
+        return [routes[route_id] for route_id in sorted(routes)][:limit]
+    
+    def find_nearest_public_routes(self, latitude: float, longitude: float, k: int = 10) -> List[Tuple[Route, float]]:
+        """
+        Find the public routes whose start point is nearest to a location.
+        
+        The search starts with the 3x3 block of fine geohash cells around the
+        location and widens it until it holds at least ``k`` routes that are all
+        closer than the block's guaranteed radius; candidates are ranked by
+        Haversine distance.
+        
+        Args:
+            latitude: Latitude of the location
+            longitude: Longitude of the location
+            k: Number of routes to return
+            
+        Returns:
+            List[Tuple[Route, float]]: (route, distance in km) pairs, nearest first
+            
+        Raises:
+            ValidationException: If the location is invalid
+        """
+        if not validate_coordinates(latitude, longitude):
+            raise ValidationException(f"Invalid coordinates: {latitude}, {longitude}")
+        
+        for precision in range(settings.SPATIAL_NEARBY_START_PRECISION, -1, -1):
+            if precision > 0:
+                center = geohash.encode(latitude, longitude, precision)
+                cells = [center] + geohash.neighbors(center)
+            else:
+                cells = ['']
+            
+            candidates = self.repository.find_public_starting_in(cells)
+            if len(candidates) < k and precision > 0:
+                continue
+            
+            distances = haversine_array(
+                latitude, longitude,
+                np.array([row[1] for row in candidates], dtype=np.float64),
+                np.array([row[2] for row in candidates], dtype=np.float64)
+            )
+            nearest = np.argsort(distances, kind='stable')[:k]
+            
+            if precision == 0 or distances[nearest[-1]] <= geohash.safe_radius_km(latitude, precision):
+                return [(candidates[i][0], round(float(distances[i]), 3)) for i in nearest]
+        
+        return []
+    
+    def rebuild_spatial_index(self) -> int:
+        """
+        Index routes that have no spatial index entry yet (e.g. routes created before it existed).
+        
+        Returns:
+            int: Number of routes indexed
+        """
+        route_ids = self.repository.get_unindexed_route_ids()
+        for route_id in route_ids:
+            route = self.repository.get(route_id)
+            lats, lons, _ = self.get_track(route)
+            if lats.size == 0:
+                continue
+            route.spatial_index = self._build_spatial_index(lats, lons)
+        
+        self.repository.commit()
+        logger.info(f"Indexed {len(route_ids)} routes")
+        return len(route_ids)
+    
+    def rebuild_route_summaries(self) -> int:
+        """
+        Compute the geometry summary of routes that have none yet (e.g. routes created before it existed).
+        
+        Track segments were not recorded for those routes, so they count as one.
+        
+        Returns:
+            int: Number of routes updated
+        """
+        route_ids = self.repository.get_unsummarized_route_ids()
+        for route_id in route_ids:
+            route = self.repository.get(route_id)
+            lats, lons, _ = self.get_track(route)
+            if lats.size == 0:
+                continue
+            for key, value in self._geometry_summary(lats, lons).items():
+                setattr(route, key, value)
+        
+        self.repository.commit()
+        logger.info(f"Summarized {len(route_ids)} routes")
+        return len(route_ids)
+    
+    def rebuild_segment_distances(self) -> int:
+        """
+        Store the segment distances of waypoint rows that have none (e.g. routes created before they existed).
+        
+        Waypoints are renumbered 0..n-1 on the way, as on a route's first edit.
+        Each route is committed on its own, so the backfill can be interrupted.
+        
+        Returns:
+            int: Number of routes updated
+        """
+        route_ids = self.repository.get_route_ids_missing_segment_distances()
+        for route_id in route_ids:
+            self._reset_waypoint_sequence(route_id)
+            self.repository.commit()
+        
+        logger.info(f"Stored segment distances of {len(route_ids)} routes")
+        return len(route_ids)
+    
+    @staticmethod
+    def _geometry_summary(lats: np.ndarray, lons: np.ndarray, segment_count: int = 1) -> Dict[str, Any]:
+        """Route columns summarizing a track: bounding box, center and point and segment counts."""
+        min_lat, min_lon, max_lat, max_lon = track_bbox(lats, lons)
+        center_lat, center_lon = track_center(lats, lons)
+        
+        return {
+            "min_lat": min_lat,
+            "min_lon": min_lon,
+            "max_lat": max_lat,
+            "max_lon": max_lon,
+            "center_lat": round(center_lat, 6),
+            "center_lon": round(center_lon, 6),
+            "waypoint_count": int(lats.size),
+            "segment_count": segment_count
+        }
+    
+    @staticmethod
+    def _build_spatial_index(lats: np.ndarray, lons: np.ndarray) -> RouteSpatialIndex:
+        """Build the spatial index entry of a track."""
+        fields = RouteService._spatial_index_fields(track_bbox(lats, lons), float(lats[0]), float(lons[0]))
+        return RouteSpatialIndex(**fields)
+    
+    @staticmethod
+    def _spatial_index_fields(bbox: Tuple[float, float, float, float], start_lat: float, start_lon: float) -> Dict[str, Any]:
+        """Spatial index columns of a track with the given bounding box and start point."""
+        min_lat, min_lon, max_lat, max_lon = bbox
+        
+        return {
+            "cell": geohash.covering_prefix(min_lat, min_lon, max_lat, max_lon, settings.SPATIAL_INDEX_PRECISION),
+            "min_lat": min_lat,
+            "min_lon": min_lon,
+            "max_lat": max_lat,
+            "max_lon": max_lon,
+            "start_lat": start_lat,
+            "start_lon": start_lon,
+            "start_geohash": geohash.encode(start_lat, start_lon, geohash.MAX_PRECISION)
+        }
+    
     def create_route(self, route_data: Dict[str, Any], waypoints_data: List[Dict[str, Any]]) -> Route:
         """
         Create a new route with waypoints.
@@ -77,7 +435,252 @@ class RouteService:
         Raises:
             ValidationException: If waypoints data is invalid
         """
-        # Validate waypoints
+        waypoints_data = self.prepare_route(route_data, waypoints_data)
+        return self.store_route(route_data, waypoints_data)
+    
+    @classmethod
+    def prepare_route(cls, route_data: Dict[str, Any], waypoints_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Validate a new route and compute its derived fields, without touching the database.
+        
+        This is the CPU-bound part of ``create_route`` (distance, levels of
+        detail, packing); it fills in ``route_data`` and can run in a worker thread.
+        
+        Returns:
+            List[Dict[str, Any]]: The waypoint rows to store for the route
+            
+        Raises:
+            ValidationException: If waypoints data is invalid
+        """
+        cls._validate_waypoints(waypoints_data)
+        
+        lats, lons = waypoints_to_arrays(waypoints_data)
+        
+        # Calculate distance if not provided
+        if "distance" not in route_data or not route_data["distance"]:
+            route_data["distance"] = round(track_distance(lats, lons), 2)
+        
+        # Estimate travel time if not provided, remembering the mode so edits can re-estimate it
+        if "estimated_time" not in route_data or not route_data["estimated_time"]:
+            route_data["travel_mode"] = route_data.get("travel_mode") or "walking"
+            route_data["estimated_time"] = estimate_travel_time(route_data["distance"], route_data["travel_mode"])
+        else:
+            route_data["travel_mode"] = None
+        
+        return cls._prepare_route(route_data, waypoints_data, lats, lons)
+    
+    def store_route(self, route_data: Dict[str, Any], waypoints_data: List[Dict[str, Any]]) -> Route:
+        """Store a route prepared by ``prepare_route``."""
+        route = self.repository.create_with_waypoints(route_data, waypoints_data)
+        metrics.ROUTES_CREATED.inc()
+        if route.is_public:
+            public_feed_cache.invalidate()
+        return route
+    
+    def create_routes_bulk(
+        self, items: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]], atomic: bool = False
+    ) -> List[BulkResult]:
+        """
+        Create many routes with their waypoints in one transaction.
+        
+        Every item is validated first; distances and travel times of all valid
+        items are then computed in one vectorized pass, and the routes and all
+        of their waypoints are written with one flush and one executemany.
+        
+        Args:
+            items: (route_data, waypoints_data) pairs, as for ``create_route``
+            atomic: Create nothing if any item is invalid or cannot be stored
+            
+        Returns:
+            List[BulkResult]: One result per item, in input order, with either
+            the new route ID or an error message
+        """
+        results, indexes, batch = self.prepare_routes_bulk(items, atomic)
+        return self.store_routes_bulk(results, indexes, batch, atomic)
+    
+    @classmethod
+    def prepare_routes_bulk(
+        cls, items: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]], atomic: bool = False
+    ) -> Tuple[List[BulkResult], List[int], List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]]:
+        """
+        Validate the items of a bulk creation and prepare the valid ones, without touching the database.
+        
+        This is the CPU-bound part of ``create_routes_bulk`` and can run in a worker thread.
+        
+        Returns:
+            Tuple: The results so far (errors of invalid items), the indexes of the
+            items to store and their prepared (route_data, waypoint rows); nothing
+            is to be stored if any item is invalid in an atomic batch
+        """
+        results = [BulkResult(None, None)] * len(items)
+        valid = []
+        for index, (_, waypoints_data) in enumerate(items):
+            try:
+                cls._validate_waypoints(waypoints_data)
+                valid.append(index)
+            except ValidationException as e:
+                results[index] = BulkResult(None, e.detail)
+        
+        if not valid or (atomic and len(valid) < len(items)):
+            return results, [], []
+        
+        tracks = [waypoints_to_arrays(items[index][1]) for index in valid]
+        route_metrics = batch_route_metrics(tracks)
+        
+        distances = np.array([
+            items[index][0].get("distance") or track_metrics["distance"]
+            for index, track_metrics in zip(valid, route_metrics)
+        ], dtype=np.float64)
+        travel_times = estimate_travel_times(
+            distances, [items[index][0].get("travel_mode") or "walking" for index in valid]
+        )
+        
+        batch = []
+        for index, (lats, lons), track_metrics, distance, travel_time in zip(
+            valid, tracks, route_metrics, distances.tolist(), travel_times.tolist()
+        ):
+            route_data, waypoints_data = items[index]
+            route_data["distance"] = distance
+            if not route_data.get("estimated_time"):
+                route_data["travel_mode"] = route_data.get("travel_mode") or "walking"
+                route_data["estimated_time"] = travel_time
+            else:
+                route_data["travel_mode"] = None
+            route_data["min_lat"], route_data["min_lon"], route_data["max_lat"], route_data["max_lon"] = track_metrics["bbox"]
+            route_data["center_lat"], route_data["center_lon"] = track_metrics["center"]
+            batch.append((route_data, cls._prepare_route(route_data, waypoints_data, lats, lons)))
+        
+        logger.info(f"Creating {len(batch)} routes in bulk ({len(items) - len(batch)} rejected)")
+        return results, valid, batch
+    
+    def store_routes_bulk(
+        self, results: List[BulkResult], indexes: List[int],
+        batch: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]], atomic: bool = False
+    ) -> List[BulkResult]:
+        """Store routes prepared by ``prepare_routes_bulk`` and complete their results."""
+        if not batch:
+            return results
+        
+        route_ids = self._store_routes(batch, atomic)
+        error = "Batch could not be stored" if atomic else "Route could not be stored"
+        for index, route_id in zip(indexes, route_ids):
+            results[index] = BulkResult(route_id, None if route_id is not None else error)
+        return results
+    
+    def import_gpx_files(
+        self, user_id: int, documents: List[Tuple[str, bytes]], description: str = None, is_public: bool = False
+    ) -> List[GPXImportResult]:
+        """
+        Import one route per GPX document.
+        
+        Documents are parsed in parallel on the GPX process pool and stored in
+        transactions of ``settings.GPX_IMPORT_BATCH_SIZE`` routes while the
+        remaining documents are still being parsed. Each route is named after
+        its file.
+        
+        Args:
+            user_id: ID of the user who is importing the routes
+            documents: (filename, content) pairs
+            description: Description for the new routes
+            is_public: Whether the routes should be public
+            
+        Returns:
+            List[GPXImportResult]: One result per document, in input order
+        """
+        packed = settings.WAYPOINT_STORAGE == "packed"
+        results = []
+        batch = []
+        positions = []
+        
+        def store_batch():
+            route_ids = self._store_routes(batch)
+            for position, route_id, (_, waypoints_data) in zip(positions, route_ids, batch):
+                filename = results[position].filename
+                if route_id is None:
+                    results[position] = GPXImportResult(filename, None, "Route could not be stored")
+                    metrics.GPX_IMPORTS.inc(1, "error")
+                else:
+                    results[position] = GPXImportResult(filename, route_id, None)
+                    metrics.GPX_IMPORTS.inc(1, "success")
+            batch.clear()
+            positions.clear()
+        
+        for parsed in parse_gpx_documents(documents, default_names=not packed):
+            if parsed.error is not None:
+                results.append(GPXImportResult(parsed.filename, None, parsed.error))
+                metrics.GPX_IMPORTS.inc(1, "invalid")
+                continue
+            
+            route_data = {
+                'name': os.path.splitext(os.path.basename(parsed.filename))[0] or parsed.filename,
+                'description': description,
+                'user_id': user_id,
+                'is_public': is_public,
+                'source_type': 'gpx',
+                'distance': parsed.distance,
+                'segment_count': parsed.segment_count,
+                # Estimate travel time (assuming hiking for GPX imports)
+                'travel_mode': 'hiking',
+                'estimated_time': estimate_travel_time(parsed.distance, 'hiking')
+            }
+            lats, lons = waypoints_to_arrays(parsed.waypoints)
+            batch.append((route_data, self._prepare_route(route_data, parsed.waypoints, lats, lons, parsed.levels)))
+            positions.append(len(results))
+            results.append(GPXImportResult(parsed.filename, None, None))
+            metrics.GPX_POINTS_IMPORTED.inc(len(parsed.waypoints))
+            
+            if len(batch) >= settings.GPX_IMPORT_BATCH_SIZE:
+                store_batch()
+        
+        if batch:
+            store_batch()
+        
+        logger.info(f"Imported {sum(1 for result in results if result.route_id)} of {len(results)} GPX files")
+        return results
+    
+    def _store_routes(self, batch: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]], atomic: bool = False) -> List[Optional[int]]:
+        """
+        Store prepared routes in one transaction.
+        
+        If the transaction fails and ``atomic`` is not set, the routes are
+        retried one transaction each so only the failing ones are lost.
+        
+        Returns:
+            List[Optional[int]]: The new route IDs, None for routes not stored
+        """
+        try:
+            route_ids = self.repository.create_many_with_waypoints(batch)
+        except SQLAlchemyError as e:
+            self.repository.rollback()
+            if atomic:
+                logger.error(f"Bulk route creation failed: {str(e)}")
+                return [None] * len(batch)
+            
+            # Fall back to one transaction per route to isolate the failing ones
+            logger.warning(f"Bulk route creation failed, retrying route by route: {str(e)}")
+            route_ids = []
+            for route_data, waypoints_data in batch:
+                try:
+                    route_ids.append(self.repository.create_with_waypoints(route_data, waypoints_data).id)
+                except SQLAlchemyError as e:
+                    self.repository.rollback()
+                    logger.error(f"Failed to store route '{route_data.get('name')}': {str(e)}")
+                    route_ids.append(None)
+        
+        stored = [route_data for route_id, (route_data, _) in zip(route_ids, batch) if route_id is not None]
+        metrics.ROUTES_CREATED.inc(len(stored))
+        if any(route_data.get("is_public") for route_data in stored):
+            public_feed_cache.invalidate()
+        return route_ids
+    
+    @staticmethod
+    def _validate_waypoints(waypoints_data: List[Dict[str, Any]]) -> None:
+        """
+        Check that a route has at least two waypoints with valid coordinates.
+        
+        Raises:
+            ValidationException: If waypoints data is invalid
+        """
         if not waypoints_data or len(waypoints_data) < 2:
             raise ValidationException("Route must have at least 2 waypoints")
         
@@ -88,15 +691,29 @@ class RouteService:
             
             if not validate_coordinates(lat, lon):
                 raise ValidationException(f"Invalid coordinates at waypoint {i+1}: {lat}, {lon}")
+    
+    @classmethod
+    def _prepare_route(
+        cls, route_data: Dict[str, Any], waypoints_data: List[Dict[str, Any]], lats: np.ndarray, lons: np.ndarray,
+        levels: Optional[np.ndarray] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Fill in the derived route fields and detail levels before storing a validated route.
         
-        # Calculate distance if not provided
-        if "distance" not in route_data or not route_data["distance"]:
-            route_data["distance"] = calculate_route_distance(waypoints_data)
+        Returns:
+            List[Dict[str, Any]]: The waypoint rows to store for the route
+        """
+        # Precompute the simplified geometries
+        if levels is None:
+            levels = detail_levels(lats, lons, settings.ROUTE_DETAIL_TOLERANCES)
+        for waypoint, level in zip(waypoints_data, levels.tolist()):
+            waypoint["detail_level"] = level
         
-        # Estimate travel time if not provided
-        if "estimated_time" not in route_data or not route_data["estimated_time"]:
-            travel_mode = route_data.get("travel_mode", "walking")
-            route_data["estimated_time"] = estimate_travel_time(route_data["distance"], travel_mode)
+        route_data["spatial_index"] = cls._build_spatial_index(lats, lons)
+        
+        # Keep a summary computed by the caller (bulk metrics, GPX segment count)
+        for key, value in cls._geometry_summary(lats, lons).items():
+            route_data.setdefault(key, value)
         
         # Set start and end points if not provided
         if "start_point" not in route_data or not route_data["start_point"]:
@@ -108,7 +725,103 @@ class RouteService:
             route_data["end_point"] = f"{end['latitude']},{end['longitude']}"
         
         logger.info(f"Creating route '{route_data.get('name')}' with {len(waypoints_data)} waypoints")
-        return self.repository.create_with_waypoints(route_data, waypoints_data)
+        
+        if settings.WAYPOINT_STORAGE == "packed":
+            route_data["waypoint_storage"] = "packed"
+            route_data["geometry"] = pack_track(lats, lons, levels, settings.PACKED_GEOMETRY_ENCODING)
+            waypoints_data = cls._named_waypoints(waypoints_data)
+        else:
+            # Stored per row so that waypoint edits can update the distance incrementally
+            for waypoint, distance in zip(waypoints_data, cls._leading_segment_distances(lats, lons)):
+                waypoint["segment_distance"] = distance
+        
+        return waypoints_data
+    
+    @staticmethod
+    def _leading_segment_distances(lats: np.ndarray, lons: np.ndarray) -> List[float]:
+        """Distance from the previous point for every point of a track, 0 for the first."""
+        return [0.0] + segment_distances(lats, lons).tolist()
+    
+    @staticmethod
+    def _named_waypoints(waypoints_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Sparse rows kept beside a packed geometry: named waypoints, ordered by track position."""
+        return [
+            {**waypoint, "order": index}
+            for index, waypoint in enumerate(waypoints_data)
+            if waypoint.get("name") is not None
+        ]
+    
+    def pack_route(self, route_id: int) -> bool:
+        """
+        Convert a route from one row per waypoint to a packed geometry.
+        
+        Unnamed waypoints, and GPX points that only carry a generated "Point N"
+        label, are folded into the geometry; named waypoints stay as sparse rows.
+        
+        Args:
+            route_id: ID of the route to convert
+            
+        Returns:
+            bool: True if the route was converted, False if missing or already packed
+        """
+        route = self.get_route(route_id)
+        if not route or route.waypoint_storage == "packed":
+            return False
+        
+        waypoints = self.repository.get_waypoints(route_id)
+        lats = np.array([waypoint.latitude for waypoint in waypoints], dtype=np.float64)
+        lons = np.array([waypoint.longitude for waypoint in waypoints], dtype=np.float64)
+        levels = np.array([waypoint.detail_level for waypoint in waypoints], dtype=np.int8)
+        named = [
+            {"name": waypoint.name, "latitude": waypoint.latitude, "longitude": waypoint.longitude, "order": index}
+            for index, waypoint in enumerate(waypoints)
+            if waypoint.name is not None and not GENERATED_NAME.match(waypoint.name)
+        ]
+        
+        self.repository.delete_waypoints(route_id)
+        self.repository.add_waypoints(route_id, named)
+        route.geometry = pack_track(lats, lons, levels, settings.PACKED_GEOMETRY_ENCODING)
+        route.waypoint_storage = "packed"
+        self.repository.commit_route(route)
+        if route.is_public:
+            public_feed_cache.invalidate()
+        
+        logger.info(f"Packed route {route_id}: {len(waypoints)} waypoints, {len(named)} named")
+        return True
+    
+    def unpack_route(self, route_id: int) -> bool:
+        """
+        Convert a route from a packed geometry back to one row per waypoint.
+        
+        Args:
+            route_id: ID of the route to convert
+            
+        Returns:
+            bool: True if the route was converted, False if missing or not packed
+        """
+        route = self.get_route(route_id)
+        if not route or route.waypoint_storage != "packed":
+            return False
+        
+        waypoints = [
+            {"name": waypoint.name, "latitude": waypoint.latitude, "longitude": waypoint.longitude, "order": waypoint.order}
+            for waypoint in self._packed_waypoints(route, 0)
+        ]
+        lats, lons, levels = unpack_track(route.geometry)
+        for waypoint, level, distance in zip(waypoints, levels.tolist(), self._leading_segment_distances(lats, lons)):
+            waypoint["detail_level"] = level
+            waypoint["segment_distance"] = distance
+        
+        self.repository.delete_waypoints(route_id)
+        self.repository.add_waypoints(route_id, waypoints)
+        route.geometry = None
+        route.waypoint_storage = "rows"
+        self.repository.commit_route(route)
+        if route.is_public:
+            public_feed_cache.invalidate()
+        
+        logger.info(f"Unpacked route {route_id}: {len(waypoints)} waypoints")
+        return True
     
     def update_route(self, route_id: int, route_data: Dict[str, Any]) -> Optional[Route]:
         """
@@ -127,8 +840,444 @@ class RouteService:
             logger.warning(f"Attempted to update non-existent route: {route_id}")
             return None
         
+        # Public feed pages change if the route was or becomes public
+        was_public = existing_route.is_public
+        
+        # A travel time the client changes is no longer derived from the distance
+        if "estimated_time" in route_data and route_data["estimated_time"] != existing_route.estimated_time:
+            route_data["travel_mode"] = None
+        
         logger.info(f"Updating route {route_id}")
-        return self.repository.update(route_id, route_data)
+        route = self.repository.update(route_id, route_data)
+        if was_public or route.is_public:
+            public_feed_cache.invalidate()
+        return route
+    
+    def edit_waypoints(self, route_id: int, operations: List[Dict[str, Any]]) -> Optional[Route]:
+        """
+        Insert, move and delete waypoints of a route in place.
+        
+        Operations are applied in order, each to the positions left by the previous one:
+        
+        - ``insert``: put ``waypoints`` before position ``index`` (``index`` equal to the point count appends)
+        - ``move``: set the ``latitude`` and ``longitude``, and ``name`` if given, of the point at ``index``
+        - ``delete``: remove the points from ``index`` up to ``end`` (exclusive, default ``index + 1``)
+        
+        Only the edited rows and their neighbors are read and written, plus one
+        UPDATE renumbering the following rows when an operation changes the
+        point count. The distance is adjusted from the stored segment distances
+        of the neighbors and the center from the edited points; the bounding
+        box is re-aggregated only when a point on its edge went away. Packed
+        routes are decoded, edited and packed again as a whole.
+        
+        Levels of detail are not recomputed: inserted points only appear at full
+        resolution, and the end points are kept at every level.
+        
+        Args:
+            route_id: ID of the route to edit
+            operations: Dictionaries with an ``op`` and its fields, as described above
+        
+        Returns:
+            Route: The updated route or None if not found
+        
+        Raises:
+            ValidationException: If an operation is invalid or would leave fewer than 2 waypoints
+            ConflictException: If a concurrent edit changed the waypoints
+        """
+        route = self.get_route(route_id)
+        if not route:
+            logger.warning(f"Attempted to edit waypoints of non-existent route: {route_id}")
+            return None
+        
+        packed_edit = None
+        if route.waypoint_storage == "packed":
+            try:
+                packed_edit = self.edit_packed_track(
+                    route.geometry, self.get_waypoint_names(route), operations, route.segment_count or 1
+                )
+            except ValidationException:
+                self.repository.rollback()
+                raise
+        
+        return self.apply_waypoint_edits(route, operations, packed_edit)
+    
+    def get_waypoint_names(self, route: Route) -> Dict[int, str]:
+        """Names of the named waypoints of a packed route, by track position."""
+        return {row.order: row.name for row in self.repository.get_waypoint_rows(route.id)}
+    
+    def apply_waypoint_edits(
+        self, route: Route, operations: List[Dict[str, Any]], packed_edit: Optional[PackedTrackEdit] = None
+    ) -> Route:
+        """
+        Write waypoint operations to a route and update its summary, as in ``edit_waypoints``.
+        
+        Args:
+            route: The route to edit
+            operations: The operations
+            packed_edit: For a packed route, the result of ``edit_packed_track``
+        
+        Returns:
+            Route: The updated route
+        
+        Raises:
+            ValidationException: If an operation is invalid or would leave fewer than 2 waypoints
+            ConflictException: If a concurrent edit changed the waypoints
+        """
+        route_id = route.id
+        if route.waypoint_count is None:
+            # Routes stored before the summary columns existed
+            lats, lons, _ = self.get_track(route)
+            for key, value in self._geometry_summary(lats, lons).items():
+                setattr(route, key, value)
+        
+        old_distance = route.distance
+        try:
+            if packed_edit is not None:
+                delta, old_ends, new_ends = self._store_packed_edit(route, packed_edit)
+            else:
+                delta, old_ends, new_ends = self._edit_waypoint_rows(route, operations)
+        except (ValidationException, ConflictException):
+            self.repository.rollback()
+            raise
+        
+        # Start and end labels generated from the end points follow them
+        for column, old, new in (("start_point", old_ends[0], new_ends[0]), ("end_point", old_ends[1], new_ends[1])):
+            if self._is_point_label(getattr(route, column), old):
+                setattr(route, column, f"{new[0]},{new[1]}")
+        
+        if old_distance is not None:
+            # Not rounded to 2 decimals like new routes: rounding on every edit would drift
+            route.distance = round(old_distance + delta, 6)
+            
+            # Re-estimate a travel time derived from the distance; keep one the client chose
+            if route.travel_mode is not None:
+                route.estimated_time = estimate_travel_time(route.distance, route.travel_mode)
+        
+        fields = self._spatial_index_fields((route.min_lat, route.min_lon, route.max_lat, route.max_lon), *new_ends[0])
+        if route.spatial_index is None:
+            route.spatial_index = RouteSpatialIndex(**fields)
+        else:
+            for key, value in fields.items():
+                setattr(route.spatial_index, key, value)
+        
+        # ETags derive from updated_at, which waypoint writes alone would not change
+        route.updated_at = datetime.utcnow()
+        
+        logger.info(f"Applied {len(operations)} waypoint operations to route {route_id}")
+        route = self.repository.commit_route(route)
+        metrics.WAYPOINT_EDITS.inc(len(operations))
+        if route.is_public:
+            public_feed_cache.invalidate()
+        return route
+    
+    def _edit_waypoint_rows(
+        self, route: Route, operations: List[Dict[str, Any]]
+    ) -> Tuple[float, Tuple[Tuple[float, float], ...], Tuple[Tuple[float, float], ...]]:
+        """
+        Apply waypoint operations to a route stored as rows and update its geometry summary.
+        
+        Returns:
+            Tuple: The change in distance, and the (first, last) points before and after
+        """
+        route_id = route.id
+        
+        # Positions are orders 0..n-1; renumber orders with gaps or duplicates (e.g. chosen by the client) once
+        count, distinct_orders, first_order, last_order = self.repository.get_waypoint_order_stats(route_id)
+        if distinct_orders != count or first_order != 0 or last_order != count - 1:
+            self._reset_waypoint_sequence(route_id)
+        
+        def rows_between(start: int, end: int) -> Dict[int, Any]:
+            rows = self.repository.get_waypoint_range(route_id, max(start, 0), end)
+            if any(row.segment_distance is None for row in rows):
+                # Routes stored before segment distances existed get them on their first edit
+                self._reset_waypoint_sequence(route_id)
+                rows = self.repository.get_waypoint_range(route_id, max(start, 0), end)
+            return {row.order: row for row in rows}
+        
+        def row_at(rows: Dict[int, Any], position: int) -> Any:
+            row = rows.get(position)
+            if row is None:
+                # Only a concurrent edit can leave a hole in the sequence checked above
+                raise ConflictException(f"Waypoint {position} of route {route_id} changed during the edit, retry it")
+            return row
+        
+        def end_rows() -> Tuple[Any, Any]:
+            rows = {**rows_between(0, 1), **rows_between(count - 1, count)}
+            return row_at(rows, 0), row_at(rows, count - 1)
+        
+        old_first, old_last = end_rows()
+        
+        old_count = count
+        delta = 0.0
+        added = []
+        removed = []
+        
+        for number, operation in enumerate(operations, 1):
+            op, index, end = self._check_waypoint_operation(number, operation, count)
+            
+            if op == "insert":
+                points = operation["waypoints"]
+                rows = rows_between(index - 1, index + 1)
+                previous, following = rows.get(index - 1), rows.get(index)
+                
+                track = ([previous] if previous is not None else []) + [
+                    WaypointRow(None, route_id, point.get("name"), point["latitude"], point["longitude"], None)
+                    for point in points
+                ] + ([following] if following is not None else [])
+                lats = np.array([row.latitude for row in track], dtype=np.float64)
+                lons = np.array([row.longitude for row in track], dtype=np.float64)
+                segments = segment_distances(lats, lons).tolist()
+                if previous is None:
+                    segments.insert(0, 0.0)
+                
+                if following is not None:
+                    self.repository.shift_waypoint_orders(route_id, index, len(points))
+                    self.repository.update_waypoint(following.id, {"segment_distance": segments[-1]})
+                    delta += segments[-1] - following.segment_distance
+                self.repository.add_waypoints(route_id, [
+                    {
+                        "name": point.get("name"),
+                        "latitude": point["latitude"],
+                        "longitude": point["longitude"],
+                        "order": index + offset,
+                        "detail_level": 0,
+                        "segment_distance": segments[offset]
+                    }
+                    for offset, point in enumerate(points)
+                ])
+                delta += sum(segments[:len(points)])
+                added.extend((point["latitude"], point["longitude"]) for point in points)
+            
+            elif op == "move":
+                latitude, longitude = operation["latitude"], operation["longitude"]
+                rows = rows_between(index - 1, index + 2)
+                previous, current, following = rows.get(index - 1), row_at(rows, index), rows.get(index + 1)
+                
+                values = {
+                    "latitude": latitude,
+                    "longitude": longitude,
+                    "segment_distance": calculate_haversine_distance(
+                        previous.latitude, previous.longitude, latitude, longitude
+                    ) if previous is not None else 0.0
+                }
+                if "name" in operation:
+                    values["name"] = operation["name"]
+                self.repository.update_waypoint(current.id, values)
+                delta += values["segment_distance"] - current.segment_distance
+                
+                if following is not None:
+                    segment = calculate_haversine_distance(latitude, longitude, following.latitude, following.longitude)
+                    self.repository.update_waypoint(following.id, {"segment_distance": segment})
+                    delta += segment - following.segment_distance
+                added.append((latitude, longitude))
+                removed.append((current.latitude, current.longitude))
+            
+            else:
+                rows = rows_between(index - 1, end + 1)
+                previous, following = rows.get(index - 1), rows.get(end)
+                deleted = [row_at(rows, position) for position in range(index, end)]
+                
+                self.repository.delete_waypoint_range(route_id, index, end)
+                delta -= sum(row.segment_distance for row in deleted)
+                if following is not None:
+                    segment = calculate_haversine_distance(
+                        previous.latitude, previous.longitude, following.latitude, following.longitude
+                    ) if previous is not None else 0.0
+                    self.repository.update_waypoint(following.id, {"segment_distance": segment})
+                    delta += segment - following.segment_distance
+                    self.repository.shift_waypoint_orders(route_id, end, index - end)
+                removed.extend((row.latitude, row.longitude) for row in deleted)
+            
+            count += len(operation["waypoints"]) if op == "insert" else -(end - index) if op == "delete" else 0
+        
+        first, last = end_rows()
+        
+        # Keep the end points at every level of detail, as the simplification does
+        top_level = len(settings.ROUTE_DETAIL_TOLERANCES) - 1
+        for row, old_row in ((first, old_first), (last, old_last)):
+            if row.id != old_row.id:
+                self.repository.update_waypoint(row.id, {"detail_level": top_level})
+        
+        bbox = (route.min_lat, route.min_lon, route.max_lat, route.max_lon)
+        if any(lat in (bbox[0], bbox[2]) or lon in (bbox[1], bbox[3]) for lat, lon in removed):
+            bbox = tuple(self.repository.get_track_bbox(route_id))
+        elif added:
+            lats, lons = zip(*added)
+            bbox = (min(bbox[0], *lats), min(bbox[1], *lons), max(bbox[2], *lats), max(bbox[3], *lons))
+        route.min_lat, route.min_lon, route.max_lat, route.max_lon = bbox
+        
+        center_lat, center_lon = shift_center(
+            route.center_lat, route.center_lon, old_count,
+            [lat for lat, _ in added], [lon for _, lon in added],
+            [lat for lat, _ in removed], [lon for _, lon in removed]
+        )
+        route.center_lat = round(center_lat, 6)
+        route.center_lon = round(center_lon, 6)
+        route.waypoint_count = count
+        
+        return (
+            delta,
+            ((old_first.latitude, old_first.longitude), (old_last.latitude, old_last.longitude)),
+            ((first.latitude, first.longitude), (last.latitude, last.longitude))
+        )
+    
+    @classmethod
+    def edit_packed_track(
+        cls, geometry: bytes, names: Dict[int, str], operations: List[Dict[str, Any]], segment_count: int = 1
+    ) -> PackedTrackEdit:
+        """
+        Apply waypoint operations to a packed track, without touching the database.
+        
+        The whole track is decoded, edited and packed again, so this is CPU bound
+        and can run in a worker thread.
+        
+        Args:
+            geometry: The packed track
+            names: Names of the named waypoints by track position
+            operations: The operations, as for ``edit_waypoints``
+            segment_count: Track segments of the route
+        
+        Returns:
+            PackedTrackEdit: The new geometry, named waypoint rows and summary,
+            the change in distance and the (first, last) points before and after
+        
+        Raises:
+            ValidationException: If an operation is invalid or would leave fewer than 2 waypoints
+        """
+        lats, lons, levels = (array.copy() for array in unpack_track(geometry))
+        old_distance = track_distance(lats, lons)
+        old_ends = ((float(lats[0]), float(lons[0])), (float(lats[-1]), float(lons[-1])))
+        
+        for number, operation in enumerate(operations, 1):
+            op, index, end = cls._check_waypoint_operation(number, operation, int(lats.size))
+            
+            if op == "insert":
+                points = operation["waypoints"]
+                lats = np.insert(lats, index, [point["latitude"] for point in points])
+                lons = np.insert(lons, index, [point["longitude"] for point in points])
+                levels = np.insert(levels, index, np.zeros(len(points), dtype=levels.dtype))
+                names = {order + len(points) if order >= index else order: name for order, name in names.items()}
+                names.update(
+                    (index + offset, point["name"]) for offset, point in enumerate(points) if point.get("name") is not None
+                )
+            
+            elif op == "move":
+                lats[index] = operation["latitude"]
+                lons[index] = operation["longitude"]
+                if "name" in operation:
+                    names[index] = operation["name"]
+            
+            else:
+                lats = np.delete(lats, np.s_[index:end])
+                lons = np.delete(lons, np.s_[index:end])
+                levels = np.delete(levels, np.s_[index:end])
+                names = {
+                    order - (end - index) if order >= end else order: name
+                    for order, name in names.items() if not index <= order < end
+                }
+        
+        # Keep the end points at every level of detail, as the simplification does
+        levels[[0, -1]] = len(settings.ROUTE_DETAIL_TOLERANCES) - 1
+        
+        new_ends = ((float(lats[0]), float(lons[0])), (float(lats[-1]), float(lons[-1])))
+        return PackedTrackEdit(
+            geometry=pack_track(lats, lons, levels, settings.PACKED_GEOMETRY_ENCODING),
+            named_waypoints=[
+                {"name": name, "latitude": float(lats[order]), "longitude": float(lons[order]), "order": order}
+                for order, name in sorted(names.items()) if name is not None
+            ],
+            summary=cls._geometry_summary(lats, lons, segment_count),
+            distance_delta=track_distance(lats, lons) - old_distance,
+            old_ends=old_ends,
+            new_ends=new_ends
+        )
+    
+    def _store_packed_edit(
+        self, route: Route, edit: PackedTrackEdit
+    ) -> Tuple[float, Tuple[Tuple[float, float], ...], Tuple[Tuple[float, float], ...]]:
+        """
+        Write the result of ``edit_packed_track`` to a packed route.
+        
+        Returns:
+            Tuple: The change in distance, and the (first, last) points before and after
+        """
+        route.geometry = edit.geometry
+        self.repository.delete_waypoints(route.id)
+        self.repository.add_waypoints(route.id, edit.named_waypoints)
+        for key, value in edit.summary.items():
+            setattr(route, key, value)
+        return edit.distance_delta, edit.old_ends, edit.new_ends
+    
+    @staticmethod
+    def _check_waypoint_operation(number: int, operation: Dict[str, Any], count: int) -> Tuple[str, int, int]:
+        """
+        Validate one waypoint operation against the current number of points.
+        
+        Returns:
+            Tuple[str, int, int]: The operation and the range of positions it replaces
+        
+        Raises:
+            ValidationException: If the operation is invalid
+        """
+        op = operation.get("op")
+        index = operation.get("index")
+        if not isinstance(index, int):
+            raise ValidationException(f"Operation {number}: position is missing")
+        
+        if op == "insert":
+            points = operation.get("waypoints")
+            if not points:
+                raise ValidationException(f"Operation {number}: insert needs at least one waypoint")
+            if not 0 <= index <= count:
+                raise ValidationException(f"Operation {number}: position {index} is outside the route (0-{count})")
+            for point in points:
+                if point.get("latitude") is None or point.get("longitude") is None:
+                    raise ValidationException(f"Operation {number}: inserted waypoints need a latitude and longitude")
+                if not validate_coordinates(point.get("latitude"), point.get("longitude")):
+                    raise ValidationException(
+                        f"Operation {number}: invalid coordinates {point.get('latitude')}, {point.get('longitude')}"
+                    )
+            return op, index, index
+        
+        if op == "move":
+            if not 0 <= index < count:
+                raise ValidationException(f"Operation {number}: position {index} is outside the route (0-{count - 1})")
+            if operation.get("latitude") is None or operation.get("longitude") is None:
+                raise ValidationException(f"Operation {number}: move needs a latitude and longitude")
+            if not validate_coordinates(operation.get("latitude"), operation.get("longitude")):
+                raise ValidationException(
+                    f"Operation {number}: invalid coordinates {operation.get('latitude')}, {operation.get('longitude')}"
+                )
+            return op, index, index + 1
+        
+        if op == "delete":
+            end = operation.get("end")
+            if end is None:
+                end = index + 1
+            if not 0 <= index < end <= count:
+                raise ValidationException(f"Operation {number}: range {index}-{end} is outside the route (0-{count})")
+            if count - (end - index) < 2:
+                raise ValidationException(f"Operation {number}: route must keep at least 2 waypoints")
+            return op, index, end
+        
+        raise ValidationException(f"Operation {number}: unknown operation '{op}'")
+    
+    @staticmethod
+    def _is_point_label(label: str, point: Tuple[float, float]) -> bool:
+        """Whether a start or end label is the "lat,lon" generated for a point, to packed precision."""
+        try:
+            lat, lon = (float(part) for part in label.split(","))
+        except ValueError:
+            return False
+        return abs(lat - point[0]) <= 1e-6 and abs(lon - point[1]) <= 1e-6
+    
+    def _reset_waypoint_sequence(self, route_id: int) -> None:
+        """Renumber the waypoint rows of a route 0..n-1 and recompute their segment distances."""
+        rows = self.repository.get_waypoint_rows(route_id)
+        lats = np.array([row.latitude for row in rows], dtype=np.float64)
+        lons = np.array([row.longitude for row in rows], dtype=np.float64)
+        self.repository.reset_waypoint_sequence([row.id for row in rows], self._leading_segment_distances(lats, lons))
+        logger.info(f"Renumbered {len(rows)} waypoints of route {route_id}")
     
     def delete_route(self, route_id: int) -> bool:
         """
@@ -146,8 +1295,13 @@ class RouteService:
             logger.warning(f"Attempted to delete non-existent route: {route_id}")
             return False
         
+        was_public = existing_route.is_public
+        
         logger.info(f"Deleting route {route_id}")
-        return self.repository.delete(route_id)
+        deleted = self.repository.delete(route_id)
+        if deleted and was_public:
+            public_feed_cache.invalidate()
+        return deleted
     
     def import_gpx(self, user_id: int, gpx_content: str, name: str, description: str = None, is_public: bool = False) -> Route:
         """
@@ -166,69 +1320,307 @@ class RouteService:
         Raises:
             ValidationException: If GPX content is invalid or contains no track points
         """
+        return self.import_gpx_stream(
+            user_id=user_id,
+            source=io.BytesIO(gpx_content.encode('utf-8')),
+            name=name,
+            description=description,
+            is_public=is_public
+        )
+    
+    def import_gpx_stream(self, user_id: int, source: BinaryIO, name: str, description: str = None, is_public: bool = False) -> Route:
+        """
+        Import a route from a GPX file object with bounded memory.
+        
+        Track points are parsed incrementally, the distance is accumulated as a
+        running sum and waypoints are written in chunks of
+        ``settings.GPX_IMPORT_CHUNK_SIZE``, all inside a single transaction.
+        Only the coordinate arrays (16 bytes per point) are retained to build
+        the levels of detail once the whole track has been read.
+        
+        Args:
+            user_id: ID of the user who is importing the route
+            source: Binary file-like object containing the GPX document
+            name: Name for the new route
+            description: Description for the new route
+            is_public: Whether the route should be public
+            
+        Returns:
+            Route: The created route
+            
+        Raises:
+            ValidationException: If GPX content is invalid or contains no track points
+        """
+        chunk_size = settings.GPX_IMPORT_CHUNK_SIZE
+        packed = settings.WAYPOINT_STORAGE == "packed"
+        route = None
+        point_count = 0
+        distance = 0.0
+        last_point = None
+        chunk = []
+        lat_chunks = []
+        lon_chunks = []
+        segment_starts = []
+        
+        def write_chunk():
+            nonlocal route, distance, last_point
+            if route is None:
+                start = chunk[0]
+                route = self.repository.add_route({
+                    'name': name,
+                    'description': description,
+                    'user_id': user_id,
+                    'start_point': f"{start['latitude']},{start['longitude']}",
+                    'end_point': f"{start['latitude']},{start['longitude']}",
+                    'is_public': is_public,
+                    'source_type': 'gpx',
+                    'waypoint_storage': 'packed' if packed else 'rows'
+                })
+            
+            # Carry the previous chunk's last point so the joining segment is counted
+            points = chunk if last_point is None else [last_point] + chunk
+            lats, lons = waypoints_to_arrays(points)
+            segments = segment_distances(lats, lons)
+            distance += float(segments.sum())
+            last_point = chunk[-1]
+            lat_chunks.append(lats[-len(chunk):])
+            lon_chunks.append(lons[-len(chunk):])
+            
+            if packed:
+                self.repository.add_waypoints(route.id, [point for point in chunk if point['name'] is not None])
+            else:
+                leading = [0.0] if len(points) == len(chunk) else []
+                for point, segment_distance in zip(chunk, leading + segments.tolist()):
+                    point['segment_distance'] = segment_distance
+                self.repository.add_waypoints(route.id, chunk)
+        
         try:
-            # Parse GPX file
-            root = ET.fromstring(gpx_content)
-            namespace = {'gpx': 'http://www.topografix.com/GPX/1/1'}
-            
-            # Extract track points
-            track_points = []
-            for trk in root.findall('.//gpx:trk', namespace):
-                for trkseg in trk.findall('.//gpx:trkseg', namespace):
-                    for i, trkpt in enumerate(trkseg.findall('.//gpx:trkpt', namespace)):
-                        try:
-                            lat = float(trkpt.get('lat'))
-                            lon = float(trkpt.get('lon'))
-                            
-                            # Validate coordinates
-                            if not validate_coordinates(lat, lon):
-                                logger.warning(f"Invalid coordinates in GPX: {lat}, {lon}. Skipping point.")
-                                continue
-                                
-                            name_elem = trkpt.find('.//gpx:name', namespace)
-                            point_name = name_elem.text if name_elem is not None else f"Point {i+1}"
-                            
-                            track_points.append({
-                                'latitude': lat,
-                                'longitude': lon,
-                                'name': point_name,
-                                'order': i
-                            })
-                        except (ValueError, AttributeError) as e:
-                            logger.warning(f"Error processing GPX point: {e}. Skipping point.")
-            
-            if not track_points:
+            for point in iter_track_points(source, default_names=not packed, segment_starts=segment_starts):
+                chunk.append(point)
+                point_count += 1
+                if len(chunk) >= chunk_size:
+                    write_chunk()
+                    chunk = []
+            
+            if chunk:
+                write_chunk()
+            
+            if point_count == 0:
                 raise ValidationException("No valid track points found in GPX file")
                 
-            if len(track_points) < 2:
+            if point_count < 2:
                 raise ValidationException("GPX file must contain at least 2 valid track points")
             
-            # Create route data
-            route_data = {
-                'name': name,
-                'description': description,
-                'user_id': user_id,
-                'start_point': f"{track_points[0]['latitude']},{track_points[0]['longitude']}",
-                'end_point': f"{track_points[-1]['latitude']},{track_points[-1]['longitude']}",
-                'is_public': is_public,
-                'source_type': 'gpx'
-            }
+            # Simplification needs the whole track; only coordinate arrays are kept for it
+            lats = np.concatenate(lat_chunks)
+            lons = np.concatenate(lon_chunks)
+            levels = detail_levels(lats, lons, settings.ROUTE_DETAIL_TOLERANCES)
+            if packed:
+                route.geometry = pack_track(lats, lons, levels, settings.PACKED_GEOMETRY_ENCODING)
+            else:
+                coarse = np.flatnonzero(levels)
+                self.repository.set_detail_levels(route.id, coarse.tolist(), levels[coarse].tolist())
             
-            # Calculate distance
-            distance = calculate_route_distance(track_points)
-            route_data['distance'] = distance
+            route.spatial_index = self._build_spatial_index(lats, lons)
+            for key, value in self._geometry_summary(lats, lons, len(segment_starts)).items():
+                setattr(route, key, value)
             
-            # Estimate travel time (assuming hiking for GPX imports)
-            route_data['estimated_time'] = estimate_travel_time(distance, 'hiking')
+            route.end_point = f"{last_point['latitude']},{last_point['longitude']}"
+            route.distance = round(distance, 2)
             
-            logger.info(f"Importing GPX route '{name}' with {len(track_points)} waypoints")
+            # Estimate travel time (assuming hiking for GPX imports)
+            route.travel_mode = 'hiking'
+            route.estimated_time = estimate_travel_time(route.distance, route.travel_mode)
             
-            # Create route with waypoints
-            return self.repository.create_with_waypoints(route_data, track_points)
+            logger.info(f"Importing GPX route '{name}' with {point_count} waypoints")
+            route = self.repository.commit_route(route)
+            metrics.GPX_IMPORTS.inc(1, "success")
+            metrics.GPX_POINTS_IMPORTED.inc(point_count)
+            metrics.ROUTES_CREATED.inc()
+            if route.is_public:
+                public_feed_cache.invalidate()
+            return route
             
         except ET.ParseError as e:
+            self.repository.rollback()
+            metrics.GPX_IMPORTS.inc(1, "invalid")
             logger.error(f"Error parsing GPX content: {e}")
             raise ValidationException(f"Invalid GPX format: {str(e)}")
+        except ValidationException:
+            self.repository.rollback()
+            metrics.GPX_IMPORTS.inc(1, "invalid")
+            raise
         except Exception as e:
+            self.repository.rollback()
+            metrics.GPX_IMPORTS.inc(1, "error")
             logger.error(f"Error importing GPX: {e}")
-            raise ValidationException(f"Error importing GPX file: {str(e)}")
\ No newline at end of file
+            raise ValidationException(f"Error importing GPX file: {str(e)}")
+
+
+class AsyncRouteService:
+    """
+    Async counterpart of RouteService for async endpoints.
+    
+    Hot reads are native async queries through AsyncRouteRepository. Write paths
+    and geometry decoding reuse RouteService on the same session through
+    ``run_sync``, so the business rules live in one place and every query still
+    awaits the async driver. ``run_sync`` runs on the event loop, so CPU-bound
+    steps (simplification, packing, batch metrics, GPX parsing) run in a worker
+    thread before the database work.
+    """
+    
+    resolve_detail_level = staticmethod(RouteService.resolve_detail_level)
+    
+    def __init__(self, db: AsyncSession):
+        """
+        Initialize the route service.
+        
+        Args:
+            db: SQLAlchemy async database session
+        """
+        self.repository = AsyncRouteRepository(db)
+    
+    def _run(self, fn: Callable[[RouteService], Any]) -> Awaitable[Any]:
+        return self.repository.run_sync(lambda db: fn(RouteService(db)))
+    
+    async def get_route(self, route_id: int) -> Optional[Route]:
+        route = await self.repository.get(route_id)
+        if not route:
+            logger.info(f"Route with ID {route_id} not found")
+        
+        return route
+    
+    async def get_route_waypoints(self, route: Route, detail_level: int = 0) -> List[Any]:
+        return await self._run(lambda service: service.get_route_waypoints(route, detail_level))
+    
+    async def get_user_routes_page(
+        self, user_id: int, cursor: Optional[str] = None, limit: int = settings.DEFAULT_PAGE_SIZE, include_waypoints: bool = False
+    ) -> Tuple[List[Route], Optional[str]]:
+        return await self._page(
+            lambda n, after: self.repository.get_user_routes_page(user_id, n, after, include_waypoints), cursor, limit
+        )
+    
+    async def get_public_routes_page(
+        self, cursor: Optional[str] = None, limit: int = settings.DEFAULT_PAGE_SIZE, include_waypoints: bool = False
+    ) -> Tuple[List[Route], Optional[str]]:
+        return await self._page(
+            lambda n, after: self.repository.get_public_routes_page(n, after, include_waypoints), cursor, limit
+        )
+    
+    @staticmethod
+    async def _page(fetch, cursor: Optional[str], limit: int) -> Tuple[List[Route], Optional[str]]:
+        try:
+            return await keyset_page_async(fetch, cursor, min(limit, settings.MAX_PAGE_SIZE))
+        except ValueError as e:
+            raise ValidationException(str(e))
+    
+    async def find_public_routes_in_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float, limit: int = 100) -> List[Route]:
+        return await self._run(lambda service: service.find_public_routes_in_bbox(min_lat, min_lon, max_lat, max_lon, limit))
+    
+    async def find_nearest_public_routes(self, latitude: float, longitude: float, k: int = 10) -> List[Tuple[Route, float]]:
+        return await self._run(lambda service: service.find_nearest_public_routes(latitude, longitude, k))
+    
+    async def create_route(self, route_data: Dict[str, Any], waypoints_data: List[Dict[str, Any]]) -> Route:
+        waypoints_data = await run_in_threadpool(RouteService.prepare_route, route_data, waypoints_data)
+        return await self._run(lambda service: service.store_route(route_data, waypoints_data))
+    
+    async def create_routes_bulk(
+        self, items: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]], atomic: bool = False
+    ) -> List[BulkResult]:
+        results, indexes, batch = await run_in_threadpool(RouteService.prepare_routes_bulk, items, atomic)
+        return await self._run(lambda service: service.store_routes_bulk(results, indexes, batch, atomic))
+    
+    async def export_gpx(self, route: Route) -> AsyncIterator[bytes]:
+        """
+        Stream a route as a GPX document.
+        
+        The header goes out before any waypoint is read. Row-stored waypoints
+        are read from a server-side cursor and packed geometries are decoded
+        once; both are written ``settings.GPX_EXPORT_CHUNK_SIZE`` points at a time.
+        
+        Args:
+            route: The route
+            
+        Yields:
+            bytes: Consecutive parts of the UTF-8 encoded document
+        """
+        chunk_size = settings.GPX_EXPORT_CHUNK_SIZE
+        point_count = 0
+        yield gpx_header(route.name, route.description).encode()
+        
+        if route.waypoint_storage == "packed":
+            def load_track(service: RouteService) -> Tuple[np.ndarray, np.ndarray, Dict[int, str]]:
+                lats, lons, _ = service.get_track(route)
+                names = {row.order: row.name for row in service.repository.get_waypoint_rows(route.id)}
+                return lats, lons, names
+            
+            lats, lons, names = await self._run(load_track)
+            for start in range(0, lats.size, chunk_size):
+                stop = min(start + chunk_size, lats.size)
+                points = zip(
+                    [names.get(order) for order in range(start, stop)], lats[start:stop].tolist(), lons[start:stop].tolist()
+                )
+                yield gpx_track_points(points).encode()
+            point_count = lats.size
+        else:
+            async for rows in self.repository.stream_track_points(route.id, chunk_size):
+                yield gpx_track_points(rows).encode()
+                point_count += len(rows)
+        
+        yield gpx_footer().encode()
+        metrics.WAYPOINTS_SERVED.inc(point_count)
+    
+    async def update_route(self, route_id: int, route_data: Dict[str, Any]) -> Optional[Route]:
+        return await self._run(lambda service: service.update_route(route_id, route_data))
+    
+    async def edit_waypoints(self, route_id: int, operations: List[Dict[str, Any]]) -> Optional[Route]:
+        def load(service: RouteService) -> Tuple[Optional[Route], Optional[bytes], Optional[Dict[int, str]]]:
+            route = service.get_route(route_id)
+            if route is None or route.waypoint_storage != "packed":
+                return route, None, None
+            return route, route.geometry, service.get_waypoint_names(route)
+        
+        route, geometry, names = await self._run(load)
+        if route is None:
+            return None
+        
+        packed_edit = None
+        if geometry is not None:
+            packed_edit = await run_in_threadpool(
+                RouteService.edit_packed_track, geometry, names, operations, route.segment_count or 1
+            )
+        return await self._run(lambda service: service.apply_waypoint_edits(route, operations, packed_edit))
+    
+    async def delete_route(self, route_id: int) -> bool:
+        return await self._run(lambda service: service.delete_route(route_id))
+    
+    async def import_gpx_files(
+        self, user_id: int, documents: List[Tuple[str, bytes]], description: str = None, is_public: bool = False
+    ) -> List[GPXImportResult]:
+        """Import one route per GPX document in a worker thread with its own sync session."""
+        def run_import() -> List[GPXImportResult]:
+            db = SessionLocal()
+            try:
+                return RouteService(db).import_gpx_files(user_id, documents, description, is_public)
+            finally:
+                db.close()
+        
+        return await run_in_threadpool(run_import)
+    
+    async def import_gpx_stream(self, user_id: int, source: BinaryIO, name: str, description: str = None, is_public: bool = False) -> Route:
+        """
+        Import a route from a GPX file object in a worker thread.
+        
+        The import uses its own sync session in the thread; the created route is
+        then loaded through this service's async session.
+        """
+        def run_import() -> int:
+            db = SessionLocal()
+            try:
+                route = RouteService(db).import_gpx_stream(user_id, source, name, description, is_public)
+                return route.id
+            finally:
+                db.close()
+        
+        route_id = await run_in_threadpool(run_import)
+        return await self.repository.get(route_id)
@@ -1,7 +1,12 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.exceptions import ValidationException
+from app.db.repositories.async_user import AsyncUserRepository
 from app.db.repositories.user import UserRepository
 from app.db.models.user import User
+from app.utils.pagination import keyset_page, keyset_page_async
 
 class UserService:
     def __init__(self, db: Session):
@@ -16,6 +21,12 @@ class UserService:
     def get_users(self, skip: int = 0, limit: int = 100) -> List[User]:
         return self.repository.get_all(skip=skip, limit=limit)
     
+    def get_users_page(self, cursor: Optional[str] = None, limit: int = settings.DEFAULT_PAGE_SIZE) -> Tuple[List[User], Optional[str]]:
+        try:
+            return keyset_page(self.repository.get_page, cursor, min(limit, settings.MAX_PAGE_SIZE))
+        except ValueError as e:
+            raise ValidationException(str(e))
+    
     def get_user_by_username(self, username: str) -> Optional[User]:
         return self.repository.get_by_username(username)
     
@@ -26,4 +37,32 @@ class UserService:
         return self.repository.update(user_id, user_data)
     
     def delete_user(self, user_id: int) -> bool:
-        return self.repository.delete(user_id)
\ No newline at end of file
+        return self.repository.delete(user_id)
+
+class AsyncUserService:
+    def __init__(self, db: AsyncSession):
+        self.repository = AsyncUserRepository(db)
+    
+    async def get_user(self, user_id: int) -> Optional[User]:
+        return await self.repository.get(user_id)
+    
+    async def get_user_by_email(self, email: str) -> Optional[User]:
+        return await self.repository.get_by_email(email)
+    
+    async def get_users_page(self, cursor: Optional[str] = None, limit: int = settings.DEFAULT_PAGE_SIZE) -> Tuple[List[User], Optional[str]]:
+        try:
+            return await keyset_page_async(self.repository.get_page, cursor, min(limit, settings.MAX_PAGE_SIZE))
+        except ValueError as e:
+            raise ValidationException(str(e))
+    
+    async def get_user_by_username(self, username: str) -> Optional[User]:
+        return await self.repository.get_by_username(username)
+    
+    async def create_user(self, user_data: Dict[str, Any]) -> User:
+        return await self.repository.create(user_data)
+    
+    async def update_user(self, user_id: int, user_data: Dict[str, Any]) -> Optional[User]:
+        return await self.repository.update(user_id, user_data)
+    
+    async def delete_user(self, user_id: int) -> bool:
+        return await self.repository.delete(user_id)
\ No newline at end of file
@@ -0,0 +1,71 @@
+"""
+Entity tag helpers for conditional GET requests.
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Any, Iterable, Optional
+
+
+def make_etag(*parts: Any, weak: bool = False) -> str:
+    """
+    Build an opaque entity tag from the values that determine a representation.
+
+    Args:
+        *parts: Values identifying the representation (ids, timestamps, query options)
+        weak: Return a weak tag (``W/"..."``)
+
+    Returns:
+        str: The quoted entity tag
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def version_of(obj: Any) -> Optional[datetime]:
+    """Last modification time of a model instance."""
+    return obj.updated_at or obj.created_at
+
+
+def listing_etag(objects: Iterable[Any], *parts: Any) -> str:
+    """
+    Weak entity tag of a listing, from the ids and versions of its items.
+
+    Args:
+        objects: Model instances in the listing, in response order
+        *parts: Other values the representation depends on (user, cursor, options)
+
+    Returns:
+        str: The weak entity tag
+    """
+    return make_etag(*parts, [(obj.id, version_of(obj)) for obj in objects], weak=True)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evaluate an If-None-Match header against the current entity tag.
+
+    Uses the weak comparison required for If-None-Match (RFC 9110), so ``W/``
+    prefixes are ignored on both sides.
+
+    Args:
+        if_none_match: Value of the If-None-Match header, if any
+        etag: Current entity tag of the resource
+
+    Returns:
+        bool: True if the client's copy is current and 304 may be returned
+    """
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == '*':
+        return True
+
+    current = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == current:
+            return True
+    return False
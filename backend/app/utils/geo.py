@@ -3,12 +3,234 @@ Geospatial utilities for the TERRA App.
 """
 
 import math
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
 
 # Earth radius in kilometers
 EARTH_RADIUS_KM = 6371.0
 
 
+def haversine_array(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """
+    Vectorized Haversine distance between arrays of points.
+    
+    Args:
+        lat1: Latitudes of the first points in decimal degrees (scalar or array)
+        lon1: Longitudes of the first points in decimal degrees (scalar or array)
+        lat2: Latitudes of the second points in decimal degrees (scalar or array)
+        lon2: Longitudes of the second points in decimal degrees (scalar or array)
+        
+    Returns:
+        np.ndarray: Element-wise distances in kilometers (broadcast shape of the inputs)
+    """
+    lat1_rad = np.radians(np.asarray(lat1, dtype=np.float64))
+    lon1_rad = np.radians(np.asarray(lon1, dtype=np.float64))
+    lat2_rad = np.radians(np.asarray(lat2, dtype=np.float64))
+    lon2_rad = np.radians(np.asarray(lon2, dtype=np.float64))
+    
+    dlon = lon2_rad - lon1_rad
+    dlat = lat2_rad - lat1_rad
+    
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(dlon / 2) ** 2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    
+    return EARTH_RADIUS_KM * c
+
+
+def waypoints_to_arrays(waypoints: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert a list of waypoint dictionaries into latitude and longitude arrays.
+    
+    Args:
+        waypoints: List of waypoint dictionaries containing 'latitude' and 'longitude' keys
+        
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Latitude and longitude arrays in decimal degrees
+    """
+    count = len(waypoints)
+    lats = np.fromiter((wp['latitude'] for wp in waypoints), dtype=np.float64, count=count)
+    lons = np.fromiter((wp['longitude'] for wp in waypoints), dtype=np.float64, count=count)
+    return lats, lons
+
+
+def segment_distances(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """
+    Calculate the distance of every segment of a track.
+    
+    Args:
+        lats: Latitudes of the track points in decimal degrees
+        lons: Longitudes of the track points in decimal degrees
+        
+    Returns:
+        np.ndarray: Array of length ``len(lats) - 1`` with segment distances in kilometers
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    if lats.size < 2:
+        return np.zeros(0, dtype=np.float64)
+    
+    return haversine_array(lats[:-1], lons[:-1], lats[1:], lons[1:])
+
+
+def track_distance(lats: np.ndarray, lons: np.ndarray) -> float:
+    """
+    Calculate the total distance of a track.
+    
+    Args:
+        lats: Latitudes of the track points in decimal degrees
+        lons: Longitudes of the track points in decimal degrees
+        
+    Returns:
+        float: Unrounded total distance in kilometers
+    """
+    return float(segment_distances(lats, lons).sum())
+
+
+def track_center(lats: np.ndarray, lons: np.ndarray) -> Tuple[float, float]:
+    """
+    Calculate the geographical center of a track by averaging unit vectors.
+    
+    Args:
+        lats: Latitudes of the track points in decimal degrees
+        lons: Longitudes of the track points in decimal degrees
+        
+    Returns:
+        Tuple[float, float]: Unrounded center point as (latitude, longitude)
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    if lats.size == 0:
+        return (0.0, 0.0)
+    
+    x, y, z = _unit_vectors(lats, lons)
+    return _vector_to_lat_lon(x.mean(), y.mean(), z.mean())
+
+
+def shift_center(
+    center_lat: float, center_lon: float, count: int,
+    added_lats: np.ndarray, added_lons: np.ndarray, removed_lats: np.ndarray, removed_lons: np.ndarray
+) -> Tuple[float, float]:
+    """
+    Update a track center (see ``track_center``) for points added to and removed from the track.
+    
+    The sum of the track's unit vectors is taken as ``count`` times the unit
+    vector of the center. Its true length is shorter by the track's mean
+    resultant length (0.99997 for a track spanning 100 km), so the shift of
+    the center is exact up to that relative error.
+    
+    Args:
+        center_lat: Current center latitude in decimal degrees
+        center_lon: Current center longitude in decimal degrees
+        count: Number of points the current center was computed from
+        added_lats: Latitudes of the added points
+        added_lons: Longitudes of the added points
+        removed_lats: Latitudes of the removed points
+        removed_lons: Longitudes of the removed points
+        
+    Returns:
+        Tuple[float, float]: Unrounded center point as (latitude, longitude)
+    """
+    total = np.array(_unit_vectors(center_lat, center_lon), dtype=np.float64) * count
+    total += np.array(_unit_vectors(added_lats, added_lons), dtype=np.float64).reshape(3, -1).sum(axis=1)
+    total -= np.array(_unit_vectors(removed_lats, removed_lons), dtype=np.float64).reshape(3, -1).sum(axis=1)
+    return _vector_to_lat_lon(*total.tolist())
+
+
+def track_bbox(lats: np.ndarray, lons: np.ndarray) -> Optional[Tuple[float, float, float, float]]:
+    """
+    Calculate the bounding box of a track.
+    
+    Args:
+        lats: Latitudes of the track points in decimal degrees
+        lons: Longitudes of the track points in decimal degrees
+        
+    Returns:
+        Tuple[float, float, float, float]: (min_lat, min_lon, max_lat, max_lon), or None for an empty track
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    if lats.size == 0:
+        return None
+    
+    return (float(lats.min()), float(lons.min()), float(lats.max()), float(lons.max()))
+
+
+def batch_route_metrics(routes: Sequence[Tuple[np.ndarray, np.ndarray]]) -> List[Dict[str, Any]]:
+    """
+    Calculate distance, center and bounding box for many routes in a single vectorized pass.
+    
+    All tracks are concatenated so the trigonometry runs once over every point, and
+    per-route results are reduced with ``np.add.reduceat``/``np.minimum.reduceat``.
+    
+    Args:
+        routes: Sequence of (lats, lons) array pairs, one per route
+        
+    Returns:
+        List[Dict[str, Any]]: One dictionary per route with 'distance' (km, rounded to 2 decimals),
+        'center' ((lat, lon), rounded to 6 decimals), 'bbox' ((min_lat, min_lon, max_lat, max_lon)
+        or None) and 'point_count'
+    """
+    if not routes:
+        return []
+    
+    counts = np.array([len(lats) for lats, _ in routes], dtype=np.int64)
+    results = [
+        {'distance': 0.0, 'center': (0.0, 0.0), 'bbox': None, 'point_count': int(count)}
+        for count in counts
+    ]
+    non_empty = np.flatnonzero(counts)
+    if non_empty.size == 0:
+        return results
+    
+    lats = np.concatenate([np.asarray(routes[i][0], dtype=np.float64) for i in non_empty])
+    lons = np.concatenate([np.asarray(routes[i][1], dtype=np.float64) for i in non_empty])
+    sizes = counts[non_empty]
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    
+    # Segment distances across the concatenation; segments that bridge two routes are zeroed
+    segments = np.zeros(lats.size, dtype=np.float64)
+    segments[:-1] = segment_distances(lats, lons)
+    segments[starts[1:] - 1] = 0.0
+    segments[-1] = 0.0
+    distances = np.add.reduceat(segments, starts)
+    
+    x, y, z = _unit_vectors(lats, lons)
+    x_avg = np.add.reduceat(x, starts) / sizes
+    y_avg = np.add.reduceat(y, starts) / sizes
+    z_avg = np.add.reduceat(z, starts) / sizes
+    
+    min_lats = np.minimum.reduceat(lats, starts)
+    max_lats = np.maximum.reduceat(lats, starts)
+    min_lons = np.minimum.reduceat(lons, starts)
+    max_lons = np.maximum.reduceat(lons, starts)
+    
+    for j, i in enumerate(non_empty):
+        lat_center, lon_center = _vector_to_lat_lon(x_avg[j], y_avg[j], z_avg[j])
+        results[i]['distance'] = round(float(distances[j]), 2)
+        results[i]['center'] = (round(lat_center, 6), round(lon_center, 6))
+        results[i]['bbox'] = (
+            float(min_lats[j]), float(min_lons[j]), float(max_lats[j]), float(max_lons[j])
+        )
+    
+    return results
+
+
+def _unit_vectors(lats: np.ndarray, lons: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Convert latitude/longitude arrays to Cartesian unit vectors."""
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    lon = np.radians(np.asarray(lons, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)
+
+
+def _vector_to_lat_lon(x: float, y: float, z: float) -> Tuple[float, float]:
+    """Convert an (averaged) Cartesian vector back to latitude/longitude in degrees."""
+    lon_center = math.atan2(y, x)
+    hyp = math.sqrt(x * x + y * y)
+    lat_center = math.atan2(z, hyp)
+    return (math.degrees(lat_center), math.degrees(lon_center))
+
+
 def calculate_haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
     Calculate the great-circle distance between two points on Earth using the Haversine formula.
@@ -22,23 +244,19 @@ def calculate_haversine_distance(lat1: float, lon1: float, lat2: float, lon2: fl
     Returns:
         float: Distance between the points in kilometers
     """
-    # Convert decimal degrees to radians
+    # Plain math: for a single pair, building NumPy arrays costs more than the formula
     lat1_rad = math.radians(lat1)
     lon1_rad = math.radians(lon1)
     lat2_rad = math.radians(lat2)
     lon2_rad = math.radians(lon2)
     
-    # Haversine formula
     dlon = lon2_rad - lon1_rad
     dlat = lat2_rad - lat1_rad
     
-    a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+    a = math.sin(dlat / 2) ** 2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon / 2) ** 2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
     
-    # Calculate the distance
-    distance = EARTH_RADIUS_KM * c
-    
-    return distance
+    return EARTH_RADIUS_KM * c
 
 
 def calculate_route_distance(waypoints: List[Dict[str, Any]]) -> float:
@@ -51,18 +269,8 @@ def calculate_route_distance(waypoints: List[Dict[str, Any]]) -> float:
     Returns:
         float: Total distance of the route in kilometers, rounded to 2 decimal places
     """
-    total_distance = 0.0
-    
-    for i in range(len(waypoints) - 1):
-        lat1 = waypoints[i]['latitude']
-        lon1 = waypoints[i]['longitude']
-        lat2 = waypoints[i + 1]['latitude']
-        lon2 = waypoints[i + 1]['longitude']
-        
-        segment_distance = calculate_haversine_distance(lat1, lon1, lat2, lon2)
-        total_distance += segment_distance
-    
-    return round(total_distance, 2)
+    lats, lons = waypoints_to_arrays(waypoints)
+    return round(track_distance(lats, lons), 2)
 
 
 def calculate_route_center(waypoints: List[Dict[str, Any]]) -> Tuple[float, float]:
@@ -78,40 +286,21 @@ def calculate_route_center(waypoints: List[Dict[str, Any]]) -> Tuple[float, floa
     if not waypoints:
         return (0.0, 0.0)
     
-    # Convert to Cartesian coordinates
-    x_sum = 0.0
-    y_sum = 0.0
-    z_sum = 0.0
-    
-    for waypoint in waypoints:
-        lat = math.radians(waypoint['latitude'])
-        lon = math.radians(waypoint['longitude'])
-        
-        x = math.cos(lat) * math.cos(lon)
-        y = math.cos(lat) * math.sin(lon)
-        z = math.sin(lat)
-        
-        x_sum += x
-        y_sum += y
-        z_sum += z
-    
-    # Calculate average
-    x_avg = x_sum / len(waypoints)
-    y_avg = y_sum / len(waypoints)
-    z_avg = z_sum / len(waypoints)
-    
-    # Convert back to latitude and longitude
-    lon_center = math.atan2(y_avg, x_avg)
-    hyp = math.sqrt(x_avg * x_avg + y_avg * y_avg)
-    lat_center = math.atan2(z_avg, hyp)
-    
-    # Convert to degrees
-    lat_center_deg = math.degrees(lat_center)
-    lon_center_deg = math.degrees(lon_center)
+    lats, lons = waypoints_to_arrays(waypoints)
+    lat_center, lon_center = track_center(lats, lons)
     
-    return (round(lat_center_deg, 6), round(lon_center_deg, 6))
+    return (round(lat_center, 6), round(lon_center, 6))
 
 
+# Average speeds in km/h per travel mode
+TRAVEL_SPEEDS = {
+    'walking': 5.0,     # Average walking speed
+    'hiking': 4.0,      # Average hiking speed
+    'running': 10.0,    # Average running speed
+    'cycling': 20.0,    # Average cycling speed
+    'driving': 60.0     # Average driving speed
+}
+
 def estimate_travel_time(distance_km: float, travel_mode: str = 'walking') -> int:
     """
     Estimate travel time in minutes based on distance and travel mode.
@@ -123,20 +312,28 @@ def estimate_travel_time(distance_km: float, travel_mode: str = 'walking') -> in
     Returns:
         int: Estimated travel time in minutes
     """
-    # Average speeds in km/h
-    speeds = {
-        'walking': 5.0,     # Average walking speed
-        'hiking': 4.0,      # Average hiking speed
-        'running': 10.0,    # Average running speed
-        'cycling': 20.0,    # Average cycling speed
-        'driving': 60.0     # Average driving speed
-    }
-    
     # Default to walking if travel mode is not recognized
-    speed = speeds.get(travel_mode.lower(), speeds['walking'])
+    speed = TRAVEL_SPEEDS.get(travel_mode.lower(), TRAVEL_SPEEDS['walking'])
     
     # Calculate time in hours, then convert to minutes
     time_hours = distance_km / speed
     time_minutes = int(round(time_hours * 60))
     
-    return max(1, time_minutes)  # Ensure at least 1 minute
\ No newline at end of file
+    return max(1, time_minutes)  # Ensure at least 1 minute
+
+def estimate_travel_times(distances_km: np.ndarray, travel_modes: Sequence[str]) -> np.ndarray:
+    """
+    Vectorized ``estimate_travel_time`` for many routes.
+    
+    Args:
+        distances_km: Distance of every route in kilometers
+        travel_modes: Mode of transportation of every route
+        
+    Returns:
+        np.ndarray: Estimated travel times in minutes (int64), equal to the scalar function's
+    """
+    speeds = np.array(
+        [TRAVEL_SPEEDS.get(mode.lower(), TRAVEL_SPEEDS['walking']) for mode in travel_modes], dtype=np.float64
+    )
+    minutes = np.rint(np.asarray(distances_km, dtype=np.float64) / speeds * 60).astype(np.int64)
+    return np.maximum(1, minutes)
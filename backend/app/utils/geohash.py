@@ -0,0 +1,233 @@
+"""
+Geohash utilities for the TERRA App.
+
+Geohash cells are nested rectangles, so a cell contains a point exactly when the
+point's geohash starts with the cell's hash. This makes prefix (string range)
+lookups on an ordinary B-tree index behave like a quadtree.
+"""
+
+import math
+from typing import List, Tuple
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+MAX_PRECISION = 12
+
+# Character strictly greater than every geohash character in byte order, used for
+# prefix range scans; the columns scanned must use a bytewise ("C") collation
+PREFIX_UPPER_BOUND = '{'
+
+KM_PER_DEGREE = 111.195
+
+
+def encode(latitude: float, longitude: float, precision: int = 9) -> str:
+    """
+    Encode a point as a geohash.
+
+    Args:
+        latitude: Latitude in decimal degrees
+        longitude: Longitude in decimal degrees
+        precision: Number of characters of the resulting hash
+
+    Returns:
+        str: The geohash of the cell containing the point
+    """
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lon_range[0] = mid
+            else:
+                bits <<= 1
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return ''.join(chars)
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """
+    Size of a geohash cell.
+
+    Args:
+        precision: Number of characters of the hash
+
+    Returns:
+        Tuple[float, float]: (height, width) of a cell in degrees
+    """
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return (180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits))
+
+
+def bounds(geohash: str) -> Tuple[float, float, float, float]:
+    """
+    Bounding box of a geohash cell.
+
+    Args:
+        geohash: The geohash to decode
+
+    Returns:
+        Tuple[float, float, float, float]: (min_lat, min_lon, max_lat, max_lon)
+    """
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+
+    for char in geohash:
+        value = BASE32.index(char)
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            target = lon_range if even else lat_range
+            mid = (target[0] + target[1]) / 2
+            target[1 - bit] = mid
+            even = not even
+
+    return (lat_range[0], lon_range[0], lat_range[1], lon_range[1])
+
+
+def neighbors(geohash: str) -> List[str]:
+    """
+    The (up to) eight cells surrounding a geohash cell.
+
+    Longitude wraps around the antimeridian; there are no neighbors beyond the poles.
+
+    Args:
+        geohash: The geohash of the center cell
+
+    Returns:
+        List[str]: Geohashes of the neighboring cells with the same precision
+    """
+    min_lat, min_lon, max_lat, max_lon = bounds(geohash)
+    height = max_lat - min_lat
+    width = max_lon - min_lon
+    center_lat = (min_lat + max_lat) / 2
+    center_lon = (min_lon + max_lon) / 2
+
+    cells = []
+    for dlat in (-1, 0, 1):
+        lat = center_lat + dlat * height
+        if not -90.0 < lat < 90.0:
+            continue
+        for dlon in (-1, 0, 1):
+            if dlat == 0 and dlon == 0:
+                continue
+            lon = (center_lon + dlon * width + 180.0) % 360.0 - 180.0
+            cell = encode(lat, lon, len(geohash))
+            if cell not in cells and cell != geohash:
+                cells.append(cell)
+
+    return cells
+
+
+def covering_prefix(min_lat: float, min_lon: float, max_lat: float, max_lon: float, max_precision: int = 8) -> str:
+    """
+    The smallest geohash cell that contains a whole bounding box.
+
+    Args:
+        min_lat: Southern edge of the box
+        min_lon: Western edge of the box
+        max_lat: Northern edge of the box
+        max_lon: Eastern edge of the box
+        max_precision: Maximum length of the returned hash
+
+    Returns:
+        str: Geohash of the containing cell ('' when only the whole world contains it)
+    """
+    corners = [
+        encode(min_lat, min_lon, max_precision),
+        encode(min_lat, max_lon, max_precision),
+        encode(max_lat, min_lon, max_precision),
+        encode(max_lat, max_lon, max_precision),
+    ]
+
+    length = 0
+    while length < max_precision and len({corner[length] for corner in corners}) == 1:
+        length += 1
+
+    return corners[0][:length]
+
+
+def covering_cells(min_lat: float, min_lon: float, max_lat: float, max_lon: float, max_cells: int = 32) -> List[str]:
+    """
+    The finest set of same-precision geohash cells, at most ``max_cells``, covering a bounding box.
+
+    Args:
+        min_lat: Southern edge of the box
+        min_lon: Western edge of the box (must not exceed ``max_lon``)
+        max_lat: Northern edge of the box
+        max_lon: Eastern edge of the box
+        max_cells: Upper bound on the number of returned cells
+
+    Returns:
+        List[str]: Geohashes covering the box ([''] when even one-character cells are too many)
+    """
+    best = 0
+    for precision in range(1, MAX_PRECISION + 1):
+        rows, cols = _grid_span(min_lat, min_lon, max_lat, max_lon, precision)
+        if len(rows) * len(cols) > max_cells:
+            break
+        best = precision
+
+    if best == 0:
+        return ['']
+
+    height, width = cell_size(best)
+    rows, cols = _grid_span(min_lat, min_lon, max_lat, max_lon, best)
+    return [
+        encode(-90.0 + (row + 0.5) * height, -180.0 + (col + 0.5) * width, best)
+        for row in rows
+        for col in cols
+    ]
+
+
+def safe_radius_km(latitude: float, precision: int) -> float:
+    """
+    Radius around a point guaranteed to lie inside the 3x3 block of cells around it.
+
+    Args:
+        latitude: Latitude of the point in decimal degrees
+        precision: Precision of the cells
+
+    Returns:
+        float: Radius in kilometers
+    """
+    height, width = cell_size(precision)
+    edge_lat = min(90.0, abs(latitude) + 1.5 * height)
+    return min(height * KM_PER_DEGREE, width * KM_PER_DEGREE * math.cos(math.radians(edge_lat)))
+
+
+def _grid_span(min_lat: float, min_lon: float, max_lat: float, max_lon: float, precision: int) -> Tuple[range, range]:
+    """Row and column indices of the precision grid touched by a bounding box."""
+    height, width = cell_size(precision)
+    max_row = (1 << ((5 * precision) // 2)) - 1
+    max_col = (1 << ((5 * precision + 1) // 2)) - 1
+
+    first_row = min(max_row, max(0, int((min_lat + 90.0) // height)))
+    last_row = min(max_row, max(0, int((max_lat + 90.0) // height)))
+    first_col = min(max_col, max(0, int((min_lon + 180.0) // width)))
+    last_col = min(max_col, max(0, int((max_lon + 180.0) // width)))
+
+    return range(first_row, last_row + 1), range(first_col, last_col + 1)
@@ -0,0 +1,141 @@
+"""
+GPX parsing utilities for the TERRA App.
+"""
+
+import logging
+import xml.etree.ElementTree as ET
+from typing import BinaryIO, Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+from app.utils.validators import validate_coordinates
+
+logger = logging.getLogger(__name__)
+
+GPX_NAMESPACE = 'http://www.topografix.com/GPX/1/1'
+
+_TRK_TAG = f'{{{GPX_NAMESPACE}}}trk'
+_TRKSEG_TAG = f'{{{GPX_NAMESPACE}}}trkseg'
+_TRKPT_TAG = f'{{{GPX_NAMESPACE}}}trkpt'
+_NAME_TAG = f'{{{GPX_NAMESPACE}}}name'
+
+
+def iter_track_points(
+    source: BinaryIO, default_names: bool = True, segment_starts: Optional[List[int]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Incrementally parse the track points of a GPX document.
+
+    The document is read with ``iterparse`` and every element is detached from
+    the tree as soon as it has been processed, so memory use stays bounded by
+    the size of a single track point regardless of the document size.
+
+    Args:
+        source: Binary file-like object containing the GPX document
+        default_names: Label points without a <name> as "Point N" instead of None
+        segment_starts: If given, the 'order' of the first point of every track
+            segment that has valid points is appended to it
+
+    Yields:
+        Dict[str, Any]: Waypoint dictionaries with 'latitude', 'longitude', 'name'
+        and 'order' keys; 'order' is contiguous across track segments
+
+    Raises:
+        xml.etree.ElementTree.ParseError: If the document is not well-formed XML
+    """
+    stack: List[ET.Element] = []
+    in_track = 0
+    segment_index = 0
+    segment_start = None
+    order = 0
+
+    for event, elem in ET.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            stack.append(elem)
+            if elem.tag == _TRK_TAG:
+                in_track += 1
+            elif elem.tag == _TRKSEG_TAG:
+                segment_index = 0
+                segment_start = None
+            continue
+
+        stack.pop()
+        parent = stack[-1] if stack else None
+
+        if elem.tag == _TRKPT_TAG and in_track:
+            segment_index += 1
+            try:
+                lat = float(elem.get('lat'))
+                lon = float(elem.get('lon'))
+
+                if not validate_coordinates(lat, lon):
+                    logger.warning(f"Invalid coordinates in GPX: {lat}, {lon}. Skipping point.")
+                else:
+                    point_name = elem.findtext(_NAME_TAG)
+                    if point_name is None and default_names:
+                        point_name = f"Point {segment_index}"
+                    if segment_start is None:
+                        segment_start = order
+                        if segment_starts is not None:
+                            segment_starts.append(order)
+                    yield {
+                        'latitude': lat,
+                        'longitude': lon,
+                        'name': point_name,
+                        'order': order
+                    }
+                    order += 1
+            except (ValueError, TypeError) as e:
+                logger.warning(f"Error processing GPX point: {e}. Skipping point.")
+        elif elem.tag == _TRK_TAG:
+            in_track -= 1
+
+        # Detach processed elements so the partial tree never grows
+        if elem.tag == _TRKPT_TAG or (parent is not None and len(stack) <= 2):
+            elem.clear()
+            if parent is not None:
+                parent.remove(elem)
+
+
+def gpx_header(name: str, description: Optional[str] = None, creator: str = 'TERRA App') -> str:
+    """
+    Opening of a single-track GPX 1.1 document, up to and including <trkseg>.
+
+    Args:
+        name: Track name
+        description: Track description
+        creator: Value of the creator attribute
+
+    Returns:
+        str: The document prefix
+    """
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n',
+        f'<gpx version="1.1" creator={quoteattr(creator)} xmlns="{GPX_NAMESPACE}">\n',
+        f'<trk><name>{escape(name)}</name>',
+    ]
+    if description:
+        parts.append(f'<desc>{escape(description)}</desc>')
+    parts.append('\n<trkseg>\n')
+    return ''.join(parts)
+
+
+def gpx_footer() -> str:
+    """Closing of a document started with ``gpx_header``."""
+    return '</trkseg>\n</trk>\n</gpx>\n'
+
+
+def gpx_track_points(points: Iterable[Tuple[Optional[str], float, float]]) -> str:
+    """
+    Format track points as <trkpt> elements, one per line.
+
+    Args:
+        points: (name, latitude, longitude) tuples; points without a name get no <name>
+
+    Returns:
+        str: The XML fragment
+    """
+    return ''.join(
+        f'<trkpt lat="{lat!r}" lon="{lon!r}"><name>{escape(name)}</name></trkpt>\n' if name is not None
+        else f'<trkpt lat="{lat!r}" lon="{lon!r}"/>\n'
+        for name, lat, lon in points
+    )
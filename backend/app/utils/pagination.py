@@ -0,0 +1,120 @@
+"""
+Keyset (cursor) pagination utilities for the TERRA App.
+
+Listings are ordered by ``(created_at, id)`` descending, and a cursor is an
+opaque token encoding the sort key of the last item of the previous page, so
+every page is an index range scan no matter how deep it is.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Awaitable, Callable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, select, tuple_
+
+KeysetPosition = Tuple[datetime, int]
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """
+    Encode a sort key as an opaque cursor token.
+
+    Args:
+        created_at: Creation timestamp of the last item of a page
+        id: ID of the last item of a page
+
+    Returns:
+        str: URL-safe cursor token
+    """
+    payload = json.dumps([created_at.isoformat(), id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> KeysetPosition:
+    """
+    Decode a cursor token produced by ``encode_cursor``.
+
+    Args:
+        cursor: The cursor token
+
+    Returns:
+        Tuple[datetime, int]: The (created_at, id) sort key
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(created_at), int(id)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def keyset_select(model: Any, limit: int, after: Optional[KeysetPosition] = None, *criteria, options: Sequence[Any] = ()) -> Select:
+    """
+    Build the query of one keyset page, shared by the sync and async repositories.
+
+    Args:
+        model: Mapped class with ``created_at`` and ``id`` columns
+        limit: Maximum number of rows
+        after: Sort key of the last item of the previous page, or None for the first page
+        *criteria: Additional filter criteria
+        options: Loader options
+
+    Returns:
+        Select: Rows ordered by (created_at, id) descending, starting after ``after``
+    """
+    statement = select(model).where(*criteria).options(*options)
+    if after is not None:
+        statement = statement.where(tuple_(model.created_at, model.id) < tuple_(*after))
+    return statement.order_by(model.created_at.desc(), model.id.desc()).limit(limit)
+
+
+def keyset_page(
+    fetch: Callable[[int, Optional[KeysetPosition]], List[Any]],
+    cursor: Optional[str],
+    limit: int
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Fetch one page of a keyset-paginated listing.
+
+    Args:
+        fetch: Callable returning up to ``n`` items after a position (or from the start)
+        cursor: Cursor of the page to fetch, or None for the first page
+        limit: Page size
+
+    Returns:
+        Tuple[List[Any], Optional[str]]: The page items and the cursor of the next page,
+        or None when this is the last page
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    after = decode_cursor(cursor) if cursor else None
+    return _split_page(fetch(limit + 1, after), limit)
+
+
+async def keyset_page_async(
+    fetch: Callable[[int, Optional[KeysetPosition]], Awaitable[List[Any]]],
+    cursor: Optional[str],
+    limit: int
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Async variant of ``keyset_page`` for awaitable fetch functions.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    after = decode_cursor(cursor) if cursor else None
+    return _split_page(await fetch(limit + 1, after), limit)
+
+
+def _split_page(items: List[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Cut ``limit + 1`` fetched items to a page and the cursor of the next one."""
+    if len(items) <= limit:
+        return items, None
+
+    last = items[limit - 1]
+    return items[:limit], encode_cursor(last.created_at, last.id)
@@ -0,0 +1,100 @@
+"""
+Fast JSON serialization for large API responses.
+
+``dumps`` encodes with orjson but produces exactly the bytes FastAPI's default
+``JSONResponse`` would (``json.dumps`` with compact separators and
+``ensure_ascii=False``), so a fast-path response is indistinguishable from one
+built through the pydantic response model.
+"""
+
+import json
+from datetime import date, datetime
+from operator import attrgetter, itemgetter
+from typing import Any, Dict, Iterable, List, Sequence
+
+import numpy as np
+import orjson
+
+# orjson and repr() format floats identically except in these magnitude ranges
+_REPR_MIN_FIXED = 1e-4
+_REPR_MAX_FIXED = 1e16
+
+
+def floats_match_stdlib(values: Iterable[float]) -> bool:
+    """
+    Check whether orjson formats every value exactly like ``json.dumps``.
+
+    Python switches to exponent notation below 1e-4 and from 1e16 on, orjson
+    at different thresholds and without exponent padding. Non-finite values
+    are rejected by both paths differently, so they also report False.
+
+    Args:
+        values: Floats (or None) that will appear in the payload
+
+    Returns:
+        bool: True if the orjson output is byte-identical for these values
+    """
+    magnitudes = np.abs(np.fromiter((value or 0.0 for value in values), dtype=np.float64))
+    if magnitudes.size == 0:
+        return True
+
+    nonzero = magnitudes[magnitudes != 0.0]
+    return bool(np.isfinite(magnitudes).all() and (
+        nonzero.size == 0 or (nonzero.min() >= _REPR_MIN_FIXED and nonzero.max() < _REPR_MAX_FIXED)
+    ))
+
+
+def _isoformat(value: Any) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any, floats: Iterable[float] = ()) -> bytes:
+    """
+    Encode content to JSON bytes, identical to FastAPI's ``JSONResponse`` rendering.
+
+    Args:
+        content: Dicts, lists, strings, numbers, None and datetimes
+        floats: Every float in ``content``; when any of them would be formatted
+            differently by orjson, the standard library encoder is used instead
+
+    Returns:
+        bytes: The UTF-8 encoded JSON document
+    """
+    if floats_match_stdlib(floats):
+        return orjson.dumps(content)
+
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"), default=_isoformat
+    ).encode("utf-8")
+
+
+def rows_to_dicts(rows: Sequence[Any], fields: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    Build plain dicts from row tuples or objects without instantiating models.
+
+    Rows and named tuples are read by position, which is much faster than
+    attribute access on SQLAlchemy rows; other objects by attribute.
+
+    Args:
+        rows: SQLAlchemy rows, named tuples or ORM objects exposing ``fields``
+        fields: Attribute names, in output order
+
+    Returns:
+        List[Dict[str, Any]]: One dict per row
+    """
+    if not rows:
+        return []
+
+    row_fields = getattr(rows[0], '_fields', None)
+    if row_fields is not None:
+        getter = itemgetter(*(row_fields.index(name) for name in fields))
+    else:
+        getter = attrgetter(*fields)
+
+    if len(fields) == 1:
+        name = fields[0]
+        return [{name: getter(row)} for row in rows]
+
+    return [dict(zip(fields, getter(row))) for row in rows]
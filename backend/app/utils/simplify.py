@@ -0,0 +1,101 @@
+"""
+Line simplification utilities for the TERRA App.
+
+Routes are stored at full resolution, but every waypoint also records the
+coarsest level of detail it belongs to, so a simplified geometry is simply
+"all waypoints with ``detail_level >= level``".
+"""
+
+from typing import Sequence
+
+import numpy as np
+
+from app.utils.geo import EARTH_RADIUS_KM
+
+_EARTH_RADIUS_M = EARTH_RADIUS_KM * 1000.0
+
+
+def douglas_peucker_significance(lats: np.ndarray, lons: np.ndarray, min_tolerance: float = 0.0) -> np.ndarray:
+    """
+    Calculate the Douglas-Peucker significance of every point of a track.
+
+    The significance of a point is the largest tolerance (in meters) at which
+    Douglas-Peucker still keeps it, so the simplification at tolerance ``t`` is
+    exactly the set of points with ``significance > t``. End points are always kept.
+
+    Args:
+        lats: Latitudes of the track points in decimal degrees
+        lons: Longitudes of the track points in decimal degrees
+        min_tolerance: Segments whose points are all within this distance are not
+            refined further; their interior points get significance 0
+
+    Returns:
+        np.ndarray: Significance per point in meters (``inf`` for the end points)
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    n = lats.size
+    significance = np.zeros(n, dtype=np.float64)
+    if n == 0:
+        return significance
+
+    significance[0] = significance[-1] = np.inf
+    if n < 3:
+        return significance
+
+    # Local equirectangular projection, accurate enough for tolerance checks
+    lat_rad = np.radians(lats)
+    x = np.radians(lons) * np.cos(lat_rad.mean()) * _EARTH_RADIUS_M
+    y = lat_rad * _EARTH_RADIUS_M
+
+    stack = [(0, n - 1, np.inf)]
+    while stack:
+        start, end, parent = stack.pop()
+        if end - start < 2:
+            continue
+
+        distances = _segment_distances(x[start + 1:end], y[start + 1:end], x[start], y[start], x[end], y[end])
+        index = int(distances.argmax())
+        distance = float(distances[index])
+        if distance <= min_tolerance:
+            continue
+
+        split = start + 1 + index
+        significance[split] = min(distance, parent)
+        stack.append((start, split, significance[split]))
+        stack.append((split, end, significance[split]))
+
+    return significance
+
+
+def detail_levels(lats: np.ndarray, lons: np.ndarray, tolerances: Sequence[float]) -> np.ndarray:
+    """
+    Assign every point of a track the coarsest level of detail it belongs to.
+
+    Args:
+        lats: Latitudes of the track points in decimal degrees
+        lons: Longitudes of the track points in decimal degrees
+        tolerances: Increasing tolerances in meters; level 0 is full resolution
+
+    Returns:
+        np.ndarray: Integer level per point; level ``k`` keeps points with ``level >= k``
+    """
+    tolerances = np.asarray(tolerances, dtype=np.float64)
+    min_tolerance = float(tolerances[1]) if tolerances.size > 1 else np.inf
+    significance = douglas_peucker_significance(lats, lons, min_tolerance=min_tolerance)
+
+    # Number of non-zero tolerances strictly below each significance
+    levels = np.searchsorted(tolerances[1:], significance, side='left')
+    return levels.astype(np.int16)
+
+
+def _segment_distances(px: np.ndarray, py: np.ndarray, ax: float, ay: float, bx: float, by: float) -> np.ndarray:
+    """Distance from points (px, py) to the segment A-B in projected coordinates."""
+    dx = bx - ax
+    dy = by - ay
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0.0:
+        return np.hypot(px - ax, py - ay)
+
+    t = np.clip(((px - ax) * dx + (py - ay) * dy) / length_sq, 0.0, 1.0)
+    return np.hypot(px - (ax + t * dx), py - (ay + t * dy))
@@ -0,0 +1,117 @@
+"""
+Packed binary encoding of route geometry for the TERRA App.
+
+A packed track stores every point of a route in one binary value instead of one
+database row per waypoint. Layout (little endian)::
+
+    header   16 bytes  magic 'TRK1', encoding (uint8), reserved, point count (uint32), reserved
+    lats     n values  float64 degrees, or int32 microdegree deltas
+    lons     n values  float64 degrees, or int32 microdegree deltas
+    levels   n bytes   int8 level of detail per point
+
+The float64 encoding decodes without copying (the arrays are read-only views of
+the blob); the delta encoding is about half the size and needs one cumulative sum.
+"""
+
+import struct
+from typing import Tuple
+
+import numpy as np
+
+MAGIC = b'TRK1'
+ENCODING_FLOAT64 = 0
+ENCODING_DELTA = 1
+ENCODINGS = {'float64': ENCODING_FLOAT64, 'delta': ENCODING_DELTA}
+
+MICRODEGREES = 1_000_000
+
+_HEADER = struct.Struct('<4sBxHII')
+
+
+def pack_track(lats: np.ndarray, lons: np.ndarray, levels: np.ndarray, encoding: str = 'delta') -> bytes:
+    """
+    Pack a track into its binary representation.
+
+    Args:
+        lats: Latitudes of the track points in decimal degrees
+        lons: Longitudes of the track points in decimal degrees
+        levels: Level of detail of every point
+        encoding: 'delta' (int32 microdegree deltas) or 'float64' (exact, zero-copy reads)
+
+    Returns:
+        bytes: The packed track
+
+    Raises:
+        ValueError: If the encoding is unknown or the arrays differ in length
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown track encoding: {encoding}")
+
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    levels = np.asarray(levels, dtype=np.int8)
+    count = lats.size
+    if lons.size != count or levels.size != count:
+        raise ValueError("Track arrays must have the same length")
+
+    header = _HEADER.pack(MAGIC, ENCODINGS[encoding], 0, count, 0)
+    if encoding == 'float64':
+        return b''.join((header, lats.astype('<f8').tobytes(), lons.astype('<f8').tobytes(), levels.tobytes()))
+
+    return b''.join((
+        header,
+        _delta_encode(lats).tobytes(),
+        _delta_encode(lons).tobytes(),
+        levels.tobytes(),
+    ))
+
+
+def unpack_track(blob: bytes) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Decode a packed track.
+
+    Args:
+        blob: Bytes produced by ``pack_track``
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Latitudes, longitudes and levels of detail
+
+    Raises:
+        ValueError: If the blob is not a packed track
+    """
+    buffer = memoryview(blob)
+    if len(buffer) < _HEADER.size:
+        raise ValueError("Packed track is truncated")
+
+    magic, encoding, _, count, _ = _HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError("Not a packed track")
+
+    item_size = 8 if encoding == ENCODING_FLOAT64 else 4
+    if len(buffer) != _HEADER.size + count * (2 * item_size + 1):
+        raise ValueError("Packed track is truncated")
+
+    offset = _HEADER.size
+    if encoding == ENCODING_FLOAT64:
+        lats = np.frombuffer(buffer, dtype='<f8', count=count, offset=offset)
+        lons = np.frombuffer(buffer, dtype='<f8', count=count, offset=offset + 8 * count)
+    elif encoding == ENCODING_DELTA:
+        lats = _delta_decode(np.frombuffer(buffer, dtype='<i4', count=count, offset=offset))
+        lons = _delta_decode(np.frombuffer(buffer, dtype='<i4', count=count, offset=offset + 4 * count))
+    else:
+        raise ValueError(f"Unknown track encoding: {encoding}")
+
+    levels = np.frombuffer(buffer, dtype=np.int8, count=count, offset=offset + 2 * item_size * count)
+    return lats, lons, levels
+
+
+def _delta_encode(values: np.ndarray) -> np.ndarray:
+    """Quantize degrees to microdegrees and store the first value followed by successive deltas."""
+    quantized = np.rint(values * MICRODEGREES).astype(np.int64)
+    deltas = np.diff(quantized, prepend=0)
+    return deltas.astype('<i4')
+
+
+def _delta_decode(deltas: np.ndarray) -> np.ndarray:
+    """Inverse of ``_delta_encode``."""
+    return np.cumsum(deltas, dtype=np.int64) / MICRODEGREES
@@ -0,0 +1,9 @@
+"""
+Performance benchmarks for the TERRA App backend.
+
+Run individual benchmarks from the ``backend`` directory, e.g.
+``python -m benchmarks.bench_waypoint_insert``. ``python -m benchmarks.suite``
+runs the regression suite of hot-path micro-benchmarks against stored JSON
+baselines, ``python -m benchmarks.loadtest`` load tests the whole API and
+``python -m benchmarks.startup`` profiles imports and the time to first request.
+"""
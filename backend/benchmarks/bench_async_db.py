@@ -0,0 +1,108 @@
+"""
+Compare slow queries issued from async code through the sync Session and through AsyncSession.
+
+Usage: python -m benchmarks.bench_async_db [CONCURRENCY] [QUERY_MS]
+
+Every "request" runs ``SELECT sleep(QUERY_MS)`` against a temporary SQLite file,
+where ``sleep`` is a SQL function registered on each connection. A ticker task
+measures how long the event loop stays blocked; with the sync Session the
+queries run one after another on the loop thread, with AsyncSession they
+overlap and the loop stays responsive.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from benchmarks.common import print_table
+
+QUERY = text("SELECT sleep(:ms)")
+
+
+def _sleep(ms):
+    time.sleep(ms / 1000.0)
+    return ms
+
+
+def _register_sleep(dbapi_connection, connection_record):
+    dbapi_connection.create_function("sleep", 1, _sleep)
+
+
+async def _ticker(stop: asyncio.Event, interval: float = 0.001) -> float:
+    """Return the largest event loop stall observed until ``stop`` is set, in seconds."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def _measure(requests):
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(stop))
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await asyncio.gather(*requests)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return elapsed, await ticker
+
+
+async def run_sync_session(url, concurrency, query_ms):
+    engine = create_engine(url)
+    event.listen(engine, "connect", _register_sleep)
+
+    async def request():
+        with Session(engine) as db:
+            db.execute(QUERY, {"ms": query_ms})
+
+    try:
+        return await _measure([request() for _ in range(concurrency)])
+    finally:
+        engine.dispose()
+
+
+async def run_async_session(url, concurrency, query_ms):
+    engine = create_async_engine(url)
+    event.listen(engine.sync_engine, "connect", _register_sleep)
+
+    async def request():
+        async with AsyncSession(engine) as db:
+            await db.execute(QUERY, {"ms": query_ms})
+
+    try:
+        return await _measure([request() for _ in range(concurrency)])
+    finally:
+        await engine.dispose()
+
+
+def run(concurrency, query_ms):
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        for mode, runner, url in (
+            ("sync Session", run_sync_session, f"sqlite:///{path}"),
+            ("AsyncSession", run_async_session, f"sqlite+aiosqlite:///{path}"),
+        ):
+            elapsed, stall = asyncio.run(runner(url, concurrency, query_ms))
+            rows.append([
+                mode,
+                f"{elapsed * 1000:.0f}",
+                f"{concurrency / elapsed:.1f}",
+                f"{stall * 1000:.0f}",
+            ])
+
+    print(f"{concurrency} concurrent requests x {query_ms} ms query")
+    print_table(["session", "total ms", "requests/s", "max loop stall ms"], rows)
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    run(args[0] if args else 20, args[1] if len(args) > 1 else 50)
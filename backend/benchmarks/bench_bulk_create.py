@@ -0,0 +1,58 @@
+"""
+Compare creating many routes one by one with the bulk creation path.
+
+Usage: python -m benchmarks.bench_bulk_create [ROUTES [POINTS]]
+
+"single" calls ``RouteService.create_route`` per route (one transaction each);
+"bulk" calls ``RouteService.create_routes_bulk`` once for the whole batch.
+"""
+
+import sys
+
+from app.services.route_service import RouteService
+from benchmarks.common import make_session, print_table, synthetic_waypoints, timed
+
+DEFAULT_ROUTES = 300
+DEFAULT_POINTS = 200
+
+
+def make_items(count: int, points: int, prefix: str):
+    return [
+        (
+            {'name': f"{prefix}-{i}", 'user_id': 1, 'start_point': "", 'end_point': "", 'source_type': "manual"},
+            synthetic_waypoints(points, lat0=40.0 + i * 0.001)
+        )
+        for i in range(count)
+    ]
+
+
+def run(count: int, points: int):
+    db = make_session()
+    route_service = RouteService(db)
+    results = {}
+
+    with timed(results, "single"):
+        for route_data, waypoints_data in make_items(count, points, "single"):
+            route_service.create_route(route_data, waypoints_data)
+    db.expunge_all()
+
+    with timed(results, "bulk"):
+        outcomes = route_service.create_routes_bulk(make_items(count, points, "bulk"))
+    assert all(outcome.route_id is not None for outcome in outcomes)
+
+    db.close()
+    print_table(
+        ["routes", "points/route", "single ms", "bulk ms", "speedup"],
+        [[
+            count,
+            points,
+            f"{results['single'] * 1000:.0f}",
+            f"{results['bulk'] * 1000:.0f}",
+            f"{results['single'] / results['bulk']:.1f}x",
+        ]]
+    )
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    run(*(args + [DEFAULT_ROUTES, DEFAULT_POINTS][len(args):]))
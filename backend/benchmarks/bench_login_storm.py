@@ -0,0 +1,114 @@
+"""
+Measure login latency and the latency of an unrelated endpoint during a login storm.
+
+Usage: python -m benchmarks.bench_login_storm [LOGINS] [WORKERS ...]
+
+The API runs in process (httpx ASGI transport) against a temporary SQLite file.
+LOGINS concurrent logins are fired while a probe requests ``GET /api/`` every 10 ms;
+with 0 workers bcrypt runs inline on the event loop, otherwise on the password
+hashing pool of that size (PASSWORD_HASH_EXECUTOR selects threads or processes).
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+import numpy as np
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.core.security import get_password_hash, shutdown_password_executor
+from app.db.models import User
+from app.db.session import get_async_db
+from benchmarks.common import make_session, print_table
+from main import app
+
+PASSWORD = "Passw0rd!bench"
+PROBE_INTERVAL = 0.01
+
+
+async def _storm(logins):
+    login_times = []
+    probe_times = []
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        async def login():
+            start = time.perf_counter()
+            response = await client.post(
+                f"{settings.API_PREFIX}/auth/token", data={"username": "bench", "password": PASSWORD}
+            )
+            login_times.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+
+        async def probe():
+            # Fixed schedule; latency counts from the planned send time so a
+            # blocked loop shows up as delay instead of as fewer samples
+            planned = time.perf_counter()
+            while not done.is_set():
+                planned += PROBE_INTERVAL
+                await asyncio.sleep(max(0.0, planned - time.perf_counter()))
+                await client.get(f"{settings.API_PREFIX}/")
+                probe_times.append(time.perf_counter() - planned)
+
+        prober = asyncio.create_task(probe())
+        await asyncio.sleep(0.05)
+        start = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await prober
+
+    return elapsed, np.array(login_times) * 1000, np.array(probe_times) * 1000
+
+
+def run(logins, worker_counts):
+    original_workers = settings.PASSWORD_HASH_WORKERS
+    rows = []
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bench.db")
+            db = make_session(f"sqlite:///{path}")
+            db.query(User).update({User.hashed_password: get_password_hash(PASSWORD)})
+            db.commit()
+            db.close()
+
+            engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+            sessions = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+            async def override_db():
+                async with sessions() as session:
+                    yield session
+
+            app.dependency_overrides[get_async_db] = override_db
+            for workers in worker_counts:
+                shutdown_password_executor()
+                settings.PASSWORD_HASH_WORKERS = workers
+                elapsed, login_ms, probe_ms = asyncio.run(_storm(logins))
+                rows.append([
+                    "inline" if workers == 0 else f"{workers} {settings.PASSWORD_HASH_EXECUTOR}s",
+                    f"{logins / elapsed:.1f}",
+                    f"{np.percentile(login_ms, 50):.0f}",
+                    f"{np.percentile(login_ms, 99):.0f}",
+                    len(probe_ms),
+                    f"{np.percentile(probe_ms, 50):.1f}",
+                    f"{np.percentile(probe_ms, 99):.1f}",
+                ])
+            asyncio.run(engine.dispose())
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+        shutdown_password_executor()
+        settings.PASSWORD_HASH_WORKERS = original_workers
+
+    print(f"{logins} concurrent logins")
+    print_table(
+        ["hashing", "logins/s", "login p50 ms", "login p99 ms", "probes", "probe p50 ms", "probe p99 ms"], rows
+    )
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    run(args[0] if args else 32, args[1:] or [0, settings.PASSWORD_HASH_WORKERS])
@@ -0,0 +1,83 @@
+"""
+Compare table size and read speed of per-row and packed waypoint storage.
+
+Usage: python -m benchmarks.bench_packed_storage [ROUTES] [POINTS]
+
+Both layouts are written to temporary SQLite files holding the same routes;
+sizes are the database file sizes after VACUUM.
+"""
+
+import os
+import sys
+import tempfile
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.services.route_service import RouteService
+from benchmarks.common import make_session, print_table, synthetic_waypoints, timed
+
+
+def build(url, storage, route_count, point_count):
+    settings.WAYPOINT_STORAGE = storage
+    db = make_session(url)
+    route_service = RouteService(db)
+    route_ids = []
+    for i in range(route_count):
+        route = route_service.create_route(
+            {'name': f"bench-{i}", 'user_id': 1, 'start_point': "", 'end_point': "", 'source_type': "gpx"},
+            synthetic_waypoints(point_count, lat0=40.0 + i * 0.01)
+        )
+        route_ids.append(route.id)
+    db.close()
+    db.get_bind().dispose()
+    return route_ids
+
+
+def measure(url, route_ids):
+    engine = create_engine(url)
+    with engine.connect() as connection:
+        connection.execute(text("VACUUM"))
+
+    db = sessionmaker(bind=engine)()
+    route_service = RouteService(db)
+    results = {}
+    with timed(results, "arrays"):
+        for route_id in route_ids:
+            route_service.get_track(route_service.get_route(route_id))
+    db.expire_all()
+    with timed(results, "waypoints"):
+        for route_id in route_ids:
+            route_service.get_route_waypoints(route_service.get_route(route_id))
+    db.close()
+    engine.dispose()
+    return results
+
+
+def run(route_count, point_count):
+    original_storage = settings.WAYPOINT_STORAGE
+    rows = []
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for storage in ("rows", "packed"):
+                path = os.path.join(directory, f"{storage}.db")
+                url = f"sqlite:///{path}"
+                route_ids = build(url, storage, route_count, point_count)
+                results = measure(url, route_ids)
+                rows.append([
+                    storage,
+                    f"{os.path.getsize(path) / 1024 / 1024:.2f}",
+                    f"{results['arrays'] * 1000 / route_count:.2f}",
+                    f"{results['waypoints'] * 1000 / route_count:.2f}",
+                ])
+    finally:
+        settings.WAYPOINT_STORAGE = original_storage
+
+    print(f"{route_count} routes x {point_count} points ({settings.PACKED_GEOMETRY_ENCODING} encoding)")
+    print_table(["storage", "db MiB", "read arrays ms/route", "read waypoints ms/route"], rows)
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    run(args[0] if args else 20, args[1] if len(args) > 1 else 20_000)
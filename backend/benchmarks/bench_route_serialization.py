@@ -0,0 +1,79 @@
+"""
+Compare serializing a route response through the pydantic response model with the fast path.
+
+Usage: python -m benchmarks.bench_route_serialization [POINTS ...]
+
+"model" is the previous path: ORM waypoints, ``Route``/``Waypoint`` models with
+orm_mode, ``jsonable_encoder`` and ``JSONResponse``. "fast" reads waypoint rows
+as tuples and encodes dicts with orjson. Both outputs are checked to be identical.
+"""
+
+import sys
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.api.routes.routes import _route_response
+from app.api.schemas.route import Route, Waypoint as WaypointSchema
+from app.services.route_service import RouteService
+from benchmarks.common import make_session, print_table, synthetic_waypoints, timed
+
+DEFAULT_SIZES = [1_000, 20_000, 100_000]
+REPEAT = 5
+
+
+def model_response(route, waypoints) -> bytes:
+    fields = {name: getattr(route, name) for name in Route.__fields__ if name != "waypoints"}
+    model = Route(**fields, waypoints=[WaypointSchema.from_orm(waypoint) for waypoint in waypoints])
+    return JSONResponse(content=jsonable_encoder(model)).body
+
+
+def run(sizes):
+    db = make_session()
+    route_service = RouteService(db)
+    rows = []
+
+    for size in sizes:
+        route = route_service.create_route(
+            {'name': f"bench-{size}", 'user_id': 1, 'start_point': "", 'end_point': "", 'source_type': "manual"},
+            synthetic_waypoints(size)
+        )
+        results = {}
+
+        with timed(results, "model load"):
+            for _ in range(REPEAT):
+                orm_waypoints = route_service.repository.get_waypoints(route.id)
+        with timed(results, "model encode"):
+            for _ in range(REPEAT):
+                model_body = model_response(route, orm_waypoints)
+
+        with timed(results, "fast load"):
+            for _ in range(REPEAT):
+                waypoint_rows = route_service.get_route_waypoints(route)
+        with timed(results, "fast encode"):
+            for _ in range(REPEAT):
+                fast_body = _route_response(route, waypoint_rows).body
+
+        assert fast_body == model_body, "fast path output differs from the response model"
+        model_ms = (results["model load"] + results["model encode"]) * 1000 / REPEAT
+        fast_ms = (results["fast load"] + results["fast encode"]) * 1000 / REPEAT
+        rows.append([
+            size,
+            f"{results['model load'] * 1000 / REPEAT:.1f}",
+            f"{results['model encode'] * 1000 / REPEAT:.1f}",
+            f"{results['fast load'] * 1000 / REPEAT:.1f}",
+            f"{results['fast encode'] * 1000 / REPEAT:.1f}",
+            f"{model_ms / fast_ms:.1f}x",
+            f"{len(fast_body) / 1024:.0f}",
+        ])
+        db.expunge_all()
+
+    db.close()
+    print_table(
+        ["waypoints", "model load ms", "model encode ms", "fast load ms", "fast encode ms", "speedup", "KiB"], rows
+    )
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    run(sizes)
@@ -0,0 +1,52 @@
+"""
+Compare the per-row ORM waypoint insert path with the bulk path of
+RouteRepository.create_with_waypoints.
+
+Usage: python -m benchmarks.bench_waypoint_insert [SIZE ...]
+
+Set BENCHMARK_DATABASE_URL to run against PostgreSQL (the bulk path then uses COPY);
+the default is an in-memory SQLite database. The target schema is dropped and recreated,
+so the database name must mark it as a scratch one (see benchmarks.common.make_session).
+"""
+
+import sys
+
+from app.db.repositories.route import RouteRepository
+from benchmarks.common import make_session, print_table, synthetic_waypoints, timed
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+
+def run(sizes):
+    db = make_session()
+    repository = RouteRepository(db)
+    rows = []
+    
+    for size in sizes:
+        waypoints = synthetic_waypoints(size)
+        results = {}
+        for mode, bulk in (("orm", False), ("bulk", True)):
+            route_data = {
+                'name': f"bench-{mode}-{size}",
+                'user_id': 1,
+                'start_point': "0,0",
+                'end_point': "0,0",
+                'source_type': "manual",
+            }
+            with timed(results, mode):
+                repository.create_with_waypoints(route_data, [dict(wp) for wp in waypoints], bulk=bulk)
+            db.expunge_all()
+        
+        rows.append([
+            size,
+            f"{results['orm'] * 1000:.1f}",
+            f"{results['bulk'] * 1000:.1f}",
+            f"{results['orm'] / results['bulk']:.1f}x",
+        ])
+    
+    print(f"dialect: {db.get_bind().dialect.name}")
+    print_table(["waypoints", "orm ms", "bulk ms", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    run([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,95 @@
+"""
+Shared helpers for the benchmark scripts.
+"""
+
+import math
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.models import Base, User
+
+BENCHMARK_DATABASE_URL = os.getenv("BENCHMARK_DATABASE_URL", "sqlite://")
+# Set to 1 to let the benchmarks drop the schema of a database that does not look like a scratch one
+BENCHMARK_ALLOW_DROP = os.getenv("BENCHMARK_ALLOW_DROP") == "1"
+# A database whose name contains one of these is assumed to be disposable
+SCRATCH_DATABASE_MARKERS = ("bench", "test", "scratch")
+
+
+def synthetic_waypoints(count: int, lat0: float = 40.0, lon0: float = -3.0) -> List[Dict[str, Any]]:
+    """Generate a smooth, wiggly track of ``count`` waypoint dictionaries."""
+    waypoints = []
+    for i in range(count):
+        t = i / 1000.0
+        waypoints.append({
+            'name': None,
+            'latitude': lat0 + t * 0.01 + 0.001 * math.sin(t * 7.0),
+            'longitude': lon0 + t * 0.01 + 0.001 * math.cos(t * 5.0),
+            'order': i,
+        })
+    return waypoints
+
+
+def is_scratch_database(url: str) -> bool:
+    """
+    Whether ``url`` points at a database the benchmarks may wipe.
+
+    In-memory and temporary SQLite databases qualify, as does any database
+    whose name contains one of ``SCRATCH_DATABASE_MARKERS``.
+    """
+    parsed = make_url(url)
+    database = parsed.database or ""
+    if parsed.get_backend_name() == "sqlite":
+        if database in ("", ":memory:"):
+            return True
+        directory = os.path.realpath(tempfile.gettempdir())
+        if os.path.realpath(database).startswith(directory + os.sep):
+            return True
+    name = os.path.basename(database).lower()
+    return any(marker in name for marker in SCRATCH_DATABASE_MARKERS)
+
+
+def make_session(url: str = BENCHMARK_DATABASE_URL) -> Session:
+    """
+    Create a fresh schema on ``url`` and return a session with one seeded user.
+
+    Raises:
+        SystemExit: If ``url`` is not a scratch database and BENCHMARK_ALLOW_DROP is not set
+    """
+    if not BENCHMARK_ALLOW_DROP and not is_scratch_database(url):
+        raise SystemExit(
+            f"Refusing to drop the schema of {make_url(url).render_as_string(hide_password=True)}: "
+            f"use a database whose name contains one of {', '.join(SCRATCH_DATABASE_MARKERS)}, "
+            "or set BENCHMARK_ALLOW_DROP=1"
+        )
+    engine = create_engine(url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    db.add(User(email="bench@example.com", username="bench", hashed_password="x"))
+    db.commit()
+    return db
+
+
+@contextmanager
+def timed(results: Dict[str, float], key: str) -> Iterator[None]:
+    """Record the wall-clock duration of the block in ``results[key]`` (seconds)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        results[key] = time.perf_counter() - start
+
+
+def print_table(headers: List[str], rows: List[List[Any]]) -> None:
+    """Print a simple fixed-width table."""
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print("  ".join(str(h).rjust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print("  ".join(str(c).rjust(w) for c, w in zip(row, widths)))
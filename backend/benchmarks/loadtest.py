@@ -0,0 +1,366 @@
+"""
+Load test the API with concurrent async clients replaying a weighted traffic mix.
+
+Usage:
+    python -m benchmarks.loadtest [--target URL] [--users N] [--routes-per-user N]
+                                  [--concurrency N] [--duration SECONDS] [--mix token=5,list=30,...]
+
+By default the ``app`` from ``main.py`` is driven in process through the httpx
+ASGI transport, on a fresh SQLite database (``--database-url``, a temporary
+file unless given). With ``--target http://127.0.0.1:8000`` the requests go to
+a running server instead; start it with the same DATABASE_URL so it sees the
+seeded data, e.g.
+
+    DATABASE_URL=sqlite:///./load.db python -m benchmarks.loadtest --database-url sqlite:///./load.db --seed-only
+    DATABASE_URL=sqlite:///./load.db uvicorn main:app
+    python -m benchmarks.loadtest --database-url sqlite:///./load.db --target http://127.0.0.1:8000 --no-seed
+
+The database is seeded with ``--users`` users owning ``--routes-per-user``
+routes each, a ``--public`` fraction of them public. Operations of the mix:
+
+    token    POST /auth/token
+    list     GET /routes/ (own or public feed)
+    get      GET /routes/{id} (own or public route)
+    create   POST /routes/
+    import   POST /routes/import-gpx
+
+The report gives throughput, p50/p95/p99 latency and error rate per operation;
+the exit status is 1 if any request failed.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict, namedtuple
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from benchmarks.common import print_table, synthetic_waypoints
+
+DEFAULT_MIX = "token=5,list=30,get=45,create=12,import=8"
+PASSWORD = "Passw0rd!load"
+OPERATIONS = ("token", "list", "get", "create", "import")
+
+# One completed request: operation, HTTP status (0 for a transport error), latency in seconds
+Sample = namedtuple("Sample", ["operation", "status", "latency"])
+# Seeded account and the routes a client may read
+Account = namedtuple("Account", ["username", "route_ids"])
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """
+    Parse "operation=weight,..." into a weight per operation.
+
+    Raises:
+        ValueError: On unknown operations or negative weights
+    """
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}', expected one of {', '.join(OPERATIONS)}")
+        weights[name] = float(weight or 1)
+        if weights[name] < 0:
+            raise ValueError(f"Negative weight for '{name}'")
+    if not sum(weights.values()):
+        raise ValueError("The mix has no operation with a positive weight")
+    return weights
+
+
+def synthetic_gpx(points: int, lat0: float) -> bytes:
+    """A one-track GPX document of ``points`` synthetic points."""
+    trkpts = ''.join(
+        f'<trkpt lat="{waypoint["latitude"]:.7f}" lon="{waypoint["longitude"]:.7f}"/>'
+        for waypoint in synthetic_waypoints(points, lat0=lat0)
+    )
+    return (
+        '<?xml version="1.0"?><gpx version="1.1" xmlns="http://www.topografix.com/GPX/1/1">'
+        f'<trk><trkseg>{trkpts}</trkseg></trk></gpx>'
+    ).encode()
+
+
+def seed(users: int, routes_per_user: int, points: int, public: float, rng: random.Random) -> Tuple[List[Account], List[int]]:
+    """
+    Create the schema and seed users and routes through the service layer.
+
+    Returns:
+        Tuple[List[Account], List[int]]: The accounts with their route IDs, and the public route IDs
+    """
+    from app.core.security import get_password_hash
+    from app.db.models import Base, User
+    from app.db.session import SessionLocal, engine
+    from app.services.route_service import RouteService
+
+    Base.metadata.create_all(bind=engine)
+    # bcrypt is slow by design; every account shares one hash
+    hashed_password = get_password_hash(PASSWORD)
+    db = SessionLocal()
+    accounts = []
+    public_ids = []
+    try:
+        suffix = f"{int(time.time())}{rng.randrange(10**6)}"
+        users_created = [
+            User(username=f"load{suffix}u{i}", email=f"load{suffix}u{i}@example.com", hashed_password=hashed_password)
+            for i in range(users)
+        ]
+        db.add_all(users_created)
+        db.commit()
+
+        route_service = RouteService(db)
+        for user in users_created:
+            items = []
+            for j in range(routes_per_user):
+                is_public = rng.random() < public
+                items.append((
+                    {
+                        'name': f"{user.username} route {j}", 'user_id': user.id, 'start_point': "",
+                        'end_point': "", 'source_type': "manual", 'is_public': is_public,
+                    },
+                    synthetic_waypoints(points, lat0=40.0 + rng.random(), lon0=-3.0 + rng.random())
+                ))
+            results = route_service.create_routes_bulk(items) if items else []
+            route_ids = [result.route_id for result in results if result.route_id is not None]
+            public_ids.extend(
+                result.route_id for result, (route_data, _) in zip(results, items) if route_data['is_public']
+            )
+            accounts.append(Account(user.username, route_ids))
+    finally:
+        db.close()
+
+    return accounts, public_ids
+
+
+class LoadTest:
+    """Concurrent clients sharing one httpx client, each replaying the mix for a fixed duration."""
+
+    def __init__(
+        self, client: httpx.AsyncClient, accounts: List[Account], public_ids: List[int],
+        weights: Dict[str, float], points: int, seed: int
+    ):
+        self.client = client
+        self.accounts = accounts
+        self.public_ids = public_ids
+        self.operations = list(weights)
+        self.weights = list(weights.values())
+        self.points = points
+        self.seed = seed
+        self.tokens: Dict[str, str] = {}
+        self.samples: List[Sample] = []
+
+        from app.core.config import settings
+        self.prefix = settings.API_PREFIX
+
+    async def login(self, username: str) -> httpx.Response:
+        response = await self.client.post(
+            f"{self.prefix}/auth/token", data={"username": username, "password": PASSWORD}
+        )
+        if response.status_code == 200:
+            self.tokens[username] = response.json()["access_token"]
+        return response
+
+    async def request(self, operation: str, account: Account, rng: random.Random) -> httpx.Response:
+        if operation == "token":
+            return await self.login(account.username)
+
+        headers = {"Authorization": f"Bearer {self.tokens[account.username]}"}
+        if operation == "list":
+            public_only = "true" if rng.random() < 0.5 else "false"
+            return await self.client.get(
+                f"{self.prefix}/routes/", params={"public_only": public_only, "limit": 20}, headers=headers
+            )
+        if operation == "get":
+            choices = account.route_ids if (rng.random() < 0.5 or not self.public_ids) else self.public_ids
+            route_id = rng.choice(choices) if choices else 1
+            return await self.client.get(f"{self.prefix}/routes/{route_id}", headers=headers)
+        if operation == "create":
+            payload = {
+                'name': f"load {rng.randrange(10**9)}", 'start_point': "", 'end_point': "", 'source_type': "manual",
+                'waypoints': synthetic_waypoints(self.points, lat0=40.0 + rng.random(), lon0=-3.0 + rng.random()),
+            }
+            return await self.client.post(f"{self.prefix}/routes/", json=payload, headers=headers)
+        # import
+        document = synthetic_gpx(self.points, lat0=40.0 + rng.random())
+        return await self.client.post(
+            f"{self.prefix}/routes/import-gpx", params={"name": f"load import {rng.randrange(10**9)}"},
+            files={"file": ("track.gpx", document, "application/gpx+xml")}, headers=headers
+        )
+
+    async def worker(self, index: int, deadline: float) -> None:
+        rng = random.Random(self.seed + index)
+        while time.perf_counter() < deadline:
+            operation = rng.choices(self.operations, self.weights)[0]
+            account = rng.choice(self.accounts)
+            start = time.perf_counter()
+            try:
+                response = await self.request(operation, account, rng)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            self.samples.append(Sample(operation, status, time.perf_counter() - start))
+
+    async def run(self, concurrency: int, duration: float) -> float:
+        # Every account needs a token before the mix starts
+        for account in self.accounts:
+            response = await self.login(account.username)
+            if response.status_code != 200:
+                raise RuntimeError(f"Login of {account.username} failed: {response.status_code} {response.text}")
+
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(self.worker(i, deadline) for i in range(concurrency)))
+        return time.perf_counter() - start
+
+
+def summarize(samples: List[Sample], elapsed: float) -> Dict[str, Dict[str, Any]]:
+    """Per-operation and total counts, throughput, latency percentiles (ms) and error rate."""
+    groups = defaultdict(list)
+    for sample in samples:
+        groups[sample.operation].append(sample)
+        groups["total"].append(sample)
+
+    report = {}
+    for operation in [*OPERATIONS, "total"]:
+        group = groups.get(operation)
+        if not group:
+            continue
+        latencies = np.array([sample.latency for sample in group]) * 1000
+        errors = sum(1 for sample in group if sample.status == 0 or sample.status >= 400)
+        report[operation] = {
+            'requests': len(group),
+            'throughput': len(group) / elapsed,
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p95_ms': float(np.percentile(latencies, 95)),
+            'p99_ms': float(np.percentile(latencies, 99)),
+            'max_ms': float(latencies.max()),
+            'errors': errors,
+            'error_rate': errors / len(group),
+            'statuses': dict(sorted(
+                (str(status), sum(1 for sample in group if sample.status == status))
+                for status in {sample.status for sample in group}
+            )),
+        }
+    return report
+
+
+async def _run(args, accounts: List[Account], public_ids: List[int]) -> Tuple[Dict[str, Dict[str, Any]], float]:
+    if args.target:
+        client = httpx.AsyncClient(base_url=args.target, timeout=args.timeout)
+    else:
+        from main import app
+        client = httpx.AsyncClient(app=app, base_url="http://loadtest", timeout=args.timeout)
+
+    async with client:
+        load_test = LoadTest(client, accounts, public_ids, parse_mix(args.mix), args.points, args.seed)
+        elapsed = await load_test.run(args.concurrency, args.duration)
+
+    if not args.target:
+        from app.db.session import async_engine
+        await async_engine.dispose()
+    return summarize(load_test.samples, elapsed), elapsed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--target", help="base URL of a running server; default drives the app in process")
+    parser.add_argument("--database-url", help="database to seed (and serve, in process); default a temporary SQLite file")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--routes-per-user", type=int, default=10)
+    parser.add_argument("--points", type=int, default=500, help="waypoints per seeded, created and imported route")
+    parser.add_argument("--public", type=float, default=0.5, help="fraction of seeded routes that are public")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds to replay the mix")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="weighted operations, e.g. " + DEFAULT_MIX)
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=1, help="random seed of the seeding and the mix")
+    parser.add_argument("--seed-only", action="store_true", help="seed the database and exit")
+    parser.add_argument("--no-seed", action="store_true", help="reuse users and routes seeded by an earlier run")
+    parser.add_argument("--output", help="write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    try:
+        parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    # The app reads its settings on import, so the database is chosen before importing it
+    directory = None
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        directory = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory.name, 'load.db')}"
+    os.environ.setdefault("JWT_SECRET_KEY", "loadtest-" + os.urandom(16).hex())
+
+    try:
+        rng = random.Random(args.seed)
+        if args.no_seed:
+            accounts, public_ids = _seeded_accounts()
+        else:
+            start = time.perf_counter()
+            accounts, public_ids = seed(args.users, args.routes_per_user, args.points, args.public, rng)
+            print(
+                f"Seeded {len(accounts)} users and {sum(len(a.route_ids) for a in accounts)} routes "
+                f"in {time.perf_counter() - start:.1f} s",
+                file=sys.stderr
+            )
+        if args.seed_only:
+            return 0
+        if not accounts:
+            raise SystemExit("No seeded users found")
+
+        report, elapsed = asyncio.run(_run(args, accounts, public_ids))
+    finally:
+        if directory is not None:
+            directory.cleanup()
+
+    print(f"{args.concurrency} clients, {elapsed:.1f} s, target {args.target or 'in-process ASGI'}")
+    print_table(
+        ["operation", "requests", "req/s", "p50 ms", "p95 ms", "p99 ms", "max ms", "errors", "error %"],
+        [
+            [
+                operation, result['requests'], f"{result['throughput']:.1f}", f"{result['p50_ms']:.1f}",
+                f"{result['p95_ms']:.1f}", f"{result['p99_ms']:.1f}", f"{result['max_ms']:.1f}",
+                result['errors'], f"{result['error_rate']:.1%}",
+            ]
+            for operation, result in report.items()
+        ]
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({'elapsed': elapsed, 'args': vars(args), 'operations': report}, f, indent=2)
+            f.write("\n")
+    return 1 if report.get("total", {}).get("errors") else 0
+
+
+def _seeded_accounts() -> Tuple[List[Account], List[int]]:
+    """Load the accounts and routes of earlier seeding runs (users named "load...")."""
+    from app.db.models import User
+    from app.db.models.route import Route
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        users = db.query(User.id, User.username).filter(User.username.like("load%")).all()
+        routes = db.query(Route.id, Route.user_id, Route.is_public).filter(
+            Route.user_id.in_([user.id for user in users])
+        ).all()
+    finally:
+        db.close()
+
+    route_ids = defaultdict(list)
+    for route in routes:
+        route_ids[route.user_id].append(route.id)
+    accounts = [Account(user.username, route_ids[user.id]) for user in users]
+    return accounts, [route.id for route in routes if route.is_public]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
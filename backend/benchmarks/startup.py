@@ -0,0 +1,253 @@
+"""
+Profile the startup of the API: import-time breakdown and time to first request.
+
+Usage:
+    python -m benchmarks.startup imports [--top N] [--output FILE]
+    python -m benchmarks.startup cold-start [--runs N] [--env KEY=VALUE ...] [--output FILE]
+
+``imports`` imports ``main`` in a fresh interpreter with ``python -X importtime``
+and reports the import time of every top-level package (``app`` is split by
+subpackage) and the slowest modules by their own import time.
+
+``cold-start`` starts uvicorn the way the pods do, ``--runs`` times, on a
+seeded SQLite database, and measures from spawning the process:
+
+    live     the liveness probe first answers
+    ready    the readiness probe passes (the warm-up has finished)
+    first    an authenticated GET /api/routes/ completes
+
+The latency of that first request and of a second, identical one show what
+the first user still pays for. The server's own phase timings, counted from
+when it started loading the app, are reported as well. ``--env`` passes
+settings to the server, e.g. ``--env STARTUP_WARM_CONNECTIONS=0`` to compare
+without pre-opened connections.
+"""
+
+import argparse
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.common import print_table
+
+DEFAULT_RUNS = 5
+DEFAULT_TOP = 25
+# Seconds to wait for a server to become ready
+READY_TIMEOUT = 60.0
+POLL_INTERVAL = 0.005
+
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def import_times() -> List[Tuple[str, int, int]]:
+    """
+    Import ``main`` in a fresh interpreter and parse its ``-X importtime`` report.
+
+    Returns:
+        List[Tuple[str, int, int]]: (module, self microseconds, cumulative microseconds), in import order
+    """
+    env = dict(os.environ)
+    env.setdefault("JWT_SECRET_KEY", "startup-" + os.urandom(16).hex())
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        env=env, capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            modules.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    return modules
+
+
+def package_of(module: str) -> str:
+    """Group a module under its top-level package, or its subpackage of ``app``."""
+    parts = module.split(".")
+    return ".".join(parts[:2]) if parts[0] == "app" and len(parts) > 1 else parts[0]
+
+
+def import_report(top: int) -> Dict[str, Any]:
+    """Import time of ``main`` in total, per package and for the slowest modules, in milliseconds."""
+    modules = import_times()
+    total = next((cumulative for name, _, cumulative in modules if name == "main"), 0)
+    packages = Counter()
+    for name, own, _ in modules:
+        packages[package_of(name)] += own
+
+    return {
+        "total_ms": total / 1000,
+        "packages": {name: own / 1000 for name, own in packages.most_common()},
+        "modules": [
+            {"module": name, "self_ms": own / 1000, "cumulative_ms": cumulative / 1000}
+            for name, own, cumulative in sorted(modules, key=lambda module: -module[1])[:top]
+        ],
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _seed_database(url: str, secret_key: str) -> str:
+    """Create the schema and one user on ``url``; returns an access token for the user."""
+    os.environ["JWT_SECRET_KEY"] = secret_key
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from app.core.security import create_access_token
+    from app.db.models import Base, User
+
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        db.add(User(email="startup@example.com", username="startup", hashed_password="x"))
+        db.commit()
+    engine.dispose()
+    return create_access_token({"sub": "startup"})
+
+
+def _wait_for(client: httpx.Client, path: str, deadline: float, process: subprocess.Popen) -> httpx.Response:
+    """Poll ``path`` until it answers 200."""
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"server exited with status {process.returncode}")
+        try:
+            response = client.get(path)
+            if response.status_code == 200:
+                return response
+        except httpx.TransportError:
+            pass
+        time.sleep(POLL_INTERVAL)
+    raise SystemExit(f"{path} did not answer within {READY_TIMEOUT:.0f} s")
+
+
+def cold_start(env: Dict[str, str], token: str) -> Dict[str, Any]:
+    """Start one server and time it from spawn to live, ready and the first served request."""
+    port = _free_port()
+    command = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    spawned = time.perf_counter()
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=READY_TIMEOUT) as client:
+            deadline = spawned + READY_TIMEOUT
+            _wait_for(client, "/api/health/live", deadline, process)
+            live = time.perf_counter()
+            phases = _wait_for(client, "/api/health/ready", deadline, process).json()["startup"]
+            ready = time.perf_counter()
+
+            response = client.get("/api/routes/", headers=headers)
+            first = time.perf_counter()
+            response.raise_for_status()
+            client.get("/api/routes/", headers=headers).raise_for_status()
+            second = time.perf_counter()
+    finally:
+        process.terminate()
+        process.wait()
+
+    return {
+        "live_s": live - spawned,
+        "ready_s": ready - spawned,
+        "first_request_s": first - spawned,
+        "first_request_ms": (first - ready) * 1000,
+        "second_request_ms": (second - first) * 1000,
+        "server_imported_s": phases.get("imported"),
+        "server_ready_s": phases.get("ready"),
+    }
+
+
+def cold_start_report(runs: int, overrides: Dict[str, str], database_url: Optional[str] = None) -> Dict[str, Any]:
+    """Run ``cold_start`` ``runs`` times on a seeded database and add the median of every timing."""
+    secret_key = "startup-" + os.urandom(16).hex()
+    directory = None
+    if database_url is None:
+        directory = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(directory.name, 'startup.db')}"
+
+    try:
+        token = _seed_database(database_url, secret_key)
+        env = {**os.environ, "DATABASE_URL": database_url, "JWT_SECRET_KEY": secret_key, **overrides}
+        results = []
+        for run in range(runs):
+            results.append(cold_start(env, token))
+            print(f"run {run + 1}: ready after {results[-1]['ready_s']:.3f} s", file=sys.stderr)
+    finally:
+        if directory is not None:
+            directory.cleanup()
+
+    median = {
+        key: statistics.median(result[key] for result in results)
+        for key in results[0] if all(result[key] is not None for result in results)
+    }
+    return {"runs": results, "median": median, "env": overrides}
+
+
+def _print_imports(report: Dict[str, Any], top: int) -> None:
+    total = report["total_ms"]
+    print(f"import main: {total:.1f} ms\n")
+    print_table(
+        ["package", "ms", "share"],
+        [[name, f"{ms:.1f}", f"{ms / total:.1%}"] for name, ms in list(report["packages"].items())[:top]]
+    )
+    print()
+    print_table(
+        ["module", "self ms", "cumulative ms"],
+        [[module["module"], f"{module['self_ms']:.1f}", f"{module['cumulative_ms']:.1f}"] for module in report["modules"]]
+    )
+
+
+def _print_cold_start(report: Dict[str, Any]) -> None:
+    columns = ["live_s", "ready_s", "first_request_s", "first_request_ms", "second_request_ms", "server_imported_s", "server_ready_s"]
+    rows = [
+        [str(index + 1)] + ["-" if result[key] is None else f"{result[key]:.3f}" for key in columns]
+        for index, result in enumerate(report["runs"])
+    ]
+    rows.append(["median"] + [f"{report['median'][key]:.3f}" if key in report["median"] else "-" for key in columns])
+    print_table(["run", "live s", "ready s", "first s", "first ms", "second ms", "server import s", "server ready s"], rows)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup", description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    imports_parser = commands.add_parser("imports", help="import-time breakdown of main")
+    imports_parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="number of slowest packages and modules to list")
+    imports_parser.add_argument("--output", help="write the report to this JSON file")
+
+    cold_parser = commands.add_parser("cold-start", help="time server startup and the first request")
+    cold_parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="number of server starts")
+    cold_parser.add_argument("--database-url", help="seeded database (default: a temporary SQLite file)")
+    cold_parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="server setting")
+    cold_parser.add_argument("--output", help="write the report to this JSON file")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "imports":
+        report = import_report(args.top)
+        _print_imports(report, args.top)
+    else:
+        overrides = dict(item.split("=", 1) for item in args.env)
+        report = cold_start_report(args.runs, overrides, args.database_url)
+        _print_cold_start(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
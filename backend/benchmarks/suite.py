@@ -0,0 +1,297 @@
+"""
+Micro-benchmark suite for the geo, GPX import and route serialization hot paths.
+
+Usage:
+    python -m benchmarks.suite run [--sizes N ...] [--filter TEXT] [--output FILE]
+    python -m benchmarks.suite compare BASELINE [CURRENT] [--threshold 0.25] [--fail-missing]
+
+``run`` times every benchmark on synthetic tracks of each size and prints a
+table; with ``--output`` the results are also stored as a JSON baseline.
+``compare`` checks results against a baseline, running the suite first when
+no CURRENT file is given, and exits with status 1 if any benchmark got slower
+than the baseline by more than the threshold (0.25 = 25%). Baseline entries
+without a current result (renamed or removed benchmarks) are listed as
+missing but only fail the comparison with ``--fail-missing``.
+
+Each benchmark reports the fastest of several rounds, which is the least noisy
+estimate of its cost. Baselines are only comparable on the same machine; keep
+one per machine or CI runner under ``benchmarks/baselines``.
+"""
+
+import argparse
+import gc
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.utils.geo import batch_route_metrics, calculate_route_center, calculate_route_distance, waypoints_to_arrays
+from benchmarks.common import make_session, print_table, synthetic_waypoints
+
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.25
+# Differences below this many milliseconds are noise, whatever their ratio
+DEFAULT_NOISE_MS = 0.5
+# Stop repeating a benchmark once its rounds have taken this long (at least one round always runs)
+ROUND_BUDGET_SECONDS = 10.0
+# Fast benchmarks call the function repeatedly so that a round lasts at least this long
+MIN_ROUND_SECONDS = 0.05
+MAX_LOOPS = 1000
+SCHEMA_VERSION = 1
+
+# A benchmark's setup takes the number of points and returns the callable to time;
+# sizes above max_points (None = no limit) are skipped
+Benchmark = namedtuple("Benchmark", ["name", "setup", "max_points"], defaults=[None])
+
+
+def setup_route_distance(points: int) -> Callable[[], Any]:
+    waypoints = synthetic_waypoints(points)
+    return lambda: calculate_route_distance(waypoints)
+
+
+def setup_route_center(points: int) -> Callable[[], Any]:
+    waypoints = synthetic_waypoints(points)
+    return lambda: calculate_route_center(waypoints)
+
+
+def setup_batch_route_metrics(points: int) -> Callable[[], Any]:
+    # The same number of points, split over ten routes
+    tracks = [
+        waypoints_to_arrays(synthetic_waypoints(max(2, points // 10), lat0=40.0 + i * 0.01))
+        for i in range(10)
+    ]
+    return lambda: batch_route_metrics(tracks)
+
+
+def setup_gpx_import(points: int) -> Callable[[], Any]:
+    from app.services.route_service import RouteService
+
+    document = synthetic_gpx(points)
+    db = make_session()
+    route_service = RouteService(db)
+
+    def run():
+        route_service.import_gpx(1, document, f"bench-{points}")
+        db.expunge_all()
+
+    return run
+
+
+def setup_route_serialization(points: int) -> Callable[[], Any]:
+    from app.api.routes.routes import _route_response
+    from app.services.route_service import RouteService
+
+    db = make_session()
+    route_service = RouteService(db)
+    route = route_service.create_route(
+        {'name': f"bench-{points}", 'user_id': 1, 'start_point': "", 'end_point': "", 'source_type': "manual"},
+        synthetic_waypoints(points)
+    )
+    waypoints = route_service.get_route_waypoints(route)
+    return lambda: _route_response(route, waypoints).body
+
+
+BENCHMARKS = [
+    Benchmark("geo.route_distance", setup_route_distance),
+    Benchmark("geo.route_center", setup_route_center),
+    Benchmark("geo.batch_route_metrics", setup_batch_route_metrics),
+    # Persisting a 1M-point track takes far longer than the round budget
+    Benchmark("gpx.import", setup_gpx_import, max_points=100_000),
+    Benchmark("serialization.route", setup_route_serialization),
+]
+
+
+def synthetic_gpx(points: int) -> str:
+    """Render ``synthetic_waypoints(points)`` as a GPX document with one named point."""
+    buffer = io.StringIO()
+    buffer.write('<?xml version="1.0"?><gpx version="1.1" xmlns="http://www.topografix.com/GPX/1/1"><trk><trkseg>')
+    for waypoint in synthetic_waypoints(points):
+        name = '<name>Summit</name>' if waypoint['order'] == points // 2 else ''
+        buffer.write(f'<trkpt lat="{waypoint["latitude"]:.7f}" lon="{waypoint["longitude"]:.7f}">{name}</trkpt>')
+    buffer.write('</trkseg></trk></gpx>')
+    return buffer.getvalue()
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> Tuple[List[float], int]:
+    """
+    Time up to ``repeat`` rounds of ``fn`` with the garbage collector paused, within the round budget.
+
+    A first untimed call warms caches and calibrates how many calls make up a
+    round, so that fast benchmarks are timed over at least ``MIN_ROUND_SECONDS``.
+
+    Returns:
+        Tuple[List[float], int]: Seconds per call of every round, and calls per round
+    """
+    start = time.perf_counter()
+    fn()
+    first = time.perf_counter() - start
+    if first >= ROUND_BUDGET_SECONDS / 2:
+        # Too slow to repeat within the budget; the calibration call is the only round
+        return [first], 1
+
+    loops = max(1, min(MAX_LOOPS, int(MIN_ROUND_SECONDS / max(first, 1e-9))))
+    times = []
+    deadline = time.perf_counter() + ROUND_BUDGET_SECONDS
+    while len(times) < repeat and (not times or time.perf_counter() < deadline):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            times.append((time.perf_counter() - start) / loops)
+        finally:
+            gc.enable()
+    return times, loops
+
+
+def run_suite(sizes: List[int], repeat: int = DEFAULT_REPEAT, name_filter: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run every selected benchmark at every size.
+
+    Args:
+        sizes: Track sizes in points
+        repeat: Maximum number of timed rounds per benchmark
+        name_filter: Only run benchmarks whose name contains this text
+
+    Returns:
+        Dict[str, Any]: Metadata and a ``results`` mapping of "name/points" to timings in seconds
+    """
+    results = {}
+    for benchmark in BENCHMARKS:
+        if name_filter and name_filter not in benchmark.name:
+            continue
+        for points in sizes:
+            if benchmark.max_points is not None and points > benchmark.max_points:
+                continue
+            times, loops = measure(benchmark.setup(points), repeat)
+            results[f"{benchmark.name}/{points}"] = {
+                'points': points,
+                'rounds': len(times),
+                'loops': loops,
+                'min': min(times),
+                'median': statistics.median(times),
+            }
+            print(f"{benchmark.name}/{points}: {min(times) * 1000:.3f} ms", file=sys.stderr)
+
+    return {
+        'schema': SCHEMA_VERSION,
+        'created_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'machine': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(),
+        },
+        'results': results,
+    }
+
+
+def compare(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float, noise_ms: float = DEFAULT_NOISE_MS
+) -> List[List[Any]]:
+    """
+    Compare the fastest round of each benchmark present in both result sets.
+
+    Returns:
+        List[List[Any]]: Table rows of name, baseline ms, current ms, change and status
+    """
+    rows = []
+    for name, base in baseline['results'].items():
+        result = current['results'].get(name)
+        if result is None:
+            rows.append([name, f"{base['min'] * 1000:.3f}", "-", "-", "missing"])
+            continue
+
+        change = result['min'] / base['min'] - 1 if base['min'] > 0 else 0.0
+        regressed = change > threshold and (result['min'] - base['min']) * 1000 > noise_ms
+        status = "REGRESSION" if regressed else ("faster" if change < -threshold else "ok")
+        rows.append([name, f"{base['min'] * 1000:.3f}", f"{result['min'] * 1000:.3f}", f"{change:+.1%}", status])
+    return rows
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        data = json.load(f)
+    if data.get('schema') != SCHEMA_VERSION:
+        raise SystemExit(f"{path}: unsupported benchmark file schema {data.get('schema')}")
+    return data
+
+
+def _print_results(data: Dict[str, Any]) -> None:
+    print_table(
+        ["benchmark", "rounds", "min ms", "median ms"],
+        [
+            [name, result['rounds'], f"{result['min'] * 1000:.3f}", f"{result['median'] * 1000:.3f}"]
+            for name, result in data['results'].items()
+        ]
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the suite")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="track sizes in points")
+    run_parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="maximum rounds per benchmark")
+    run_parser.add_argument("--filter", dest="name_filter", help="only run benchmarks whose name contains this")
+    run_parser.add_argument("--output", help="write the results to this JSON file")
+
+    compare_parser = commands.add_parser("compare", help="compare results with a baseline")
+    compare_parser.add_argument("baseline", help="baseline JSON file")
+    compare_parser.add_argument("current", nargs="?", help="results JSON file; runs the suite when omitted")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown ratio")
+    compare_parser.add_argument("--noise-ms", type=float, default=DEFAULT_NOISE_MS, help="ignore smaller differences")
+    compare_parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="maximum rounds per benchmark")
+    compare_parser.add_argument("--filter", dest="name_filter", help="only compare benchmarks whose name contains this")
+    compare_parser.add_argument("--fail-missing", action="store_true", help="also fail when baseline entries have no result")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        data = run_suite(args.sizes, args.repeat, args.name_filter)
+        _print_results(data)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(data, f, indent=2, sort_keys=True)
+                f.write("\n")
+        return 0
+
+    baseline = _load(args.baseline)
+    if args.name_filter:
+        baseline['results'] = {
+            name: result for name, result in baseline['results'].items() if args.name_filter in name
+        }
+    if args.current:
+        current = _load(args.current)
+    else:
+        sizes = sorted({result['points'] for result in baseline['results'].values()})
+        current = run_suite(sizes, args.repeat, args.name_filter)
+
+    rows = compare(baseline, current, args.threshold, args.noise_ms)
+    print_table(["benchmark", "baseline ms", "current ms", "change", "status"], rows)
+
+    status = 0
+    missing = [row[0] for row in rows if row[-1] == "missing"]
+    if missing:
+        print(f"\n{len(missing)} baseline benchmark(s) have no current result: {', '.join(missing)}")
+        if args.fail_missing:
+            status = 1
+    regressions = [row[0] for row in rows if row[-1] == "REGRESSION"]
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed more than {args.threshold:.0%}: {', '.join(regressions)}")
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,15 @@
+# First, so that startup timings include every other import
+from app.core.startup import FirstRequestMiddleware, startup_state, start_warm_up, stop_warm_up
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.metrics import MetricsMiddleware
+from app.core.security import shutdown_password_executor
+from app.db.profiling import QueryProfilingMiddleware
+from app.db.session import async_engine, engine
+from app.services.gpx_import import shutdown_gpx_executor
 from app.api.routes.base import router as base_router
+from app.api.routes.health import router as health_router
 from app.api.routes.users import router as users_router
 from app.api.routes.auth import router as auth_router
 from app.api.routes.routes import router as routes_router
@@ -23,11 +31,47 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Profile the SQL statements of every request
+if settings.SQL_PROFILING_ENABLED:
+    app.add_middleware(QueryProfilingMiddleware)
+
+# Record request metrics outside every other middleware
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Time the first request served after startup, ignoring health probes
+app.add_middleware(FirstRequestMiddleware, probe_prefix=f"{settings.API_PREFIX}/health")
+
 # Include routers
 app.include_router(base_router, prefix=settings.API_PREFIX)
+app.include_router(health_router, prefix=f"{settings.API_PREFIX}/health", tags=["health"])
 app.include_router(auth_router, prefix=f"{settings.API_PREFIX}/auth", tags=["authentication"])
 app.include_router(users_router, prefix=f"{settings.API_PREFIX}/users", tags=["users"])
 app.include_router(routes_router, prefix=f"{settings.API_PREFIX}/routes", tags=["routes"])
+if settings.METRICS_ENABLED and settings.METRICS_TOKEN:
+    from app.api.routes.metrics import router as metrics_router
+    app.include_router(metrics_router)
+if settings.INTERNAL_ENDPOINTS_ENABLED:
+    from app.api.routes.internal import router as internal_router
+    app.include_router(internal_router, prefix=f"{settings.API_PREFIX}/internal", include_in_schema=False)
+
+@app.on_event("startup")
+async def warm_up():
+    start_warm_up()
+
+@app.on_event("shutdown")
+def shutdown_executors():
+    stop_warm_up()
+    shutdown_password_executor()
+    shutdown_gpx_executor()
+
+@app.on_event("shutdown")
+async def close_database_connections():
+    # Pooled aiosqlite connections run on non-daemon threads that would keep the process alive
+    await async_engine.dispose()
+    engine.dispose()
+
+startup_state.mark("imported")
 
 if __name__ == "__main__":
     import uvicorn
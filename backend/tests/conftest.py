@@ -0,0 +1,32 @@
+import os
+import tempfile
+
+import pytest
+
+# Settings are read when app modules are imported, so configure the test database first
+_DATABASE_DIR = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DATABASE_DIR.name, 'test.db')}"
+os.environ.setdefault("JWT_SECRET_KEY", "test-" + "x" * 32)
+os.environ["SQL_PROFILING_ENABLED"] = "true"
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from app.db.models import Base
+    from app.db.session import engine
+    from main import app
+
+    Base.metadata.create_all(bind=engine)
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client):
+    user = {"username": "tester", "email": "tester@example.com", "password": "Passw0rd!x"}
+    response = client.post("/api/auth/register", json=user)
+    assert response.status_code == 201, response.text
+    response = client.post("/api/auth/token", data={"username": user["username"], "password": user["password"]})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
@@ -0,0 +1,81 @@
+"""Versioned public feed cache on the in-process backends."""
+
+import time
+
+import pytest
+
+from app.services.feed_cache import PublicFeedCache
+from app.utils.cache import CacheBackend, LocalRedis, MemoryBackend, RedisBackend
+
+
+@pytest.fixture(params=["memory", "local-redis"])
+def feed_cache(request):
+    if request.param == "memory":
+        backend = MemoryBackend(max_entries=16, max_bytes=1024 * 1024)
+    else:
+        backend = RedisBackend(LocalRedis())
+    return PublicFeedCache(backend, ttl=60)
+
+
+def test_page_round_trip(feed_cache):
+    key = feed_cache.key(None, 50, False)
+    assert feed_cache.get(key) is None
+
+    feed_cache.set(key, '"etag"', b'{"items": []}')
+
+    assert feed_cache.get(key) == ('"etag"', b'{"items": []}')
+    assert feed_cache.key(None, 50, False) == key
+    assert feed_cache.stats()["hits"] == 1
+
+
+def test_invalidate_makes_every_page_stale(feed_cache):
+    keys = [feed_cache.key(cursor, 50, False) for cursor in (None, "abc")]
+    for key in keys:
+        feed_cache.set(key, '"etag"', b"{}")
+
+    feed_cache.invalidate()
+
+    assert feed_cache.stats()["version"] == 1
+    assert all(feed_cache.key(cursor, 50, False) not in keys for cursor in (None, "abc"))
+    assert feed_cache.get(feed_cache.key(None, 50, False)) is None
+
+
+def test_page_read_during_invalidation_is_stored_as_stale(feed_cache):
+    key = feed_cache.key(None, 50, False)
+    feed_cache.invalidate()
+    feed_cache.set(key, '"old"', b"{}")
+
+    assert feed_cache.get(feed_cache.key(None, 50, False)) is None
+
+
+def test_local_redis_expires_values(monkeypatch):
+    client = LocalRedis()
+    client.set("key", b"value", ex=1)
+    assert client.get("key") == b"value"
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 2)
+    assert client.get("key") is None
+    assert client.incr("counter") == 1
+    assert client.incr("counter") == 2
+
+
+def test_memory_backend_is_bounded_by_size():
+    backend = MemoryBackend(max_entries=10, max_bytes=10)
+    backend.set("a", b"12345", ttl=60)
+    backend.set("b", b"123456", ttl=60)
+    backend.set("too-large", b"x" * 11, ttl=60)
+
+    assert backend.get("a") is None
+    assert backend.get("b") == b"123456"
+    assert backend.get("too-large") is None
+    assert backend.size_bytes == 6
+
+
+def test_backends_must_implement_the_interface():
+    class Incomplete(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete()
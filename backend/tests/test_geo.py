@@ -0,0 +1,123 @@
+"""Parity of the NumPy geo engine with the original pure-Python implementation."""
+
+import math
+import random
+
+import numpy as np
+import pytest
+
+from app.utils.geo import (
+    batch_route_metrics,
+    calculate_haversine_distance,
+    calculate_route_center,
+    calculate_route_distance,
+    estimate_travel_time,
+    estimate_travel_times,
+    segment_distances,
+    waypoints_to_arrays,
+)
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def reference_haversine(lat1, lon1, lat2, lon2):
+    lat1_rad = math.radians(lat1)
+    lon1_rad = math.radians(lon1)
+    lat2_rad = math.radians(lat2)
+    lon2_rad = math.radians(lon2)
+    dlon = lon2_rad - lon1_rad
+    dlat = lat2_rad - lat1_rad
+    a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+    return EARTH_RADIUS_KM * c
+
+
+def reference_route_distance(waypoints):
+    total_distance = 0.0
+    for i in range(len(waypoints) - 1):
+        total_distance += reference_haversine(
+            waypoints[i]['latitude'], waypoints[i]['longitude'],
+            waypoints[i + 1]['latitude'], waypoints[i + 1]['longitude']
+        )
+    return round(total_distance, 2)
+
+
+def reference_route_center(waypoints):
+    if not waypoints:
+        return (0.0, 0.0)
+    x_sum = y_sum = z_sum = 0.0
+    for waypoint in waypoints:
+        lat = math.radians(waypoint['latitude'])
+        lon = math.radians(waypoint['longitude'])
+        x_sum += math.cos(lat) * math.cos(lon)
+        y_sum += math.cos(lat) * math.sin(lon)
+        z_sum += math.sin(lat)
+    x_avg = x_sum / len(waypoints)
+    y_avg = y_sum / len(waypoints)
+    z_avg = z_sum / len(waypoints)
+    lon_center = math.atan2(y_avg, x_avg)
+    lat_center = math.atan2(z_avg, math.sqrt(x_avg * x_avg + y_avg * y_avg))
+    return (round(math.degrees(lat_center), 6), round(math.degrees(lon_center), 6))
+
+
+def random_track(rng, count):
+    """A random walk, sometimes crossing the antimeridian."""
+    lat, lon = rng.uniform(-80, 80), rng.uniform(-180, 180)
+    waypoints = []
+    for _ in range(count):
+        lat = max(-89.9, min(89.9, lat + rng.uniform(-0.05, 0.05)))
+        lon = (lon + rng.uniform(-0.05, 0.05) + 180) % 360 - 180
+        waypoints.append({'latitude': lat, 'longitude': lon})
+    return waypoints
+
+
+@pytest.fixture
+def tracks():
+    rng = random.Random(1)
+    return [random_track(rng, count) for count in (0, 1, 2, 17, 500, 5000)]
+
+
+def test_haversine_matches_reference():
+    rng = random.Random(2)
+    for _ in range(1000):
+        points = [rng.uniform(-90, 90), rng.uniform(-180, 180), rng.uniform(-90, 90), rng.uniform(-180, 180)]
+        assert calculate_haversine_distance(*points) == pytest.approx(reference_haversine(*points), abs=1e-6)
+
+
+def test_segment_distances_match_reference(tracks):
+    for waypoints in tracks:
+        lats, lons = waypoints_to_arrays(waypoints)
+        expected = [
+            reference_haversine(a['latitude'], a['longitude'], b['latitude'], b['longitude'])
+            for a, b in zip(waypoints, waypoints[1:])
+        ]
+        np.testing.assert_allclose(segment_distances(lats, lons), expected, rtol=0, atol=1e-9)
+
+
+def test_route_distance_and_center_match_reference(tracks):
+    for waypoints in tracks:
+        assert calculate_route_distance(waypoints) == pytest.approx(reference_route_distance(waypoints), abs=0.01)
+        assert calculate_route_center(waypoints) == pytest.approx(reference_route_center(waypoints), abs=1e-6)
+
+
+def test_batch_route_metrics_matches_reference(tracks):
+    results = batch_route_metrics([waypoints_to_arrays(waypoints) for waypoints in tracks])
+
+    assert len(results) == len(tracks)
+    for waypoints, result in zip(tracks, results):
+        assert result['point_count'] == len(waypoints)
+        assert result['distance'] == pytest.approx(reference_route_distance(waypoints), abs=0.01)
+        assert result['center'] == pytest.approx(reference_route_center(waypoints), abs=1e-6)
+        if waypoints:
+            lats = [waypoint['latitude'] for waypoint in waypoints]
+            lons = [waypoint['longitude'] for waypoint in waypoints]
+            assert result['bbox'] == (min(lats), min(lons), max(lats), max(lons))
+        else:
+            assert result['bbox'] is None
+
+
+def test_estimate_travel_times_matches_scalar():
+    distances = [0.0, 0.01, 1.234, 12.5, 250.0]
+    modes = ['walking', 'Cycling', 'driving', 'unknown', 'hiking']
+    expected = [estimate_travel_time(distance, mode) for distance, mode in zip(distances, modes)]
+    assert estimate_travel_times(np.array(distances), modes).tolist() == expected
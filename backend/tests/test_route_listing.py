@@ -0,0 +1,61 @@
+"""Route listings run a constant number of queries, however many routes they return."""
+
+import pytest
+
+from app.db.profiling import assert_max_queries
+
+ROUTE_COUNT = 100
+
+# The page itself, plus one batched waypoint query when waypoints are included
+MAX_QUERIES = {False: 1, True: 2}
+
+
+@pytest.fixture(scope="module")
+def routes(client, auth_headers):
+    payloads = [
+        {
+            "name": f"Route {i}",
+            "start_point": "A",
+            "end_point": "B",
+            "source_type": "manual",
+            "waypoints": [
+                {"name": f"Point {order}", "latitude": 45 + i * 0.01, "longitude": 7 + order * 0.01, "order": order}
+                for order in range(3)
+            ],
+        }
+        for i in range(ROUTE_COUNT)
+    ]
+    response = client.post("/api/routes/bulk", json={"routes": payloads}, headers=auth_headers)
+    assert response.status_code == 201, response.text
+    assert response.json()["created"] == ROUTE_COUNT
+
+
+def list_routes(client, auth_headers, limit, include_waypoints):
+    """Fetch one listing page and return its items and the statements it executed."""
+    params = {"limit": limit, "include_waypoints": include_waypoints}
+    with assert_max_queries(MAX_QUERIES[include_waypoints]) as profile:
+        response = client.get("/api/routes/", params=params, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()["items"], profile
+
+
+@pytest.mark.parametrize("include_waypoints", [False, True])
+def test_listing_query_count_is_constant(client, auth_headers, routes, include_waypoints):
+    # Warm up the principal cache so both listings authenticate the same way
+    list_routes(client, auth_headers, 1, include_waypoints)
+
+    few, few_profile = list_routes(client, auth_headers, 10, include_waypoints)
+    many, many_profile = list_routes(client, auth_headers, ROUTE_COUNT, include_waypoints)
+
+    assert len(few) == 10
+    assert len(many) == ROUTE_COUNT
+    assert many_profile.count == few_profile.count
+    if include_waypoints:
+        assert all(len(item["waypoints"]) == 3 for item in many)
+
+
+def test_summary_listing_never_reads_waypoints(client, auth_headers, routes):
+    items, profile = list_routes(client, auth_headers, ROUTE_COUNT, False)
+
+    assert "waypoints" not in items[0]
+    assert not any("waypoints" in shape for shape in profile.shapes)
@@ -0,0 +1,206 @@
+"""Incremental waypoint edits keep stored distances equal to a full recomputation."""
+
+import pytest
+
+from app.core.config import settings
+from app.db.models import Route, Waypoint
+from app.db.session import SessionLocal
+from app.services.route_service import RouteService
+from app.utils.geo import calculate_haversine_distance, estimate_travel_time
+
+POINTS = [(45.0 + i * 0.01, 7.0 + (i % 3) * 0.005) for i in range(8)]
+
+EDITS = {
+    "insert": [{"op": "insert", "index": 3, "waypoints": [{"latitude": 45.5, "longitude": 7.2}, {"latitude": 45.6, "longitude": 7.1}]}],
+    "insert-ends": [
+        {"op": "insert", "index": 0, "waypoints": [{"latitude": 44.9, "longitude": 6.9}]},
+        {"op": "insert", "index": 9, "waypoints": [{"latitude": 45.2, "longitude": 7.3}]},
+    ],
+    "move": [{"op": "move", "index": 4, "latitude": 45.3, "longitude": 7.4, "name": "Moved"}],
+    "move-ends": [
+        {"op": "move", "index": 0, "latitude": 44.8, "longitude": 6.8},
+        {"op": "move", "index": 7, "latitude": 45.4, "longitude": 7.5},
+    ],
+    "delete": [{"op": "delete", "index": 2, "end": 5}],
+    "delete-ends": [{"op": "delete", "index": 0}, {"op": "delete", "index": 6}],
+    "mixed": [
+        {"op": "insert", "index": 8, "waypoints": [{"latitude": 45.1, "longitude": 7.1}]},
+        {"op": "move", "index": 1, "latitude": 45.05, "longitude": 7.05},
+        {"op": "delete", "index": 5},
+    ],
+}
+
+
+def apply_to_points(points, operations):
+    """The expected track after the operations."""
+    points = list(points)
+    for operation in operations:
+        index = operation["index"]
+        if operation["op"] == "insert":
+            points[index:index] = [(point["latitude"], point["longitude"]) for point in operation["waypoints"]]
+        elif operation["op"] == "move":
+            points[index] = (operation["latitude"], operation["longitude"])
+        else:
+            del points[index:operation.get("end", index + 1)]
+    return points
+
+
+def track_distance(points):
+    return sum(calculate_haversine_distance(*a, *b) for a, b in zip(points, points[1:]))
+
+
+def assert_distance_follows(route, summary, points):
+    """New routes store a rounded distance, so compare the change with a full recomputation."""
+    assert summary["distance"] - route["distance"] == pytest.approx(track_distance(points) - track_distance(POINTS), abs=1e-6)
+
+
+@pytest.fixture(params=["rows", "packed"])
+def storage(request, monkeypatch):
+    monkeypatch.setattr(settings, "WAYPOINT_STORAGE", request.param)
+    return request.param
+
+
+def create_route(client, auth_headers, points=POINTS, orders=None, **fields):
+    orders = range(len(points)) if orders is None else orders
+    payload = {
+        "name": "Edited",
+        "start_point": "",
+        "end_point": "",
+        "source_type": "manual",
+        "waypoints": [
+            {"name": f"Point {i}", "latitude": lat, "longitude": lon, "order": order}
+            for i, ((lat, lon), order) in enumerate(zip(points, orders))
+        ],
+        **fields,
+    }
+    response = client.post("/api/routes/", json=payload, headers=auth_headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def edit(client, auth_headers, route_id, operations):
+    return client.patch(f"/api/routes/{route_id}/waypoints", json={"operations": operations}, headers=auth_headers)
+
+
+def stored_track(client, auth_headers, route_id):
+    """Points and stored segment distances (None for packed routes) of a route, in order."""
+    with SessionLocal() as db:
+        if db.get(Route, route_id).waypoint_storage == "rows":
+            rows = db.query(Waypoint).filter(Waypoint.route_id == route_id).order_by(Waypoint.order).all()
+            assert [row.order for row in rows] == list(range(len(rows)))
+            return [(row.latitude, row.longitude) for row in rows], [row.segment_distance for row in rows]
+
+    response = client.get(f"/api/routes/{route_id}", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return [(point["latitude"], point["longitude"]) for point in response.json()["waypoints"]], None
+
+
+@pytest.mark.parametrize("name", EDITS)
+def test_edit_matches_full_recomputation(client, auth_headers, storage, name):
+    route = create_route(client, auth_headers)
+
+    response = edit(client, auth_headers, route["id"], EDITS[name])
+
+    assert response.status_code == 200, response.text
+    expected = apply_to_points(POINTS, EDITS[name])
+    points, segments = stored_track(client, auth_headers, route["id"])
+    assert points == pytest.approx(expected, abs=1e-5)
+    if segments is not None:
+        assert segments == pytest.approx(
+            [0.0] + [calculate_haversine_distance(*a, *b) for a, b in zip(points, points[1:])], abs=1e-9
+        )
+
+    summary = response.json()
+    assert_distance_follows(route, summary, points)
+    assert summary["waypoint_count"] == len(expected)
+    lats, lons = zip(*points)
+    assert (summary["min_lat"], summary["min_lon"], summary["max_lat"], summary["max_lon"]) == pytest.approx(
+        (min(lats), min(lons), max(lats), max(lons)), abs=1e-5
+    )
+
+
+def test_derived_travel_time_follows_the_distance(client, auth_headers, storage):
+    derived = create_route(client, auth_headers)
+    chosen = create_route(client, auth_headers, estimated_time=999)
+
+    for route in (derived, chosen):
+        response = edit(client, auth_headers, route["id"], EDITS["insert"])
+        assert response.status_code == 200, response.text
+        route["edited"] = response.json()
+
+    assert derived["edited"]["estimated_time"] == estimate_travel_time(derived["edited"]["distance"], "walking")
+    assert chosen["edited"]["estimated_time"] == 999
+
+
+@pytest.mark.parametrize("orders", [[0, 2, 2, 3, 4, 5, 6, 7], [0, 10, 20, 30, 40, 50, 60, 70], [0, 1, 1, 3, 4, 5, 6, 7]])
+def test_rows_with_irregular_orders_are_renumbered(client, auth_headers, orders):
+    route = create_route(client, auth_headers, orders=orders)
+
+    response = edit(client, auth_headers, route["id"], [{"op": "move", "index": 1, "latitude": 45.3, "longitude": 7.4}])
+
+    assert response.status_code == 200, response.text
+    points, segments = stored_track(client, auth_headers, route["id"])
+    assert len(points) == len(POINTS)
+    assert points[1] == (45.3, 7.4)
+    assert segments == pytest.approx(
+        [0.0] + [calculate_haversine_distance(*a, *b) for a, b in zip(points, points[1:])], abs=1e-9
+    )
+    assert_distance_follows(route, response.json(), points)
+
+
+def test_rows_without_segment_distances_are_filled_in(client, auth_headers):
+    route = create_route(client, auth_headers)
+    with SessionLocal() as db:
+        db.query(Waypoint).filter(Waypoint.route_id == route["id"]).update({Waypoint.segment_distance: None})
+        db.commit()
+
+    response = edit(client, auth_headers, route["id"], EDITS["delete"])
+
+    assert response.status_code == 200, response.text
+    points, segments = stored_track(client, auth_headers, route["id"])
+    assert None not in segments
+    assert_distance_follows(route, response.json(), points)
+
+
+def test_backfill_stores_missing_segment_distances(client, auth_headers):
+    route = create_route(client, auth_headers, orders=[0, 10, 20, 30, 40, 50, 60, 70])
+    with SessionLocal() as db:
+        db.query(Waypoint).filter(Waypoint.route_id == route["id"]).update({Waypoint.segment_distance: None})
+        db.commit()
+
+        assert RouteService(db).rebuild_segment_distances() >= 1
+        assert RouteService(db).rebuild_segment_distances() == 0
+
+    points, segments = stored_track(client, auth_headers, route["id"])
+    assert points == pytest.approx(POINTS)
+    assert segments == pytest.approx(
+        [0.0] + [calculate_haversine_distance(*a, *b) for a, b in zip(points, points[1:])], abs=1e-9
+    )
+
+
+@pytest.mark.parametrize("operation, status_code", [
+    ({"op": "move", "index": 8, "latitude": 45.0, "longitude": 7.0}, 400),
+    ({"op": "move", "index": 1, "latitude": 100.0, "longitude": 7.0}, 400),
+    ({"op": "move", "index": 1}, 400),
+    ({"op": "move", "index": 1, "latitude": 45.0}, 400),
+    ({"op": "move", "index": 1, "latitude": None, "longitude": 7.0}, 400),
+    ({"op": "insert", "index": 9, "waypoints": [{"latitude": 45.0, "longitude": 7.0}]}, 400),
+    ({"op": "insert", "index": 1, "waypoints": []}, 400),
+    ({"op": "insert", "index": 1}, 400),
+    ({"op": "insert", "index": 1, "waypoints": [{"latitude": 45.0}]}, 422),
+    ({"op": "insert", "index": 1, "waypoints": [{"latitude": None, "longitude": 7.0}]}, 422),
+    ({"op": "delete", "index": 0, "end": 7}, 400),
+    ({"op": "delete", "index": 6, "end": 9}, 400),
+    ({"op": "rotate", "index": 1}, 422),
+    ({"op": "move", "latitude": 45.0, "longitude": 7.0}, 422),
+])
+def test_invalid_operations_are_rejected(client, auth_headers, storage, operation, status_code):
+    route = create_route(client, auth_headers)
+
+    response = edit(client, auth_headers, route["id"], [operation])
+
+    assert response.status_code == status_code, response.text
+    points, _ = stored_track(client, auth_headers, route["id"])
+    assert points == pytest.approx(POINTS)
+    with SessionLocal() as db:
+        assert db.get(Route, route["id"]).distance == route["distance"]
@@ -104,10 +104,10 @@ export const getRoutes = (userOnly = false) => async (dispatch) => {
     
     dispatch({
       type: 'FETCH_ROUTES_SUCCESS',
-      payload: response.data
+      payload: response.data.items
     });
     
-    return response.data;
+    return response.data.items;
   } catch (error) {
     dispatch({
       type: 'FETCH_ROUTES_FAIL',
@@ -28,7 +28,7 @@ export const fetchRoutes = () => async (dispatch) => {
         
         dispatch({
             type: ROUTE_TYPES.GET_ROUTES,
-            payload: res.data
+            payload: res.data.items
         });
     } catch (err) {
         dispatch({
@@ -48,7 +48,7 @@ export const fetchPublicRoutes = () => async (dispatch) => {
         
         dispatch({
             type: ROUTE_TYPES.GET_PUBLIC_ROUTES,
-            payload: res.data
+            payload: res.data.items
         });
     } catch (err) {
         dispatch({